@@ -0,0 +1,48 @@
+"""
+Shared setup for the benchmark scripts.
+"""
+
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+
+
+def make_engine() -> Engine:
+    """
+    Creates the engine the benchmark runs against and installs it as `db.engine`.
+    """
+    from backend.core import db
+
+    url = os.getenv("BENCH_DATABASE_URL")
+    if not url:
+        tmpdir = tempfile.mkdtemp(prefix="civitas-bench-")
+        url = "sqlite:///" + os.path.join(tmpdir, "bench.db")
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    engine = create_engine(url, future=True, connect_args=connect_args)
+    db.engine = engine
+    return engine
+
+
+def timed(fn, repeat: int) -> list[float]:
+    """
+    Calls fn() repeat times, returns the individual durations in milliseconds.
+    """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def report(label: str, durations: list[float], unit: str = "ms") -> None:
+    print(
+        f"{label:<40} median {statistics.median(durations):8.3f} {unit}"
+        f"   min {min(durations):8.3f} {unit}   max {max(durations):8.3f} {unit}"
+    )
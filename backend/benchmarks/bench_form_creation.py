@@ -0,0 +1,53 @@
+"""
+Form creation latency with a growing number of existing form tables.
+
+createFormTable must only emit DDL for the new form_<id> table, so the latency
+should stay flat whether 10 or 5,000 forms already exist.
+"""
+
+import json
+
+from _common import make_engine, report, timed
+
+from sqlalchemy import text
+
+from backend.crud import dbActions
+
+SIZES = (10, 1_000, 5_000)
+REPEAT = 20
+
+XOEV = json.dumps({"blocks": {
+    "1": {"label": "full_name", "data_type": "STRING"},
+    "2": {"label": "household_size", "data_type": "INTEGER"},
+    "3": {"label": "submission_date", "data_type": "DATE"},
+}})
+
+
+def _fill(engine, start: int, stop: int) -> None:
+    with engine.begin() as conn:
+        for i in range(start, stop):
+            conn.execute(text(f"CREATE TABLE form_{i} (id INTEGER PRIMARY KEY, user_id INTEGER, full_name VARCHAR)"))
+
+
+def main() -> None:
+    engine = make_engine()
+    existing = 0
+    next_id = 1_000_000
+    for size in SIZES:
+        _fill(engine, existing, size)
+        existing = size
+
+        def create():
+            nonlocal next_id
+            dbActions.createFormTable(next_id, XOEV)
+            next_id += 1
+
+        report(f"createFormTable with {size:>5} existing forms", timed(create, REPEAT))
+        # keep the number of existing tables equal to `size` for the next round
+        with engine.begin() as conn:
+            for i in range(next_id - REPEAT, next_id):
+                conn.execute(text(f"DROP TABLE form_{i}"))
+
+
+if __name__ == "__main__":
+    main()
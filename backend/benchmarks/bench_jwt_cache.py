@@ -0,0 +1,35 @@
+"""
+Per-request cost of verifying a bearer token, with the token cache cold and hot.
+
+Cold decodes verify the signature of every token (the cache is cleared before each call),
+hot decodes of an already seen token are served from the cache by its sha256 digest.
+"""
+
+from _common import report, timed
+
+from backend.core import security
+
+TOKENS = 1_000
+REPEAT = 20
+
+
+def main() -> None:
+    tokens = [security.create_access_token({"sub": f"user{i}", "userid": i, "roles": ["APPLICANT"]}) for i in range(TOKENS)]
+
+    def cold():
+        for token in tokens:
+            security.clear_token_cache()
+            security.decode_access_token(token)
+
+    def hot():
+        for token in tokens:
+            security.decode_access_token(token)
+
+    per_token = lambda durations: [d * 1000 / TOKENS for d in durations]  # ms per TOKENS tokens -> us per token
+    report("decode_access_token, cold cache", per_token(timed(cold, REPEAT)), "us")
+    hot()  # warm up
+    report("decode_access_token, hot cache", per_token(timed(hot, REPEAT)), "us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Revision latency for applications with a growing revision history.
+
+update_application marks the original and all older revisions outdated with one
+UPDATE over the indexed current_snapshot_id chain, and revision lookups use the
+same index, so both should stay flat for 1, 50 and 500 existing revisions.
+"""
+
+import json
+
+from _common import make_engine, report, timed
+
+from backend.core import db
+from backend.crud import applicationCrud, catalogCrud, dbActions
+from backend.models.domain.application import Application
+
+SIZES = (1, 50, 500)
+REPEAT = 20
+
+XOEV = json.dumps({"blocks": {
+    "1": {"label": "full_name", "data_type": "STRING"},
+    "2": {"label": "household_size", "data_type": "INTEGER"},
+}})
+
+
+def _application_with_revisions(form_id: int, revisions: int) -> int:
+    """
+    Creates an application with the given number of revisions (including the original),
+    returns the id of the newest one
+    """
+    with db.get_session() as session:
+        created = applicationCrud.insert_application(session, Application(user_id=1, form_id=form_id, jsonPayload={
+            "1": {"label": "full_name", "value": "Erika Mustermann"},
+            "2": {"label": "household_size", "value": 1},
+        }))
+        head = created.id
+        session.commit()
+        for i in range(revisions - 1):
+            head = applicationCrud.update_application(
+                form_id, head, {"2": {"label": "household_size", "value": i + 2}}, session)
+    return head
+
+
+def main() -> None:
+    make_engine()
+    catalogCrud.ensure_catalog_table()
+    for form_id, size in enumerate(SIZES, start=1):
+        dbActions.createFormTable(form_id, XOEV)
+        head = _application_with_revisions(form_id, size)
+
+        def revise():
+            nonlocal head
+            with db.get_session() as session:
+                head = applicationCrud.update_application(
+                    form_id, head, {"1": {"label": "full_name", "value": "Max Mustermann"}}, session)
+
+        def lookup():
+            with db.get_session() as session:
+                applicationCrud.get_all_revisions_of_application(session, form_id, head)
+
+        report(f"update_application with {size:>3} revisions", timed(revise, REPEAT))
+        report(f"revision lookup with {size:>3} revisions", timed(lookup, REPEAT))
+
+
+if __name__ == "__main__":
+    main()
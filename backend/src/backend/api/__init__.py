@@ -12,6 +12,7 @@ Modules:
     user: Endpoints related to user management.
     form: Endpoints related to form handling (currently commented out).
     application: Endpoints related to application processing (to be implemented).
+    queue: Review queue which leases pending applications to admins.
 
 Functions:
     api_root: Base endpoint for Civitas API v1, providing a welcome message.
@@ -19,7 +20,7 @@ Functions:
 """
 
 from fastapi import APIRouter
-from backend.api.endpoints import form, user, application, auth, revision
+from backend.api.endpoints import form, user, application, auth, revision, queue
 from backend.api.deps import get_current_user_payload, RoleChecker
 from backend.api.health import router as health_router
 
@@ -39,6 +40,7 @@ api_router.include_router(form.router)
 api_router.include_router(application.router)
 api_router.include_router(auth.router)
 api_router.include_router(revision.router)
+api_router.include_router(queue.router)
 api_router.include_router(health_router)
 
 
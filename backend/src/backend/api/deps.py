@@ -1,16 +1,24 @@
 # backend/api/deps.py
 
-from fastapi import Depends, HTTPException, status
+import asyncio
+import logging
+
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+from jose import JWTError
 from typing import List, Optional
 
-from backend.core.security import SECRET_KEY, ALGORITHM
+from backend.core import asyncDb, db
+from backend.core.security import decode_access_token
 from backend.schemas.token import TokenData
 from backend import config
 
 # This should point to your login endpoint
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
+# Same, but yields None instead of answering 401 when there is no Authorization header
+oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token", auto_error=False)
+
+logger = logging.getLogger(__name__)
 
 async def get_current_user_payload(token: str = Depends(oauth2_scheme)) -> dict:
     """Decodes the JWT token and returns its payload.
@@ -37,29 +45,28 @@ async def get_current_user_payload(token: str = Depends(oauth2_scheme)) -> dict:
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, 
-                            SECRET_KEY,
-                            algorithms=[ALGORITHM],
-                            # options={"verify_aud": False},  # you don't set 'aud', so skip it
-                            )
-        print("Successfully decoded token")  # Debugging line
-        print("Decoded JWT payload:", payload)  # Debugging line
-        print("sub as per payload:", payload.get("sub"))  # Debugging line
-        username: str = payload.get("sub")
-        if username is None:
-            raise debug_exception
-        return payload
+        payload = decode_access_token(token)  # verified once, then served from the token cache
     except JWTError:
+        logger.debug("Rejected invalid or expired token")
         raise credentials_exception
-    except Exception as e:
-        print(f"Unexpected error during token decoding: {e}")  # Debugging line
+    except Exception:
+        logger.warning("Unexpected error during token decoding", exc_info=True)
         raise credentials_exception
+    username: str = payload.get("sub")
+    if username is None:
+        logger.debug("Token without sub claim")
+        raise debug_exception
+    logger.debug("Authenticated token", extra={"sub": username, "roles": payload.get("roles")})
+    return payload
     
-async def get_current_user_payload_optional(token: str = Depends(oauth2_scheme)) -> Optional[dict]:
+async def get_current_user_payload_optional(token: Optional[str] = Depends(oauth2_scheme_optional)) -> Optional[dict]:
     """
     Tries to get the user payload but returns None on failure instead of raising an error.
     This allows unauthenticated or invalid token requests to proceed to the endpoint.
+    Requests without a token don't attempt any decoding.
     """
+    if not token:
+        return None
     try:
         # This calls your existing function that raises an exception on failure.
         return await get_current_user_payload(token)
@@ -68,6 +75,27 @@ async def get_current_user_payload_optional(token: str = Depends(oauth2_scheme))
         # and return None, indicating an unauthenticated user.
         return None
 
+async def get_read_session_dep(payload: Optional[dict] = Depends(get_current_user_payload_optional),
+                               read_your_writes: bool = Header(False, alias="X-Read-Your-Writes")):
+    """
+    Session dependency for read-only (GET) endpoints.
+
+    Reads go to the replica (DATABASE_REPLICA_URL) while it is healthy, otherwise to the primary.
+    Users who wrote within READ_YOUR_WRITES_SECONDS and requests with the header
+    "X-Read-Your-Writes: true" read from the primary, so they see their own fresh writes.
+    Nothing is committed.
+    """
+    if read_your_writes or db.replica_engine is None:
+        engine = db.engine
+    else:
+        user_id = payload.get("userid") if payload else None
+        engine = await asyncio.to_thread(db.get_read_engine, user_id)  # may have to check the replica's health
+    session = asyncDb.make_async_session(engine)
+    try:
+        yield session
+    finally:
+        await session.close()
+
 class RoleChecker:
     """
     A dependency class that checks if the current user has the required roles.
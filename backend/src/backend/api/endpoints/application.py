@@ -1,10 +1,12 @@
 # standard library imports
+import asyncio
 from datetime import datetime
 from typing import List, Optional
 
 # third party imports
 from backend.core import db
-from fastapi import APIRouter, Depends, HTTPException, Query
+from backend.core.asyncDb import AsyncDbSession, get_async_session_dep
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
@@ -15,7 +17,7 @@ from backend.crud import userCrud
 from backend.models.orm import roletable
 from backend.businesslogic.services.applicationService import createApplication, getApplication, editApplication
 from backend.businesslogic.services.formService import createForm
-from backend.businesslogic.services.adminService import adminApproveApplication, adminRejectApplication
+from backend.businesslogic.services.adminService import adminApproveApplication, adminRejectApplication, adminBulkUpdateStatus
 from backend.businesslogic.services.formService import createForm
 from backend.models.domain.application import Application, ApplicationStatus, ApplicationID, ApplicationFillout, ApplicationUpdate
 from backend.crud import userCrud
@@ -26,13 +28,16 @@ from backend.models import Form
 from datetime import date 
 from backend.businesslogic.services.mockups import _global_applications_db, _global_users_db, _global_forms_db
 from backend.models.domain.buildingblock import BuildingBlock
-from backend.crud import formCrud, applicationCrud
-from backend.businesslogic.services.applicationService import app_list_to_appResp_list
+from backend.crud import formCrud, applicationCrud, listingCrud
+from backend.businesslogic.services.applicationService import app_list_to_appResp_list, app_page_response
+from backend.businesslogic.services import applicationIngestService
+from backend.core import uploads
+from backend.models.domain.jsonresp import PaginatedResponse
 from sqlalchemy.orm import Session
 
 from backend.api import deps
 
-from backend.models.domain.application import ApplicationResponseItem
+from backend.models.domain.application import ApplicationResponseItem, BulkStatusItem, BulkStatusResult, IngestReport
 
 from backend.models.domain.application import application_to_response_item
 
@@ -96,13 +101,17 @@ applicant_permission = RoleChecker(["APPLICANT"])
 #     return applicationCrud.get_all_applications(session)
 
 @router.get("", 
-            response_model=list[ApplicationResponseItem],
+            response_model=list[ApplicationResponseItem] | PaginatedResponse,
             tags=["Applications"],
             summary="List all applications")
 async def list_applications(
-    session: Session = Depends(db.get_session_dep),
+    session: AsyncDbSession = Depends(deps.get_read_session_dep),
     public: Optional[bool] = None,
     status: Optional[List[ApplicationStatus]] = Query(None, description="Filter by one or more statuses."),
+    user_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=listingCrud.MAX_PAGE_SIZE, description="Page size, enables pagination."),
+    cursor: Optional[str] = Query(None, description="`next_cursor` of the previous page."),
+    include_total: bool = Query(False, description="Also count all matching applications."),
     payload: Optional[dict] = Depends(deps.get_current_user_payload_optional)):
     """
     Retrieve all applications in the system.
@@ -111,6 +120,8 @@ async def list_applications(
     - **public**: `true` or `false`. If `true`, only public applications are returned. If `false` or not provided, all applications are returned, if you have the right permissions.
     - **status**: Filter applications by one or more statuses (e.g., `PENDING`, `APPROVED`, `REJECTED`).
     - **user_id**: Filter applications by a specific user ID.
+    - **limit** / **cursor**: Return one page (`PaginatedResponse`) ordered by `created_at`, `form_id`, `id` instead of the whole list.
+    - **include_total**: With pagination, also return the number of all matching applications.
     """
     is_privileged = False
     user_id_in_token = None
@@ -119,64 +130,31 @@ async def list_applications(
         user_id_in_token = payload.get("userid")
         if set(user_roles) & {"ADMIN", "REPORTER"}:
             is_privileged = True
-    if is_privileged:
-
-        if status and public is None:
-            status = [s.upper() for s in status]
-            result = []
-            for s in status:
-                result.extend(applicationCrud.get_applications_all_by_status(session, s))
-                
-            return app_list_to_appResp_list(session, result)
-            
-        if status and not public:
-            status = [s.upper() for s in status]
-            result = []
-            for s in status:
-                result.extend(applicationCrud.get_applications_private_by_status(session, s))
-            return app_list_to_appResp_list(session, result)
-        
-        elif status and public:
-            status = [s.upper() for s in status]
-            result = []
-            for s in status:
-                result.extend(applicationCrud.get_applications_public_by_status(session, s))
-            return app_list_to_appResp_list(session, result)
-        
-        elif public is None:
-            apps = applicationCrud.get_all_applications(session)
-            return app_list_to_appResp_list(session, apps)
-        
-        elif public:
-            apps = applicationCrud.get_all_public_applications(session)
-            return app_list_to_appResp_list(session, apps)
-        
-        elif not public:
-            apps = applicationCrud.get_all_private_applications(session)
-            return app_list_to_appResp_list(session, apps)
-    else:
-        if status and public:
-            status = [s.upper() for s in status]
-            result = []
-            for s in status:
-                result.extend(applicationCrud.get_applications_public_by_status(session, s))
-            return app_list_to_appResp_list(session, result)
-        
-        elif public:
-            applications = applicationCrud.get_all_public_applications(session)
-            return app_list_to_appResp_list(session, applications)
-        
-        else:
-            result = applicationCrud.get_applications_by_user_id(session, user_id_in_token)
-            return app_list_to_appResp_list(session, result)
-        
+
+    filters = listingCrud.ListingFilter(
+        statuses=[str(s).upper() for s in status] if status else None,
+        is_public=public,
+        user_id=user_id,
+    )
+    if not is_privileged and not public:
+        # without admin or reporter role only the own applications are visible
+        if user_id_in_token is None:
+            return []
+        filters.is_public = None
+        filters.user_id = user_id_in_token
+
+    if limit is not None or cursor is not None:
+        return await session.run_sync(app_page_response, filters, limit or listingCrud.DEFAULT_PAGE_SIZE, cursor, include_total)
+
+    return await session.run_sync(lambda s: app_list_to_appResp_list(s, listingCrud.list_applications(s, filters)))
+
 
 @router.post("", response_model=ApplicationID,
             dependencies=[Depends(applicant_permission)],
             tags=["Applications"],
             summary="Create a new application")
 async def create_application( application_data: ApplicationFillout,
-                              session: Session = Depends(db.get_session_dep),
+                              session: AsyncDbSession = Depends(get_async_session_dep),
                               payload: Optional[dict] = Depends(deps.get_current_user_payload_optional)
 
                              ):
@@ -184,22 +162,62 @@ async def create_application( application_data: ApplicationFillout,
     Create a new application in the system.
     """
     user_id = payload.get("userid") 
-    if userCrud.get_user_by_id(user_id, session) == None:
-        raise Exception("User not found")
     form_id = application_data.form_id
     jsonPayload = application_data.payload
     
-    application = createApplication(user_id, form_id, jsonPayload, session)
+    # the verified token proves the user and its roles, no user or role queries needed
+    application = await session.run_sync(lambda s: createApplication(user_id, form_id, jsonPayload, s, claims=payload))
+    db.record_write(user_id)  # their next reads go to the primary, which already has the application
 
     return ApplicationID(id=application.id)
 
 
 
+@router.post("/bulk-status",
+            response_model=list[BulkStatusResult],
+            dependencies=[Depends(admin_permission)],
+            tags=["Applications"],
+            summary="Approve, reject or publish many applications at once")
+async def bulk_update_status(items: list[BulkStatusItem], session: AsyncDbSession = Depends(get_async_session_dep)):
+    """
+    Approve (`APPROVED`), reject (`REJECTED`) or publish (`PUBLIC`) many applications in one transaction.
+
+    Approving and rejecting need a `PENDING` application, publishing an `APPROVED` one; only the newest revision can be changed.
+    Every item gets its own outcome (`UPDATED`, `NOT_FOUND` or `INVALID_TRANSITION`), in the order of the request.
+    """
+    return await session.run_sync(lambda s: adminBulkUpdateStatus(items, s))
+
+
+@router.post("/{form_id}/bulk",
+            response_model=IngestReport,
+            dependencies=[Depends(admin_permission)],
+            tags=["Applications"],
+            summary="Insert many applications of one form from CSV or NDJSON")
+async def ingest_applications(form_id: int, request: Request):
+    """
+    Insert many applications of one form at once, e.g. when migrating from another system.
+
+    - **text/csv**: header `user_id` and the labels of the form's blocks, one application per line
+    - **application/x-ndjson**: one JSON object with `user_id` and the block labels per line
+
+    Rows are validated against the form's blocks. Rejected rows are reported with their errors and don't stop the others.
+    """
+    try:
+        rows = uploads.parse_rows(await request.body(), request.headers.get("content-type", ""))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(e))
+    if len(rows) > applicationIngestService.MAX_ROWS:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"At most {applicationIngestService.MAX_ROWS} applications per upload")
+    # validation and COPY are blocking work on their own connection, keep them off the event loop
+    return await asyncio.to_thread(applicationIngestService.ingest_applications, form_id, rows)
+
+
 @router.get("/{form_id}/{application_id}",
             response_model=ApplicationResponseItem,
             tags=["Applications"],
             summary="Get application by ID")
-async def get_application(application_id: int, form_id: int, session: Session = Depends(db.get_session_dep)):
+async def get_application(application_id: int, form_id: int, session: AsyncDbSession = Depends(deps.get_read_session_dep)):
     """
     Retrieve a specific application by its ID.
     """
@@ -212,22 +230,10 @@ async def get_application(application_id: int, form_id: int, session: Session =
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid application ID format")
 
-    application = applicationCrud.get_application_by_id(session, form_id, app_id)
+    application = await session.run_sync(applicationCrud.get_application_by_id, form_id, app_id)
     if not application:
         raise HTTPException(status_code=404, detail=f"Application with ID {app_id} in form {form_id} not found")
-    app = ApplicationResponseItem(
-            id=application.id,
-            form_id=application.form_id,
-            title=formCrud.get_form_by_id(session, application.form_id).form_name,
-            status=application.status,
-            created_at=application.created_at,
-            is_public=application.is_public,
-            snapshots=application.snapshots,
-            jsonPayload=application.jsonPayload
-            )
-    app.title = formCrud.get_form_by_id(session, form_id).form_name
-    
-    return app
+    return (await session.run_sync(app_list_to_appResp_list, [application]))[0]
 
 class CreationStatus(BaseModel):
     success: bool
@@ -240,11 +246,15 @@ async def update_application(   application_id: int,
                                 form_id: int,
                                 application_update: Optional[ApplicationUpdate] = None,
                                 status: Optional[str] | Optional[ApplicationStatus] = None,
-                                session: Session = Depends(db.get_session_dep),
+                                version: Optional[int] = Query(None, description="Version the status change is based on, 409 if the application has changed since."),
+                                session: AsyncDbSession = Depends(get_async_session_dep),
                                 payload: Optional[dict] = Depends(deps.get_current_user_payload_optional)
                                 ):
     """
     Update a specific application by its ID.
+
+    Edits and status changes are compare-and-swap updates: if the application was changed concurrently
+    (or, with `version` / `application_update.version`, since that version was read) the answer is 409.
     """
     if application_update is None and status is None:
         raise HTTPException(status_code=400, detail="No update data provided, cannot update application with nada. Nothing.")
@@ -264,21 +274,31 @@ async def update_application(   application_id: int,
         try:
             if status == ApplicationStatus.APPROVED:
                 try:
-                    adminApproveApplication(application_id, form_id, session)
+                    await session.run_sync(lambda s: adminApproveApplication(application_id, form_id, s, version))
+                except HTTPException:
+                    raise
                 except Exception as e:
                     raise HTTPException(status_code=500, detail=f"Error approving application: {e}")
             elif status == ApplicationStatus.REJECTED:
                 try:
-                    adminRejectApplication(application_id, form_id, session)
+                    await session.run_sync(lambda s: adminRejectApplication(application_id, form_id, s, version))
+                except HTTPException:
+                    raise
                 except Exception as e:
                     raise HTTPException(status_code=500, detail=f"Error rejecting application: {e}")
             elif status == "PUBLIC" or status == "PUBLISHED":
                 try:
-                    applicationCrud.publish_application(session, form_id, application_id)
+                    await session.run_sync(applicationCrud.publish_application, form_id, application_id, version)
+                except HTTPException:
+                    raise
                 except Exception as e:
                     raise HTTPException(status_code=500, detail=f"Error publishing application: {e}")
             else:
                 raise HTTPException(status_code=400, detail="Invalid status update. Admins can only set status to APPROVED, REJECTED or PUBLIC.")
+        except HTTPException as e:
+            if e.status_code == 409:
+                raise
+            raise HTTPException(status_code=500, detail=f"Error updating application status: {e}")
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error updating application status: {e}")
         return CreationStatus(success=True, message=f"Application status updated to {status}")
@@ -287,15 +307,19 @@ async def update_application(   application_id: int,
     elif is_applicant and application_update is not None:
         jsonPayload = application_update.payload # {1: {"label": "bla", "value": "blup"}}
 
-        application = applicationCrud.get_application_by_id(session, form_id, application_id)
+        application = await session.run_sync(applicationCrud.get_application_by_id, form_id, application_id)
 
         if application.user_id != user_id:
             raise HTTPException(status_code=403, detail="Wrong user_id! Only the user who created an application may edit it!")
 
         try:
-            applicationCrud.update_application(form_id, application_id, jsonPayload, session)
+            await session.run_sync(lambda s: applicationCrud.update_application(form_id, application_id, jsonPayload, s,
+                                                                                 application_update.version))
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error updating application: {e}")
+        db.record_write(user_id)
         return CreationStatus(success=True, message="Application updated successfully")
     
     # -- INVALID COMBINATIONS --
@@ -3,12 +3,10 @@
 from backend.api.deps import RoleChecker
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-
-from backend.core import db
+from backend.core.asyncDb import AsyncDbSession, get_async_session_dep
 from backend.schemas.token import TokenResponse
 from backend.businesslogic.services import authService
-from backend.core.security import create_access_token
+from backend.core.security import HashingOverloaded, create_access_token
 
 # CAN READ ALL
 admin_or_reporter_permission = RoleChecker(["ADMIN", "REPORTER"])
@@ -24,12 +22,19 @@ router = APIRouter()
 @router.post("/auth/token", response_model=TokenResponse, tags=["Auth"])
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    session: Session = Depends(db.get_session_dep)
+    session: AsyncDbSession = Depends(get_async_session_dep)
 ):
     # This calls the business logic to authenticate the user
-    user = authService.authenticate_user(
-        session, form_data.username, form_data.password
-    )
+    try:
+        user = await authService.authenticate_user(
+            session, form_data.username, form_data.password
+        )
+    except HashingOverloaded:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many login attempts in progress, try again shortly",
+            headers={"Retry-After": "1"},
+        )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -0,0 +1,54 @@
+from typing import Optional
+
+from fastapi import APIRouter, Body, Depends, Query
+from sqlalchemy.orm import Session
+
+from backend.api import deps
+from backend.api.deps import RoleChecker
+from backend.businesslogic.services.applicationService import app_list_to_appResp_list
+from backend.core.asyncDb import AsyncDbSession, get_async_session_dep
+from backend.crud import applicationCrud, catalogCrud, queueCrud
+from backend.models.domain.application import ApplicationKey, QueueClaim, QueueRelease
+
+
+router = APIRouter(prefix="/queue", tags=["Review queue"])
+
+admin_permission = RoleChecker(["ADMIN"])
+
+
+def _claim(session: Session, admin_id: int, n: int) -> QueueClaim:
+    entries, until = queueCrud.claim(session, admin_id, n)
+    applications = [applicationCrud.rowToApplication(row) for row in catalogCrud.load_rows(session, entries)]
+    return QueueClaim(lease_expires_at=until, applications=app_list_to_appResp_list(session, applications))
+
+
+@router.post("/claim",
+             response_model=QueueClaim,
+             dependencies=[Depends(admin_permission)],
+             summary="Lease the next pending applications for review")
+async def claim(n: int = Query(20, ge=1, le=queueCrud.QUEUE_MAX_CLAIM, description="How many applications to claim."),
+                session: AsyncDbSession = Depends(get_async_session_dep),
+                payload: dict = Depends(deps.get_current_user_payload)):
+    """
+    Lease up to `n` of the oldest pending applications to the calling admin.
+
+    Applications leased to another admin are skipped until their lease expires, so admins working the queue
+    at the same time never get the same application. Claiming again renews the caller's own leases.
+    Deciding an application (approve / reject) removes it from the queue.
+    """
+    return await session.run_sync(_claim, payload.get("userid"), n)
+
+
+@router.post("/release",
+             response_model=QueueRelease,
+             dependencies=[Depends(admin_permission)],
+             summary="Give leased applications back to the queue")
+async def release(keys: Optional[list[ApplicationKey]] = Body(None, description="Applications to release, all of the caller's if omitted."),
+                  session: AsyncDbSession = Depends(get_async_session_dep),
+                  payload: dict = Depends(deps.get_current_user_payload)):
+    """
+    Release the caller's leases on the given applications, or all of them, so other admins can claim them.
+    """
+    pairs = None if keys is None else [(key.form_id, key.application_id) for key in keys]
+    released = await session.run_sync(queueCrud.release, payload.get("userid"), pairs)
+    return QueueRelease(released=released)
@@ -1,15 +1,16 @@
 
 
 from typing import Optional
-from fastapi import APIRouter, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Query
 from fastapi import Depends 
 
 from backend.models.domain.application import ApplicationResponseItem
-from backend.core import db
+from backend.core.asyncDb import AsyncDbSession
 from backend.api import deps
 from backend.crud.application import get_all_global_revisions_of_type, get_all_revisions_of_application, get_global_revisions
-from backend.businesslogic.services.applicationService import app_list_to_appResp_list
+from backend.businesslogic.services.applicationService import app_list_to_appResp_list, app_page_response
+from backend.crud import listingCrud
+from backend.models.domain.jsonresp import PaginatedResponse
 
 
 router = APIRouter(prefix="/revisions", tags=["Revisions"])
@@ -18,12 +19,15 @@ router = APIRouter(prefix="/revisions", tags=["Revisions"])
 
 
 @router.get("/", 
-            response_model=list[ApplicationResponseItem],
+            response_model=list[ApplicationResponseItem] | PaginatedResponse,
             tags=["Revisions"],
             summary="Get all revisions for all applications")
 async def get_all_revisions(
-    session: Session = Depends(db.get_session_dep),
+    session: AsyncDbSession = Depends(deps.get_read_session_dep),
     form_id : Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=listingCrud.MAX_PAGE_SIZE, description="Page size, enables pagination."),
+    cursor: Optional[str] = Query(None, description="`next_cursor` of the previous page."),
+    include_total: bool = Query(False, description="Also count all matching revisions."),
     payload: Optional[dict] = Depends(deps.get_current_user_payload_optional)):
     is_privileged = False
     user_id_in_token = None
@@ -33,15 +37,18 @@ async def get_all_revisions(
         if set(user_roles) & {"ADMIN", "REPORTER"}:
             is_privileged = True
     if is_privileged:
+        if limit is not None or cursor is not None:
+            filters = listingCrud.ListingFilter(current_only=False, form_id=form_id)
+            return await session.run_sync(app_page_response, filters, limit or listingCrud.DEFAULT_PAGE_SIZE, cursor, include_total)
         if form_id:
             response = []
-            revisions = get_all_global_revisions_of_type(session, form_id)
-            response = app_list_to_appResp_list(session, revisions)
+            revisions = await session.run_sync(get_all_global_revisions_of_type, form_id)
+            response = await session.run_sync(app_list_to_appResp_list, revisions)
             return response
         else:
             response = []
-            revisions = get_global_revisions(session)
-            response = app_list_to_appResp_list(session, revisions)
+            revisions = await session.run_sync(get_global_revisions)
+            response = await session.run_sync(app_list_to_appResp_list, revisions)
             return response
     else:
         raise HTTPException(status_code=403, detail="Not authorized to view global revisions")
@@ -54,7 +61,7 @@ async def get_all_revisions(
             summary="Get all revisions for an application by ID")
 async def get_revisions(form_id: int,
                         application_id: int,
-                        session: Session = Depends(db.get_session_dep),
+                        session: AsyncDbSession = Depends(deps.get_read_session_dep),
                         payload: Optional[dict] = Depends(deps.get_current_user_payload_optional)):
     is_privileged = False
     user_id_in_token = None
@@ -66,15 +73,15 @@ async def get_revisions(form_id: int,
         
         # check if the user id matches the user id of the application
         from backend.crud.application import get_application_by_id
-        wanted_app = get_application_by_id(session, form_id, application_id)
+        wanted_app = await session.run_sync(get_application_by_id, form_id, application_id)
         if wanted_app and wanted_app.user_id == user_id_in_token:
             is_privileged = True
         elif wanted_app and wanted_app.user_id != user_id_in_token and not is_privileged:
             raise HTTPException(status_code=403, detail="Not authorized to view revisions of this application")
         
     if is_privileged:
-        revisions = get_all_revisions_of_application(session, form_id, application_id)
-        response = app_list_to_appResp_list(session, revisions)
+        revisions = await session.run_sync(get_all_revisions_of_application, form_id, application_id)
+        response = await session.run_sync(app_list_to_appResp_list, revisions)
         return response
     else:
             raise HTTPException(status_code=404, detail="Application not found")
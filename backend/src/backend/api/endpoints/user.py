@@ -4,19 +4,22 @@ from typing import Optional
 
 # third party imports
 from backend.api import deps
-from fastapi import APIRouter, Depends, status, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Request, status, HTTPException
+from sqlalchemy.exc import IntegrityError
 
 # project imports
 from backend.api.deps import RoleChecker
-from backend.core.security import hash_password
-from backend.core import db
+from backend.core import uploads
+from backend.core.security import HashingOverloaded, hash_password_async
+from backend.core.asyncDb import AsyncDbSession, get_async_session_dep
 from backend.models import User, UserType
 from backend.crud import userCrud
-from backend.models.domain.user import RoleAssignment, UserCreatePayload, UserID
+from backend.models.domain.user import BulkUserReport, RoleAssignment, UserCreatePayload, UserID
+from backend.businesslogic.services import userImportService
 
 router = APIRouter(prefix="/users", tags=["users"])
 admin_or_reporter_permission = RoleChecker(["ADMIN", "REPORTER"])
+admin_permission = RoleChecker(["ADMIN"])
 
 #TODO: implement following endpoints:
 # - GET users/me
@@ -31,7 +34,8 @@ admin_or_reporter_permission = RoleChecker(["ADMIN", "REPORTER"])
 
 
 @router.get("/me", response_model=User, tags=["Users"], summary="Get current user")
-async def get_current_user(payload: Optional[dict] = Depends(deps.get_current_user_payload_optional)):
+async def get_current_user(payload: Optional[dict] = Depends(deps.get_current_user_payload_optional),
+                           session: AsyncDbSession = Depends(get_async_session_dep)):
     """
     Retrieve the currently authenticated user.
     """
@@ -41,12 +45,11 @@ async def get_current_user(payload: Optional[dict] = Depends(deps.get_current_us
         print("Error retrieving user_id from JWT: ", e)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Your JWT is expired or broken")
     try:
-        with db.get_session() as session:
-            user = userCrud.get_user_by_id(user_id, session)
-            if user:
-                return user
-            else:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        user = await session.run_sync(lambda s: userCrud.get_user_by_id(user_id, s))
+        if user:
+            return user
+        else:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     except Exception as e:
         print(f"Error retrieving user {user_id}: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
@@ -62,14 +65,12 @@ async def update_current_user(user: User):
 
 
 @router.get("", response_model=list[User], tags=["Users"], summary="List all users")
-async def list_users():
+async def list_users(session: AsyncDbSession = Depends(get_async_session_dep)):
     """
     Retrieve all users in the system.
     """
     try:
-        with db.get_session() as session:
-            users = userCrud.get_all_users(session)
-            return users
+        return await session.run_sync(userCrud.get_all_users)
     except Exception as e:
         print(f"Error retrieving users: {e}")
         return []
@@ -83,27 +84,17 @@ async def list_users():
             tags=["Users"],
             summary="Create a new user")
 
-async def create_user(userjson: UserCreatePayload, session: Session = Depends(db.get_session_dep)):
+async def create_user(userjson: UserCreatePayload, session: AsyncDbSession = Depends(get_async_session_dep)):
     """
     Create a new user in the system.
+    Answers 409 if the username or email is already registered.
     """
 
-    # 1 CHECK IF USERNAME OR EMAIL ALREADY EXISTS
     try:
-        userCrud.get_user_by_name(userjson.username, session) # Should raise 404 if username isn't already registered
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Username already registered")
-    except HTTPException as e:
-         if e.status_code != 404:  # 404 = User not found, which we want
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
-
-    try:
-        userCrud.get_user_by_email(userjson.email, session) # Should raise 404 if email isn't already registered
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
-    except HTTPException as e:
-         if e.status_code != 404:  # 404 = Email not found, which we want
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
-
-    hashed_password = hash_password(userjson.password)
+        hashed_password = await hash_password_async(userjson.password)
+    except HashingOverloaded:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Too many requests in progress, try again shortly", headers={"Retry-After": "1"})
     # 2 PREPARE USER OBJECT
     new_user = User(
         username=userjson.username,
@@ -125,8 +116,11 @@ async def create_user(userjson: UserCreatePayload, session: Session = Depends(db
     # 1) Validate and process the user data
     # 2) Hand over session using dependency injection
     # 3) Call the CRUD function to add the user to the database
+    # duplicates are rejected by the unique indexes with a 409, no lookups beforehand
     try:
-        orm_user = userCrud.add_user(session, new_user)
+        orm_user = await session.run_sync(userCrud.add_user, new_user)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error creating user: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
@@ -134,18 +128,47 @@ async def create_user(userjson: UserCreatePayload, session: Session = Depends(db
     return UserID(id=orm_user.id)
 
 
+@router.post("/bulk",
+            response_model=BulkUserReport,
+            dependencies=[Depends(admin_permission)],
+            tags=["Users"],
+            summary="Create many users from CSV or NDJSON")
+async def create_users_bulk(request: Request, session: AsyncDbSession = Depends(get_async_session_dep)):
+    """
+    Create many users at once.
+
+    - **text/csv**: header `username,email,password[,role]`, one user per line
+    - **application/x-ndjson**: one JSON object like the body of `POST /users` per line
+
+    Every row gets its own result: the new user's id or why it wasn't created. Invalid rows don't stop the others.
+    """
+    try:
+        rows = uploads.parse_rows(await request.body(), request.headers.get("content-type", ""))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(e))
+    if len(rows) > userImportService.MAX_ROWS:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"At most {userImportService.MAX_ROWS} users per upload")
+    try:
+        return await userImportService.import_users(session, rows)
+    except IntegrityError:  # a user of the upload was registered concurrently, after the duplicate check
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Users were registered concurrently, retry the upload")
+    except HashingOverloaded:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Too many requests in progress, try again shortly", headers={"Retry-After": "1"})
+
+
 @router.get("/{user_id}", response_model=User, tags=["Users"], summary="Get user by ID")
-async def get_user(user_id: int):
+async def get_user(user_id: int, session: AsyncDbSession = Depends(get_async_session_dep)):
     """
     Retrieve a user by their ID.
     """
     try:
-        with db.get_session() as session:
-            user = userCrud.get_user_by_id(user_id, session)
-            if user:
-                return user
-            else:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        user = await session.run_sync(lambda s: userCrud.get_user_by_id(user_id, s))
+        if user:
+            return user
+        else:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     except Exception as e:
         print(f"Error retrieving user {user_id}: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
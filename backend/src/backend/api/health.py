@@ -1,8 +1,29 @@
 from fastapi import APIRouter, status
 
+from backend.core import asyncDb, db, security
+
 router = APIRouter()
 
 
 @router.get("/health", status_code=status.HTTP_200_OK)
 async def health() -> dict:
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+
+@router.get("/health/hashing", status_code=status.HTTP_200_OK)
+async def hashing_health() -> dict:
+    """
+    Returns the password hashing pool's threads, running and queued hashes and rejected requests
+    """
+    return security.hashing_stats()
+
+
+@router.get("/health/db-pool", status_code=status.HTTP_200_OK)
+async def db_pool_health() -> dict:
+    """
+    Returns the connection pool statistics of the sync engine and, on Postgres, of the async engine
+    """
+    stats = {"sync": db.pool_stats(db.engine)}
+    if asyncDb.supports_async_driver(db.engine):
+        stats["async"] = db.pool_stats(asyncDb.get_async_engine().sync_engine)
+    return stats
@@ -6,7 +6,9 @@ from backend.businesslogic.user import ensure_admin, assign_role
 from sqlalchemy.orm import Session
 from backend.depr_auth import hash_password
 from backend.crud.dbActions import insertRow
-from backend.crud.application import get_application_by_id, updateApplicationStatus
+from backend.crud.application import get_application_by_id, updateApplicationStatus, get_status_rows, apply_status_changes
+from backend.models.domain.application import BulkStatusItem, BulkStatusOutcome, BulkStatusResult
+from backend.core import formRegistry
 
 
 
@@ -26,15 +28,83 @@ def createUser(user: User,id:int, username: str, password: str, role: UserType):
 
 def adminApproveApplication(application_id: int,
                          	form_id: int,
-                          	session: Session) -> bool:
-	updateApplicationStatus(session, form_id, application_id, ApplicationStatus.APPROVED)
+                          	session: Session,
+                          	expected_version: int | None = None) -> bool:
+	updateApplicationStatus(session, form_id, application_id, ApplicationStatus.APPROVED, expected_version)
 	# Logic to save the updated application status is not defined yet
 	return True
 
 
 def adminRejectApplication(application_id: int,
                          	form_id: int,
-                          	session: Session):
-	updateApplicationStatus(session, form_id, application_id, ApplicationStatus.REJECTED)
+                          	session: Session,
+                          	expected_version: int | None = None):
+	updateApplicationStatus(session, form_id, application_id, ApplicationStatus.REJECTED, expected_version)
 	# Logic to save the updated application status is not defined yet
 	return True
+
+
+# target -> statuses an application may have before it
+BULK_TRANSITIONS = {
+	ApplicationStatus.APPROVED: {ApplicationStatus.PENDING},
+	ApplicationStatus.REJECTED: {ApplicationStatus.PENDING},
+	"PUBLIC": {ApplicationStatus.APPROVED},
+}
+
+
+def _transition_error(target: str, status: str, is_public: bool, is_current: bool) -> str | None:
+	if target not in BULK_TRANSITIONS:
+		return "Admins can only set status to APPROVED, REJECTED or PUBLIC"
+	if not is_current:
+		return "Only the newest revision of an application can be decided"
+	if target == "PUBLIC" and is_public:
+		return "Application is already public"
+	if status not in BULK_TRANSITIONS[target]:
+		return f"Can't change a {status} application to {target}"
+	return None
+
+
+def adminBulkUpdateStatus(items: list[BulkStatusItem], session: Session) -> list[BulkStatusResult]:
+	"""
+	Applies many approvals, rejections and publications in the session's transaction.\n
+	Items are grouped by form: one SELECT for the current state and one UPDATE per form (plus one for the catalog).
+	Items are checked in order against the state left by the ones before, so approving and then publishing
+	the same application in one request works.\n
+	Returns one result per item, in the order of items
+	"""
+	results = [BulkStatusResult(form_id=item.form_id, application_id=item.application_id,
+	                            target_status=str(item.target_status), outcome=BulkStatusOutcome.UPDATED)
+	           for item in items]
+	by_form: dict[int, list[BulkStatusResult]] = {}
+	for result in results:
+		by_form.setdefault(result.form_id, []).append(result)
+
+	# look up all tables before the first write, reflecting a table may use a connection of its own
+	for form_id in list(by_form):
+		try:
+			formRegistry.get_form_table(form_id)
+		except KeyError:
+			for result in by_form.pop(form_id):
+				result.outcome, result.detail = BulkStatusOutcome.NOT_FOUND, f"Form {form_id} not found"
+
+	# forms in id order and rows in id order (see get_status_rows), so concurrent requests lock in the same order
+	for form_id in sorted(by_form):
+		form_results = by_form[form_id]
+		state = get_status_rows(session, form_id, sorted({result.application_id for result in form_results}))
+		statuses, published = {}, []
+		for result in form_results:
+			if result.application_id not in state:
+				result.outcome, result.detail = BulkStatusOutcome.NOT_FOUND, "Application not found"
+				continue
+			status, is_public, is_current = state[result.application_id]
+			error = _transition_error(result.target_status, status, is_public, is_current)
+			if error:
+				result.outcome, result.detail = BulkStatusOutcome.INVALID_TRANSITION, error
+			elif result.target_status == "PUBLIC":
+				state[result.application_id] = (status, True, is_current)
+				published.append(result.application_id)
+			else:
+				state[result.application_id] = (result.target_status, is_public, is_current)
+				statuses[result.application_id] = result.target_status
+		apply_status_changes(session, form_id, statuses, published)
+	return results
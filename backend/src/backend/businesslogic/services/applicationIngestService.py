@@ -0,0 +1,148 @@
+"""
+Bulk application ingestion behind POST /applications/{form_id}/bulk and its CLI.
+
+The upload is CSV (header: user_id and the labels of the form's blocks) or NDJSON (one JSON object per line).
+Every row is validated against the form's blocks on its own, a rejected row never stops the others:
+    - user_id is required, every other field must be the label of a block
+    - required blocks must have a value
+    - values are converted to the block's type (INTEGER/NUMBER, FLOAT, DATE, ...)
+The valid rows are inserted as new pending applications, on Postgres with COPY, otherwise with executemany.
+
+Usage:
+    python -m backend.businesslogic.services.applicationIngestService <form_id> <file.csv|file.ndjson>
+
+Environment Variables:
+    BULK_APPLICATIONS_MAX_ROWS: maximum number of rows per upload (default: 50000), the CLI has no limit
+"""
+
+import os
+import sys
+from datetime import date, datetime
+
+from backend.core import db, uploads
+from backend.crud import applicationCrud, formCrud
+from backend.models.domain.application import IngestRejection, IngestReport
+from backend.models.domain.buildingblock import BBType, BuildingBlock
+
+MAX_ROWS = int(os.getenv("BULK_APPLICATIONS_MAX_ROWS", "50000"))
+
+
+def _to_int(value) -> int:
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise ValueError("expected an integer")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError("expected an integer")
+
+
+def _to_float(value) -> float:
+    if isinstance(value, bool):
+        raise ValueError("expected a number")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError("expected a number")
+
+
+def _to_email(value) -> str:
+    value = str(value)
+    if "@" not in value:
+        raise ValueError("expected an email address")
+    return value
+
+
+def _to_date(value) -> date:
+    return date.fromisoformat(str(value))
+
+
+def _to_datetime(value) -> datetime:
+    return datetime.fromisoformat(str(value))
+
+
+_CONVERTERS = {
+    BBType.STRING: str,
+    BBType.TEXT: str,
+    BBType.EMAIL: _to_email,
+    BBType.INTEGER: _to_int,
+    BBType.NUMBER: _to_int,
+    BBType.FLOAT: _to_float,
+    BBType.DATE: _to_date,
+    "DATETIME": _to_datetime,
+}
+
+
+def validate_row(blocks: dict[str, BuildingBlock], row: dict) -> dict:
+    """
+    Takes:\n
+    The form's blocks by label\n
+    One row of the upload\n
+    Returns:\n
+    The column values of the row ("user_id" and one value, maybe None, per block label)\n
+    Raises ValueError with the reason if the row doesn't fit the form
+    """
+    if row.get("user_id") in (None, ""):
+        raise ValueError("Missing user_id")
+    try:
+        values = {"user_id": _to_int(row["user_id"])}
+    except ValueError as e:
+        raise ValueError(f"user_id: {e}")
+    unknown = [key for key in row if key != "user_id" and key not in blocks]
+    if unknown:
+        raise ValueError(f"Unknown field '{unknown[0]}'")
+    for label, block in blocks.items():
+        value = row.get(label)
+        if value is None or value == "":
+            if block.required:
+                raise ValueError(f"Missing required field '{label}'")
+            values[label] = None  # every row has all columns, so the rows can be inserted with executemany
+            continue
+        try:
+            values[label] = _CONVERTERS.get(block.data_type, str)(value)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"{label}: {e}")
+    return values
+
+
+def ingest_applications(form_id: int, rows: list[dict | str]) -> IngestReport:
+    """
+    Takes:\n
+    The form's id\n
+    The parsed rows of the upload (see core.uploads.parse_rows)\n
+    Does:\n
+    Inserts every valid row as a new pending application of the form in one transaction\n
+    Returns:\n
+    The number of inserted rows and the rejected ones with their errors\n
+    Raises HTTPException (404) if the form doesn't exist.
+    Runs synchronously on its own session, the endpoint calls it in a worker thread.
+    """
+    accepted, rejected = [], []
+    with db.get_session() as session:
+        form = formCrud.get_form(session, form_id)
+        blocks = {block.label: block for block in form.blocks.values()}
+        for number, row in enumerate(rows, start=1):
+            if isinstance(row, str):
+                rejected.append(IngestRejection(row=number, error=row))
+                continue
+            try:
+                accepted.append(validate_row(blocks, row))
+            except ValueError as e:
+                rejected.append(IngestRejection(row=number, error=str(e)))
+        if accepted and db.engine.dialect.name != "postgresql":
+            applicationCrud.insert_applications(session, form_id, accepted)
+    if accepted and db.engine.dialect.name == "postgresql":
+        applicationCrud.copy_applications(form_id, accepted)
+    return IngestReport(form_id=form_id, inserted=len(accepted), rejected=rejected)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python -m backend.businesslogic.services.applicationIngestService <form_id> <file>")
+        sys.exit(2)
+    path = sys.argv[2]
+    with open(path, "rb") as upload:
+        parsed = uploads.parse_rows(upload.read(), uploads.content_type_for_path(path))
+    report = ingest_applications(int(sys.argv[1]), parsed)
+    for rejection in report.rejected:
+        print(f"row {rejection.row}: {rejection.error}")
+    print(f"{report.inserted} applications inserted, {len(report.rejected)} rows rejected")
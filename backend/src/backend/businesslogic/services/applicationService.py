@@ -18,14 +18,16 @@ from backend.models import (
 	ApplicationStatus,
 
 )
-from backend.crud import dbActions, application as applicationCrud, formCrud
+from backend.crud import dbActions, application as applicationCrud, formCrud, listingCrud
+from backend.models.domain.jsonresp import PaginatedResponse
 
 
 
-def createApplication(user_id: int, form_id: int, payload: dict, session: Session) -> Application:
-	""" Creates a new application for a user."""
+def createApplication(user_id: int, form_id: int, payload: dict, session: Session, claims: dict | None = None) -> Application:
+	""" Creates a new application for a user.
+	claims: payload of the request's verified token, its roles spare the role query"""
 	# Ensure the user specified in the application has the applicant role
-	if not roleAuth.check_role(session, user_id=user_id, role="APPLICANT"): #TODO
+	if not roleAuth.check_role(session, user_id=user_id, role="APPLICANT", claims=claims):
 		raise HTTPException(status_code=404, detail="User from application not found or is not applicant")
 	# generate application from ApplicationFillout
 	try:
@@ -132,16 +134,38 @@ def listAllPublicApplications(user: User):
 
 
 def app_list_to_appResp_list(session, appList: list[Application]):
+	""" Converts applications to response items, the form titles of all of them are fetched with one query."""
+	titles = formCrud.get_form_names(session, (app.form_id for app in appList))
 	resultList = []
 	for app in appList:
+		if app.form_id not in titles:
+			raise HTTPException(status_code=404, detail="Form not found")
 		resultList.append(ApplicationResponseItem(
 				id=app.id,
 				form_id=app.form_id,
-				title=formCrud.get_form_by_id(session, app.form_id).form_name,
+				title=titles[app.form_id],
 				status=app.status,
 				created_at=app.created_at,
 				is_public=app.is_public,
 				snapshots=app.snapshots,
-				jsonPayload=app.jsonPayload
+				jsonPayload=app.jsonPayload,
+				version=app.version
 				))
-	return resultList
\ No newline at end of file
+	return resultList
+
+
+def app_page_response(session: Session, filters: listingCrud.ListingFilter, limit: int,
+					  cursor: str | None = None, include_total: bool = False) -> PaginatedResponse:
+	""" Returns one keyset paginated page of the applications matching the filters, with the cursor of the next page."""
+	try:
+		page, next_cursor = listingCrud.list_page(session, filters, limit, cursor)
+	except ValueError:
+		raise HTTPException(status_code=400, detail="Invalid cursor")
+	return PaginatedResponse(
+		success=True,
+		message="OK",
+		data=app_list_to_appResp_list(session, page),
+		page_size=limit,
+		next_cursor=next_cursor,
+		total=listingCrud.count_applications(session, filters) if include_total else None,
+	)
@@ -9,19 +9,20 @@ from backend.models import (
 
 # backend/businesslogic/services/authService.py
 
-from sqlalchemy.orm import Session
 from typing import Optional
 
-from backend.core.security import verify_password
+from backend.core.asyncDb import AsyncDbSession
+from backend.core.security import hash_password_async, password_needs_rehash, verify_password_async
 from backend.crud import user as user_crud
 from backend.models.orm.usertable import User as OrmUser
 
-def authenticate_user(session: Session, username: str, password: str) -> Optional[OrmUser]:
+async def authenticate_user(session: AsyncDbSession, username: str, password: str) -> Optional[OrmUser]:
     """
     Authenticates a user by checking their username and password.
+    Hashing runs in the hashing pool, so it may raise security.HashingOverloaded.
 
     Args:
-        session (Session): The database session.
+        session (AsyncDbSession): The database session.
         username (str): The user's username.
         password (str): The user's plain-text password.
 
@@ -29,15 +30,20 @@ def authenticate_user(session: Session, username: str, password: str) -> Optiona
         Optional[OrmUser]: The ORM user object if authentication is successful, otherwise None.
     """
     # 1. Find the user in the database using the CRUD layer
-    user = user_crud.get_user_by_name(username=username, session=session)
+    user = await session.run_sync(lambda s: user_crud.get_user_by_name(username=username, session=s))
     if not user:
         return None # User not found
 
     # 2. Verify the provided password against the stored hash using the security utility
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         return None # Password incorrect
 
-    # 3. If both checks pass, return the user object
+    # 3. Hashes made with older Argon2 parameters are replaced while we know the password
+    if password_needs_rehash(user.hashed_password):
+        user.hashed_password = await hash_password_async(password)
+        await session.run_sync(user_crud.update_password_hash, user.id, user.hashed_password)
+
+    # 4. If both checks pass, return the user object
     return user
 
 
@@ -0,0 +1,77 @@
+"""
+Bulk user provisioning behind POST /users/bulk.
+
+The upload is CSV (header: username,email,password[,role]) or NDJSON (one JSON object per line).
+Every row is validated and reported on its own, an invalid or duplicate row never stops the others:
+    1. rows are validated as UserCreatePayload
+    2. names and emails used twice in the upload, or already registered (one query), are rejected
+    3. the passwords of the remaining rows are hashed in the hashing pool
+    4. users and role assignments are inserted in batches, on Postgres with COPY
+"""
+
+import asyncio
+import os
+
+from pydantic import ValidationError
+
+from backend.core import db, security
+from backend.core.asyncDb import AsyncDbSession
+from backend.crud import userCrud
+from backend.models.domain.user import BulkUserReport, BulkUserResult, UserCreatePayload
+
+# Environment Variables:
+#     BULK_USERS_MAX_ROWS: maximum number of rows per upload (default: 5000)
+MAX_ROWS = int(os.getenv("BULK_USERS_MAX_ROWS", "5000"))
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in e['loc']) or 'row'}: {e['msg']}" for e in error.errors())
+
+
+async def import_users(session: AsyncDbSession, rows: list[dict | str]) -> BulkUserReport:
+    """
+    Creates the users of all valid rows, returns the report with one result per row.
+    Raises security.HashingOverloaded if the hashing pool is saturated.
+    """
+    results = [BulkUserResult(row=number) for number in range(1, len(rows) + 1)]
+    valid: list[tuple[BulkUserResult, UserCreatePayload]] = []
+    for result, row in zip(results, rows):
+        if isinstance(row, str):
+            result.error = row
+            continue
+        result.username = row.get("username") if isinstance(row.get("username"), str) else None
+        try:
+            valid.append((result, UserCreatePayload.model_validate(row)))
+        except ValidationError as e:
+            result.error = _validation_message(e)
+
+    taken_names, taken_emails = await session.run_sync(
+        userCrud.find_taken, [p.username for _, p in valid], [p.email for _, p in valid]
+    )
+    seen_names, seen_emails = set(), set()
+    accepted = []
+    for result, payload in valid:
+        if payload.username in taken_names or payload.username in seen_names:
+            result.error = "Username already in use"
+        elif payload.email in taken_emails or payload.email in seen_emails:
+            result.error = "Email already in use"
+        else:
+            accepted.append((result, payload))
+        seen_names.add(payload.username)
+        seen_emails.add(payload.email)
+
+    if accepted:
+        hashed = await security.hash_passwords_async([payload.password for _, payload in accepted])
+        users = [
+            {"username": p.username, "email": p.email, "hashed_password": h, "role": p.role.value}
+            for (_, p), h in zip(accepted, hashed)
+        ]
+        if db.engine.dialect.name == "postgresql":
+            ids = await asyncio.to_thread(userCrud.copy_users, users)
+        else:
+            ids = await session.run_sync(userCrud.insert_users, users)
+        for (result, _), user_id in zip(accepted, ids):
+            result.id = user_id
+
+    created = sum(1 for result in results if result.id is not None)
+    return BulkUserReport(created=created, failed=len(results) - created, results=results)
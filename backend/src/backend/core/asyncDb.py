@@ -0,0 +1,146 @@
+"""
+Async sessions for the API.
+
+The endpoints are `async def`, so they must not wait for the database on the event loop.
+`get_async_session_dep` yields a session whose methods are awaitable:
+    - Postgres: an `AsyncSession` on an async engine (psycopg's asyncio driver) for the same database as `db.engine`
+    - SQLite (dev mode and tests): a `ThreadedAsyncSession`, which runs a normal session of `db.engine` in worker threads.
+      An in-memory SQLite database only exists inside `db.engine`, so a second (aiosqlite) engine would see an empty database.
+      Its one shared connection is used by one session at a time.
+
+Both expose `run_sync(fn, *args)`, which calls fn(sync_session, *args), so the existing sync crud layer is used unchanged:
+    async def endpoint(session = Depends(asyncDb.get_async_session_dep)):
+        return await session.run_sync(formCrud.get_form, form_id)
+See crud/asyncDbActions.py for the awaitable row primitives.
+On Postgres fn runs on the event loop's thread, work it does through the sync `db.engine` instead of the
+session (schema polls, table reflection, DDL) goes to a worker thread, see core/offload.py.
+The sync path (db.get_session, db.get_session_dep) stays for seeding, CLIs and tests.
+"""
+
+import asyncio
+from typing import AsyncIterator, Callable, TypeVar
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from backend.core import db
+
+T = TypeVar("T")
+
+_async_session_factories: dict[Engine, async_sessionmaker[AsyncSession]] = {}  # per sync engine
+# per single-connection engine and event loop, see ThreadedAsyncSession
+_connection_locks: dict[tuple[Engine, asyncio.AbstractEventLoop], asyncio.Lock] = {}
+
+
+def _connection_lock(engine: Engine) -> asyncio.Lock:
+    key = (engine, asyncio.get_running_loop())
+    lock = _connection_locks.get(key)
+    if lock is None:
+        lock = _connection_locks[key] = asyncio.Lock()
+    return lock
+
+
+class ThreadedAsyncSession:
+    """
+    Awaitable wrapper around a sync Session for databases without an async driver.\n
+    Every call runs in a worker thread, one at a time, so the session is never used concurrently.\n
+    On an engine with a single shared connection (StaticPool, the in-memory dev database) sessions take turns:
+    a session waits for the connection at its first call and keeps it until it is closed,
+    so requests never see, commit or roll back each other's writes.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+        self._connection_lock: asyncio.Lock | None = None  # held while this session owns the shared connection
+
+    async def _take_shared_connection(self) -> None:
+        if self._connection_lock is not None:
+            return
+        engine = self.sync_session.get_bind()
+        if isinstance(engine.pool, StaticPool):
+            lock = _connection_lock(engine)
+            await lock.acquire()
+            self._connection_lock = lock
+
+    async def run_sync(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        await self._take_shared_connection()
+        return await asyncio.to_thread(fn, self.sync_session, *args, **kwargs)
+
+    async def commit(self) -> None:
+        await asyncio.to_thread(self.sync_session.commit)
+
+    async def rollback(self) -> None:
+        await asyncio.to_thread(self.sync_session.rollback)
+
+    async def close(self) -> None:
+        try:
+            await asyncio.to_thread(self.sync_session.close)
+        finally:
+            if self._connection_lock is not None:
+                self._connection_lock.release()
+                self._connection_lock = None
+
+
+AsyncDbSession = AsyncSession | ThreadedAsyncSession  # what get_async_session_dep yields
+
+
+def supports_async_driver(engine: Engine) -> bool:
+    """
+    Returns True if the engine's database is reached through an asyncio driver (only Postgres via psycopg)
+    """
+    return engine.dialect.name == "postgresql"
+
+
+def get_async_engine(engine: Engine | None = None) -> AsyncEngine:
+    """
+    Returns the async engine for the database of engine (default: db.engine), creating it on first use.\n
+    Raises ValueError for databases without an async driver.
+    """
+    return _async_session_factory(engine or db.engine).kw["bind"]
+
+
+def _async_session_factory(engine: Engine) -> async_sessionmaker[AsyncSession]:
+    factory = _async_session_factories.get(engine)
+    if factory is None:
+        if not supports_async_driver(engine):
+            raise ValueError(f"No async driver for {engine.dialect.name}")
+        # the psycopg dialect picks its asyncio variant under create_async_engine
+        async_engine = create_async_engine(engine.url, echo=engine.echo, poolclass=db.TimedAsyncQueuePool,
+                                           **db.pool_settings())
+        factory = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+        _async_session_factories[engine] = factory
+    return factory
+
+
+def make_async_session(engine: Engine | None = None) -> AsyncDbSession:
+    """
+    Returns a new awaitable session for the database of engine (default: db.engine),
+    e.g. make_async_session(db.get_read_engine()) for read-only work
+    """
+    engine = engine or db.engine
+    if supports_async_driver(engine):
+        return _async_session_factory(engine)()
+    return ThreadedAsyncSession(db.SessionLocal(bind=engine))
+
+
+async def get_async_session_dep() -> AsyncIterator[AsyncDbSession]:
+    """
+    FastAPI dependency, the async counterpart of db.get_session_dep.
+
+    Example:
+        async def func(session = Depends(get_async_session_dep), ...):
+            user = await asyncDbActions.getRowById(session, OrmUser, user_id)
+
+    Commits if the request succeeded, rolls back otherwise and always closes the session.
+    """
+    session = make_async_session()
+    try:
+        yield session
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
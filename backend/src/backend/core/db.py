@@ -1,16 +1,23 @@
 # Standard library imports
+import logging
 import os
+import threading
+import time
 from contextlib import contextmanager
 from typing import Iterator
 import dotenv
 from contextlib import contextmanager
 # Third-party imports
 import psycopg
-from sqlalchemy import MetaData, create_engine, text
+from sqlalchemy import MetaData, create_engine, exc, text
 from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker, Session, registry
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
 from sqlalchemy.ext.automap import automap_base
 
+from backend.core import schemaVersion
+from backend.core.cache import LRUCache
+
 
 dotenv.load_dotenv()
 
@@ -76,6 +83,78 @@ def get_connection():
 #         return create_engine(url, echo=True)  # echo=True logs SQL statements
 
 
+# -------- Connection pool --------
+class _WaitTimingMixin:
+    """
+    Records how long checkouts spend getting a connection from the pool
+    (waiting for a free one or opening a new one) and how many timed out.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._wait_lock = threading.Lock()
+        self.wait_stats = {"checkouts": 0, "timeouts": 0, "total_wait_ms": 0.0, "max_wait_ms": 0.0}
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            with self._wait_lock:
+                self.wait_stats["timeouts"] += 1
+            raise
+        waited = (time.perf_counter() - start) * 1000
+        with self._wait_lock:
+            self.wait_stats["checkouts"] += 1
+            self.wait_stats["total_wait_ms"] += waited
+            self.wait_stats["max_wait_ms"] = max(self.wait_stats["max_wait_ms"], waited)
+        return connection
+
+
+class TimedQueuePool(_WaitTimingMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_WaitTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_settings() -> dict:
+    """
+    Returns the create_engine arguments for the connection pool.
+    Environment Variables:
+        DB_POOL_SIZE: connections kept open (default: 5)
+        DB_MAX_OVERFLOW: connections opened beyond DB_POOL_SIZE under load (default: 10)
+        DB_POOL_TIMEOUT: seconds to wait for a free connection before failing (default: 30)
+        DB_POOL_RECYCLE: seconds after which a connection is replaced (default: 1800, -1 disables)
+        DB_POOL_PRE_PING: 1 checks connections before use to drop dead ones (default: 1)
+    """
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "1").strip().lower() in {"1", "true", "yes", "y"},
+    }
+
+
+def pool_stats(engine: Engine) -> dict:
+    """
+    Returns the state of the engine's connection pool: size, checked out and overflow connections
+    and, for the timed pools, checkout wait times in milliseconds.
+    """
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(size=pool.size(), checked_out=pool.checkedout(), checked_in=pool.checkedin(), overflow=pool.overflow())
+    wait_stats = getattr(pool, "wait_stats", None)
+    if wait_stats is not None:
+        with pool._wait_lock:
+            stats.update(wait_stats)
+        stats["avg_wait_ms"] = stats["total_wait_ms"] / stats["checkouts"] if stats["checkouts"] else 0.0
+    return stats
+
+
 # -------- Engine creation --------
 def get_engine() -> Engine:
     """
@@ -90,6 +169,10 @@ def get_engine() -> Engine:
             echo=echo,
             future=True,
             connect_args={"check_same_thread": False},
+            # one connection for all threads: sessions of the async endpoints run in worker threads (see core.asyncDb)
+            # and every new connection to :memory: would be a new, empty database.
+            # The async sessions take turns on it (see asyncDb.ThreadedAsyncSession)
+            poolclass=StaticPool,
         )
     else:
         url_env = os.getenv("DATABASE_URL")
@@ -110,16 +193,92 @@ def get_engine() -> Engine:
             url,
             echo=echo,
             future=True,
-            pool_pre_ping=True,       # drops dead conns
-            pool_recycle=1800,        # refresh every 30 min
+            poolclass=TimedQueuePool,
+            **pool_settings(),
         )
 
 engine = get_engine()
 
-# -------- Session factory (no globals leaked) --------
+# -------- Read replica --------
+def get_replica_engine() -> Engine | None:
+    """
+    Engine for a read-only copy of the primary database, None if there is none.
+    Environment Variables:
+        DATABASE_REPLICA_URL: URL of the replica, e.g. postgresql://user:pw@replica:5432/civitas (default: unset)
+    Uses the same pool settings as the primary.
+    """
+    url_env = os.getenv("DATABASE_REPLICA_URL")
+    if not url_env:
+        return None
+    echo = os.getenv("ECHO_SQL", "").strip() in {"1", "true", "yes"}
+    u = make_url(url_env)
+    if u.drivername == "postgresql":
+        u = u.set(drivername="postgresql+psycopg")
+    if u.get_backend_name() == "sqlite":
+        return create_engine(u, echo=echo, future=True, connect_args={"check_same_thread": False})
+    return create_engine(u, echo=echo, future=True, poolclass=TimedQueuePool, **pool_settings())
+
+replica_engine: Engine | None = get_replica_engine()
+
+# Environment Variables:
+#     REPLICA_HEALTH_INTERVAL: seconds a replica health check result is trusted (default: 5)
+#     READ_YOUR_WRITES_SECONDS: seconds after a write during which the writer reads from the primary (default: 10)
+REPLICA_HEALTH_INTERVAL = float(os.getenv("REPLICA_HEALTH_INTERVAL", "5"))
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))
+_replica_health: dict[Engine, tuple[bool, float]] = {}  # replica -> (healthy, time.monotonic() of the check)
+_recent_writers = LRUCache(10_000)  # user ids which wrote within READ_YOUR_WRITES_SECONDS (in this process)
+
+logger = logging.getLogger(__name__)
+
+
+def replica_is_healthy(replica: Engine) -> bool:
+    """
+    Returns whether the replica answers a SELECT 1, checking at most once per REPLICA_HEALTH_INTERVAL
+    """
+    healthy, checked_at = _replica_health.get(replica, (False, float("-inf")))
+    now = time.monotonic()
+    if now - checked_at < REPLICA_HEALTH_INTERVAL:
+        return healthy
+    try:
+        with replica.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        healthy = True
+    except Exception:
+        logger.warning("Read replica is unreachable, reading from the primary", exc_info=True)
+        healthy = False
+    _replica_health[replica] = (healthy, now)
+    return healthy
+
+
+def record_write(user_id: int | None) -> None:
+    """
+    Marks that the user just wrote, so their reads go to the primary for READ_YOUR_WRITES_SECONDS
+    and see the write even if the replica lags behind.
+    """
+    if user_id is not None:
+        _recent_writers.put(user_id, True, expires_at=time.time() + READ_YOUR_WRITES_SECONDS)
+
+
+def get_read_engine(user_id: int | None = None) -> Engine:
+    """
+    Returns the engine read-only work of the given user should use:
+    the replica if one is configured and healthy and the user didn't just write, otherwise the primary.
+    """
+    if replica_engine is None:
+        return engine
+    if user_id is not None and user_id in _recent_writers:
+        return engine
+    if not replica_is_healthy(replica_engine):
+        return engine
+    return replica_engine
+
+# -------- Session factory --------
 def make_session_factory(engine: Engine) -> sessionmaker[Session]:
     return sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False, future=True)
 
+# Built once; the engine is passed per session, so tests can still swap db.engine
+SessionLocal = sessionmaker(autoflush=False, autocommit=False, expire_on_commit=False, future=True)
+
 
 
 # Optional raw psycopg for health/COPY
@@ -160,9 +319,7 @@ def get_session_dep():
     rolls back on error, and always closes the session. It is designed to be used as a dependency in frameworks
     that support generator-based dependencies, ensuring proper transaction handling and resource cleanup.
     """
-    # Removed engine creation to avoid global state issues and improve performance
-    SessionLocal = make_session_factory(engine)
-    s = SessionLocal()
+    s = SessionLocal(bind=engine)
     try:
         yield s
         s.commit()
@@ -189,8 +346,7 @@ def get_session():
         - Rolls back if an exception occurs.
         - Always closes the session at the end.
     """
-    SessionLocal = make_session_factory(engine)
-    s = SessionLocal()
+    s = SessionLocal(bind=engine)
     try:
         yield s
         s.commit()  
@@ -206,15 +362,21 @@ def get_base( reload: bool = False):
     """
     Returns an automap Base bound to the given engine.
     If reload=True, rebuilds the base (useful after schema changes).
+    Without reload the cached base is rebuilt only if any worker recorded a schema change
+    since it was built (see core.schemaVersion).
     """
     global _BaseCache
 
+    watcher = schemaVersion.get_watcher(engine)
+    schema_version = watcher.poll()
     if not reload and engine in _BaseCache:
-        return _BaseCache[engine]
+        Base, cached_version = _BaseCache[engine]
+        if cached_version == schema_version:
+            return Base
 
     Base = automap_base()
     Base.prepare(autoload_with=engine)  # SQLAlchemy >=1.4
-    _BaseCache[engine] = Base
+    _BaseCache[engine] = (Base, schema_version)
     return Base
 
 
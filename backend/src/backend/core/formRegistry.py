@@ -0,0 +1,303 @@
+"""
+In-process registry of the dynamically created `form_<id>` application tables.
+
+Every form owns one application table whose columns depend on the form's blocks.
+Instead of reflecting the whole database through `db.get_base(True)` on every lookup,
+the registry reflects a single table the first time it is requested and keeps the
+mapped class together with its column layout. Tables changed by other workers are
+dropped from the registry through `core.schemaVersion`.
+
+Usage:
+    entry = formRegistry.get_form_table(form_id)
+    entry.table_class    # mapped ORM class of form_<id>
+    entry.block_columns  # payload columns in table order
+"""
+
+import threading
+from dataclasses import dataclass
+from functools import cached_property
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.automap import automap_base
+from sqlalchemy.orm import Session
+
+from backend.core import db, offload, schemaVersion
+
+
+# Columns every application table has, everything else is a block (payload) column
+STANDARD_COLUMNS = ("id", "user_id", "form_id", "admin_id", "status", "created_at",
+                    "previous_snapshot_id", "current_snapshot_id", "next_snapshot_id", "is_public", "version")
+
+
+def form_table_name(form_id: int) -> str:
+    return "form_" + str(form_id)
+
+
+def form_id_from_table_name(table_name: str) -> int | None:
+    """
+    Returns the form id of a form_<id> table name, None for any other table
+    """
+    prefix, _, suffix = table_name.partition("_")
+    if prefix != "form" or not suffix.isdigit():
+        return None
+    return int(suffix)
+
+
+@dataclass(frozen=True)
+class FormTableEntry:
+    """
+    form_id: id of the form the table belongs to
+    table_class: mapped ORM class of the table
+    columns: all column names in table order
+    block_columns: columns which are not in STANDARD_COLUMNS, in table order
+    version: registry version at which this entry was loaded
+    schema_version: schema version (see core.schemaVersion) the entry is known to match
+    codec: compiled decoder of the table's rows
+    """
+    form_id: int
+    table_class: type
+    columns: tuple[str, ...]
+    block_columns: tuple[str, ...]
+    version: int
+    schema_version: int = 0
+
+    @cached_property
+    def codec(self):
+        """
+        The compiled `rowCodec.RowCodec` of the table, built on first use
+        """
+        from backend.core.rowCodec import RowCodec  # avoid circular import
+        table = self.table_class.__table__
+        return RowCodec(self.columns, self.block_columns, {name: table.c[name].type for name in self.block_columns})
+
+
+class FormTableRegistry:
+    """
+    Maps form ids to their application table classes for exactly one engine.
+    Entries are loaded lazily, only the requested table is ever reflected.
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.version = 0
+        self.schema_version: int | None = None  # newest schema change applied to the entries
+        self._entries: dict[int, FormTableEntry] = {}
+        self._form_ids: set[int] | None = None  # ids of all existing form tables, listed lazily
+        self._lock = threading.RLock()
+
+    def _make_entry(self, form_id: int, table_class: type, schema_version: int) -> FormTableEntry:
+        columns = tuple(c.key for c in inspect(table_class).columns)
+        block_columns = tuple(c for c in columns if c not in STANDARD_COLUMNS)
+        return FormTableEntry(
+            form_id=form_id,
+            table_class=table_class,
+            columns=columns,
+            block_columns=block_columns,
+            version=self.version,
+            schema_version=schema_version,
+        )
+
+    def sync(self) -> None:
+        """
+        Drops the entries whose tables were changed by any worker since they were loaded.
+        Polls the schema_change table at most every SCHEMA_POLL_INTERVAL seconds.
+        """
+        watcher = schemaVersion.get_watcher(self.engine)
+        latest = watcher.poll()
+        if latest == self.schema_version:
+            return
+        with self._lock:
+            changes = watcher.changes_since(self.schema_version) if self.schema_version is not None else []
+            if changes is None:
+                self._entries.clear()
+                self._form_ids = None
+                self.version += 1
+            else:
+                for version, table_name in changes:
+                    form_id = form_id_from_table_name(table_name)
+                    if form_id is not None and self._form_ids is not None:
+                        self._form_ids.add(form_id)
+                    entry = self._entries.get(form_id)
+                    if entry is not None and version > entry.schema_version:
+                        del self._entries[form_id]
+                        self.version += 1
+            self.schema_version = latest
+
+    def _reflect(self, form_id: int) -> type | None:
+        tablename = form_table_name(form_id)
+        Base = automap_base()
+        Base.prepare(autoload_with=self.engine, reflection_options={"only": [tablename]})
+        return Base.classes.get(tablename)
+
+    def _up_to_date(self) -> bool:
+        """
+        Returns whether sync would neither query the database nor change the entries
+        """
+        watcher = schemaVersion.get_watcher(self.engine)
+        return not watcher.due() and watcher.version == self.schema_version
+
+    def get(self, form_id: int) -> FormTableEntry:
+        """
+        Returns the entry of the given form, reflecting its table on first access.
+        Raises KeyError if the table doesn't exist.
+        """
+        entry = self._entries.get(form_id)
+        if entry is not None and self._up_to_date():
+            return entry
+        # polling and reflecting use db.engine, off the event loop when called from an async session
+        return offload.run_blocking(self._load, form_id)
+
+    def _load(self, form_id: int) -> FormTableEntry:
+        self.sync()
+        entry = self._entries.get(form_id)
+        if entry is not None:
+            return entry
+        with self._lock:
+            entry = self._entries.get(form_id)
+            if entry is not None:
+                return entry
+            schema_version = self.schema_version or 0
+            try:
+                table_class = self._reflect(form_id)
+            except InvalidRequestError:
+                # reflection with only=[...] raises when the table is missing
+                table_class = None
+            if table_class is None:
+                if self._form_ids is not None:
+                    self._form_ids.discard(form_id)
+                raise KeyError(form_table_name(form_id))
+            self.version += 1
+            entry = self._make_entry(form_id, table_class, schema_version)
+            self._entries[form_id] = entry
+            return entry
+
+    def register(self, form_id: int, table_class: type, schema_version: int = 0) -> FormTableEntry:
+        """
+        Registers a freshly created table class, replacing any previous entry.
+        schema_version is the version returned by `schemaVersion.record_schema_change` for this table,
+        so the registry doesn't drop the entry again when it sees its own change.
+        """
+        with self._lock:
+            self.version += 1
+            entry = self._make_entry(form_id, table_class, schema_version)
+            self._entries[form_id] = entry
+            if self._form_ids is not None:
+                self._form_ids.add(form_id)
+            return entry
+
+    def refresh(self, form_id: int) -> FormTableEntry:
+        """
+        Reloads the entry of the given form from the database.
+        """
+        return offload.run_blocking(self._refresh, form_id)
+
+    def _refresh(self, form_id: int) -> FormTableEntry:
+        with self._lock:
+            self._entries.pop(form_id, None)
+            return self._load(form_id)
+
+    def invalidate(self, form_id: int | None = None) -> None:
+        """
+        Drops the entry of the given form (or all entries), it is reloaded on next access.
+        """
+        with self._lock:
+            self.version += 1
+            if form_id is None:
+                self._entries.clear()
+                self._form_ids = None
+            else:
+                self._entries.pop(form_id, None)
+
+    def known_form_ids(self) -> list[int]:
+        """
+        Returns the ids of the forms whose entries are currently loaded
+        """
+        return sorted(self._entries.keys())
+
+    def all_form_ids(self) -> list[int]:
+        """
+        Returns the ids of all forms which have an application table.
+        The table names are listed once, afterwards the set is kept up to date by register and sync.
+        """
+        form_ids = self._form_ids
+        if form_ids is not None and self._up_to_date():
+            return sorted(form_ids)
+        return offload.run_blocking(self._load_form_ids)
+
+    def _load_form_ids(self) -> list[int]:
+        self.sync()
+        if self._form_ids is None:
+            with self._lock:
+                if self._form_ids is None:
+                    table_names = inspect(self.engine).get_table_names()
+                    form_ids = (form_id_from_table_name(name) for name in table_names)
+                    self._form_ids = {form_id for form_id in form_ids if form_id is not None}
+        return sorted(self._form_ids)
+
+
+_registries: dict[Engine, FormTableRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_registry() -> FormTableRegistry:
+    """
+    Returns the registry for the currently configured `db.engine`.
+    """
+    engine = db.engine
+    registry = _registries.get(engine)
+    if registry is None:
+        with _registries_lock:
+            registry = _registries.get(engine)
+            if registry is None:
+                registry = FormTableRegistry(engine)
+                _registries[engine] = registry
+    return registry
+
+
+def get_form_table(form_id: int) -> FormTableEntry:
+    """
+    Returns the registry entry of the form's application table.
+    Raises KeyError if the table doesn't exist.
+    """
+    return get_registry().get(int(form_id))
+
+
+def get_all_form_tables() -> list[FormTableEntry]:
+    """
+    Returns the entries of all form tables, ordered by form id
+    """
+    registry = get_registry()
+    entries = []
+    for form_id in registry.all_form_ids():
+        try:
+            entries.append(registry.get(form_id))
+        except KeyError:
+            continue  # table was dropped in the meantime
+    return entries
+
+
+_tables_on_replica: dict[Engine, set[str]] = {}  # per replica engine: names of the tables known to exist there
+
+
+def present_form_tables(session: Session, entries: list[FormTableEntry]) -> list[FormTableEntry]:
+    """
+    Drops the entries whose table doesn't exist yet on the session's database.\n
+    The registry is loaded from the primary, a replica may not have replayed a new form's table yet
+    """
+    bind = session.get_bind()
+    if bind is db.engine or bind.url == db.engine.url:
+        return entries
+    known = _tables_on_replica.setdefault(bind, set())
+    if any(entry.table_class.__tablename__ not in known for entry in entries):
+        known.update(inspect(session.connection()).get_table_names())
+    return [entry for entry in entries if entry.table_class.__tablename__ in known]
+
+
+def register_form_table(form_id: int, table_class: type, schema_version: int = 0) -> FormTableEntry:
+    return get_registry().register(int(form_id), table_class, schema_version)
+
+
+def refresh_form_table(form_id: int) -> FormTableEntry:
+    return get_registry().refresh(int(form_id))
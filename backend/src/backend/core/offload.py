@@ -0,0 +1,31 @@
+"""
+Blocking database work reached from inside `AsyncSession.run_sync`.
+
+On Postgres the async endpoints call the sync crud layer through `AsyncSession.run_sync` (see core.asyncDb),
+which runs it on the event loop's thread: the session's own queries are awaited under the hood, but anything
+going through the sync `db.engine` instead (schema polls, table reflection, DDL) would block the event loop.
+`run_blocking` hands such work to a worker thread and suspends the calling code until it is done.
+Outside of run_sync (sync sessions, ThreadedAsyncSession, CLIs) it simply calls the function.
+
+Work handed over must acquire its locks itself, in the worker thread: a lock taken on the event loop's
+thread around run_blocking would block every other request waiting for it.
+
+Usage:
+    table_names = offload.run_blocking(lambda: inspect(db.engine).get_table_names())
+"""
+
+import asyncio
+from typing import Callable, TypeVar
+
+from sqlalchemy.util.concurrency import await_only, in_greenlet
+
+T = TypeVar("T")
+
+
+def run_blocking(fn: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Returns fn(*args, **kwargs), computed in a worker thread when called from inside AsyncSession.run_sync
+    """
+    if in_greenlet():
+        return await_only(asyncio.to_thread(fn, *args, **kwargs))
+    return fn(*args, **kwargs)
@@ -1,7 +1,9 @@
+import logging
 from datetime import date
 from typing import Any, Type
 
-from sqlalchemy import Column, Date, Integer, String, Boolean, Enum
+from sqlalchemy import Column, Date, Integer, String, Boolean, Enum, inspect
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from sqlalchemy.orm import DeclarativeBase
 
@@ -12,6 +14,8 @@ from backend.models.domain.user import RoleAssignment as DomainRoleAssignment
 
 # Any Ideas for filename? -ps
 
+logger = logging.getLogger(__name__)
+
 
 
 
@@ -22,8 +26,30 @@ class SchemaBase(DeclarativeBase):
    pass
 
 
+def ensure_indexes():
+    """
+    Creates the indexes of the user and role tables which are missing in already existing dbs.\n
+    A unique index can't be created while the table holds duplicates, those are logged and skipped.
+    """
+    from backend.models.orm.roletable import OrmRoleAssignment # avoid circular import
+    from backend.models.orm.usertable import OrmUser
+
+    existing_tables = inspect(db.engine).get_table_names()
+    for table in (OrmRoleAssignment.__table__, OrmUser.__table__):
+        if table.name in existing_tables:
+            for index in table.indexes:
+                try:
+                    index.create(bind=db.engine, checkfirst=True)
+                except IntegrityError:
+                    logger.warning("Could not create unique index %s, %s contains duplicates", index.name, table.name)
+
+
 def user_db_setup():
-    from backend.crud import dbActions # avoid circular import
+    from backend.crud import dbActions, catalogCrud, migrateSnapshots # avoid circular import
+
+    catalogCrud.ensure_catalog_table()  # cross-form catalog, also needed by already existing dbs
+    migrateSnapshots.migrate_form_tables()  # JSON snapshots column -> snapshot id columns
+    ensure_indexes()  # indexes added after the tables of already existing dbs were created
 
 
     # This ensures that we always know when the tables already exist
@@ -40,15 +66,15 @@ def user_db_setup():
         return  # Tables already exist in metadata
     orm_user_columns = {
         "id": Column(Integer, primary_key=True),
-        "user_name": Column(String, nullable=False),
+        "user_name": Column(String, nullable=False, unique=True, index=True),
         "creation_date": Column(Date, nullable=False),
-        "email": Column(String, nullable=True),
+        "email": Column(String, nullable=True, unique=True, index=True),
         "password": Column(String, nullable=False),
         "is_active": Column(Boolean, nullable=False, default=1),  # 1 for active, 0 for inactive
         }
     role_assignment_columns = {
         "id": Column(Integer, primary_key=True),
-        "user_id": Column(Integer, nullable=False),
+        "user_id": Column(Integer, nullable=False, index=True),
         "assignment_date": Column(Date, nullable=False),
         "role": Column(Enum(UserType), nullable=False),
     }
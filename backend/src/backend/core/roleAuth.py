@@ -1,32 +1,81 @@
-from backend.models.orm import roletable
+"""
+Role resolution for the business logic.
+
+Two sources for a user's roles:
+    - "token": the roles claim of the verified JWT of the request, which costs no query.
+      Callers pass the token payload as `claims`; it is only trusted for the user it was issued to.
+    - "db": the role_assignment table, cached per user for ROLE_CACHE_TTL seconds.
+      crud.role.add_role_assignment invalidates the user's entry.
+Without claims (or with ROLE_SOURCE=db) the cached table lookup is used.
 
+Environment Variables:
+    ROLE_SOURCE: "token" or "db" (default: token). With "token" a revoked role stays in effect until the token expires.
+    ROLE_CACHE_TTL: seconds a user's roles are cached (default: 60)
+    ROLE_CACHE_SIZE: number of users whose roles are cached per engine (default: 10000)
+"""
 
+import os
+import time
 
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
 
+from backend.core import db
+from backend.core.cache import LRUCache
+from backend.models.orm import roletable
+
 
+ROLE_SOURCE = os.getenv("ROLE_SOURCE", "token").strip().lower()
+ROLE_CACHE_TTL = float(os.getenv("ROLE_CACHE_TTL", "60"))
+ROLE_CACHE_SIZE = int(os.getenv("ROLE_CACHE_SIZE", "10000"))
 
+_role_caches: dict[Engine, LRUCache] = {}  # per engine: user_id -> frozenset of role names
 
 
+def _role_cache() -> LRUCache:
+    cache = _role_caches.get(db.engine)
+    if cache is None:
+        cache = _role_caches[db.engine] = LRUCache(ROLE_CACHE_SIZE)
+    return cache
 
 
-def check_role(session: Session, user_id: int, role: str)-> bool:
+def invalidate_user_roles(user_id: int) -> None:
+    """
+    Drops the cached roles of the user, call after changing their role assignments
+    """
+    _role_cache().invalidate(user_id)
+
+
+def get_user_roles(session: Session, user_id: int) -> frozenset[str]:
+    """
+    Takes:\n
+    The session\n
+    The user's id\n
+    Returns:\n
+    The names of the user's roles ("ADMIN", "APPLICANT", "REPORTER"), from the cache if possible
+    """
+    cache = _role_cache()
+    roles = cache.get(user_id)
+    if roles is None:
+        stored = session.scalars(
+            select(roletable.OrmRoleAssignment.role).where(roletable.OrmRoleAssignment.user_id == user_id)
+        ).all()
+        roles = frozenset(getattr(role, "value", role) for role in stored)
+        cache.put(user_id, roles, expires_at=time.time() + ROLE_CACHE_TTL)
+    return roles
+
+
+def check_role(session: Session, user_id: int, role: str, claims: dict | None = None) -> bool:
     """
     Args:
         session(Session):
         user_id(int): id of user whose role to check
-        role(str): "ADMIN", "APPLICANT" or "REPORTER" 
+        role(str): "ADMIN", "APPLICANT" or "REPORTER"
+        claims(dict | None): payload of the request's verified token, used instead of a query if it belongs to user_id
     Returns:
         True or False based on whether or not the user has the specified role.
     """
-    orm_role_assignments =  roletable.get_user_roles_by_id(user_id=user_id, session=session)
-    domain_role_assignments = []
-    for orm_role_assignment in orm_role_assignments:
-        domain_role_assignments.append(roletable.to_domain_model(orm_role_assignment))
-    if domain_role_assignments == []:
-        Exception("No role assignments found")
-    for role_assignment in domain_role_assignments:
-        if role_assignment:
-            return True
-    return False
-
+    if ROLE_SOURCE == "token" and claims is not None and claims.get("userid") == user_id:
+        return role in claims.get("roles", [])
+    return role in get_user_roles(session, user_id)
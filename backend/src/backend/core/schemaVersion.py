@@ -0,0 +1,185 @@
+"""
+Cross-worker schema change tracking.
+
+Every uvicorn worker keeps its own caches of reflected tables (`db.get_base`, `formRegistry`).
+Whenever a worker changes the schema of a table, it appends a row to the small `schema_change`
+table. Other workers poll that table (at most once every SCHEMA_POLL_INTERVAL seconds) and drop
+only the cached tables which were changed since they last looked.
+
+The ids of schema_change rows written by concurrent transactions can commit out of order (a Postgres
+sequence hands them out before the commit). So a poll not only asks for ids above the highest one seen,
+but also for the ids below it which were still missing, until they show up or are given up on.
+
+Environment Variables:
+    SCHEMA_POLL_INTERVAL: seconds between two polls of the schema_change table (default: 1.0),
+                          0 polls on every access
+"""
+
+import os
+import threading
+import time
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, insert, select
+from sqlalchemy.engine import Engine
+
+from backend.core import offload
+
+
+schema_change_table = Table(
+    "schema_change",
+    MetaData(),
+    Column("id", Integer, primary_key=True),  # doubles as the global schema version
+    Column("table_name", String, nullable=False),
+    Column("changed_at", DateTime, server_default=func.current_timestamp(), nullable=False),
+)
+
+
+_MAX_LOG = 10_000  # remembered changes per process
+_GAP_WINDOW = 100  # at most this many missing ids below the highest one are looked for
+_GAP_TIMEOUT = 60.0  # seconds after which a missing id counts as rolled back, recording a change takes milliseconds
+
+
+def _poll_interval() -> float:
+    try:
+        return float(os.getenv("SCHEMA_POLL_INTERVAL", "1.0"))
+    except ValueError:
+        return 1.0
+
+
+def ensure_schema_change_table(engine: Engine) -> None:
+    schema_change_table.create(bind=engine, checkfirst=True)
+
+
+def record_schema_change(engine: Engine, table_name: str) -> int:
+    """
+    Records that the schema of table_name changed.\n
+    Returns the schema version of this process which includes the change
+    """
+    return offload.run_blocking(_record_schema_change, engine, table_name)
+
+
+def _record_schema_change(engine: Engine, table_name: str) -> int:
+    watcher = get_watcher(engine)
+    watcher.ensure_table()
+    with engine.begin() as conn:
+        change_id = conn.execute(insert(schema_change_table).values(table_name=table_name)).inserted_primary_key[0]
+    return watcher.record(change_id, table_name)
+
+
+class SchemaWatcher:
+    """
+    Keeps track of the schema changes of one engine.\n
+    `version` counts the schema_change rows this process has seen, in the order it saw them.
+    It is not a schema_change id: those can arrive out of order.
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.version = 0
+        self._log: list[tuple[int, str]] = []  # (version, table_name), ascending
+        self._log_floor = 0  # changes up to this version were trimmed from the log
+        self._max_id = 0  # highest schema_change id seen
+        self._gaps: dict[int, float] = {}  # missing ids below _max_id -> time.monotonic() they were first missed
+        self._last_poll = float("-inf")
+        self._table_ready = False
+        self._lock = threading.Lock()
+
+    def ensure_table(self) -> None:
+        if not self._table_ready:
+            ensure_schema_change_table(self.engine)
+            self._table_ready = True
+
+    def due(self) -> bool:
+        """
+        Returns whether the next poll would query the database
+        """
+        return time.monotonic() - self._last_poll >= _poll_interval()
+
+    def poll(self, force: bool = False) -> int:
+        """
+        Fetches the schema changes not seen yet, unless the last poll was less than
+        SCHEMA_POLL_INTERVAL seconds ago.\n
+        Returns the newest known schema version
+        """
+        if not force and not self.due():
+            return self.version
+        return offload.run_blocking(self._poll)
+
+    def _poll(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            self.ensure_table()
+            with self.engine.connect() as conn:
+                if self._last_poll == float("-inf"):
+                    # Nothing of this process is cached before the first poll, older changes don't matter.
+                    # Only ids which may still commit are remembered.
+                    recent = conn.execute(
+                        select(schema_change_table.c.id).order_by(schema_change_table.c.id.desc()).limit(_GAP_WINDOW)
+                    ).scalars().all()
+                    if recent:
+                        self._max_id = recent[0]
+                        missing = set(range(max(self._max_id - _GAP_WINDOW, 0) + 1, self._max_id)) - set(recent)
+                        self._gaps.update(dict.fromkeys(missing, now))
+                else:
+                    condition = schema_change_table.c.id > self._max_id
+                    if self._gaps:
+                        condition = condition | schema_change_table.c.id.in_(list(self._gaps))
+                    rows = conn.execute(
+                        select(schema_change_table.c.id, schema_change_table.c.table_name)
+                        .where(condition)
+                        .order_by(schema_change_table.c.id)
+                    ).all()
+                    for row in rows:
+                        self._add(row.id, row.table_name, now)
+            for change_id, missed_at in list(self._gaps.items()):
+                if now - missed_at > _GAP_TIMEOUT:
+                    del self._gaps[change_id]
+            self._last_poll = now
+            return self.version
+
+    def record(self, change_id: int, table_name: str) -> int:
+        """
+        Adds a change this process committed itself, without waiting for the next poll.\n
+        Returns the version which includes it
+        """
+        with self._lock:
+            self._add(change_id, table_name, time.monotonic())
+            return self.version
+
+    def _add(self, change_id: int, table_name: str, now: float) -> None:
+        if self._last_poll == float("-inf"):
+            pass  # the first poll starts from the newest id anyway
+        elif change_id > self._max_id:
+            self._gaps.update(dict.fromkeys(range(max(self._max_id, change_id - _GAP_WINDOW) + 1, change_id), now))
+            self._max_id = change_id
+        elif self._gaps.pop(change_id, None) is None:
+            return  # seen before
+        self.version += 1
+        self._log.append((self.version, table_name))
+        if len(self._log) > _MAX_LOG:
+            self._log_floor = self._log[-_MAX_LOG - 1][0]
+            del self._log[:-_MAX_LOG]
+
+    def changes_since(self, since: int) -> list[tuple[int, str]] | None:
+        """
+        Returns (version, table_name) of all changes after the given version, oldest first.\n
+        Returns None if the changes are too old to be known anymore, callers should drop everything then
+        """
+        if since < self._log_floor:
+            return None
+        return [(version, table_name) for version, table_name in self._log if version > since]
+
+
+_watchers: dict[Engine, SchemaWatcher] = {}
+_watchers_lock = threading.Lock()
+
+
+def get_watcher(engine: Engine) -> SchemaWatcher:
+    watcher = _watchers.get(engine)
+    if watcher is None:
+        with _watchers_lock:
+            watcher = _watchers.get(engine)
+            if watcher is None:
+                watcher = SchemaWatcher(engine)
+                _watchers[engine] = watcher
+    return watcher
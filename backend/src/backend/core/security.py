@@ -1,17 +1,57 @@
 # backend/core/security.py
 
+import asyncio
+import hashlib
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from jose import jwt
 from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError
 
 from backend.config import SECRET_KEY, ALGORITHM
+from backend.core.cache import LRUCache
 
 # --- Configuration & Setup ---
 
 ACCESS_TOKEN_EXPIRE_MINUTES = 180 # 3 hours minus the difference that our app thinks its stuck in london
-ph = PasswordHasher()
+
+# Argon2 parameters, hashes made with other parameters are rehashed on the next login.
+# Environment Variables:
+#     ARGON2_TIME_COST: number of iterations (default: argon2-cffi's default)
+#     ARGON2_MEMORY_COST: memory in KiB (default: argon2-cffi's default)
+#     ARGON2_PARALLELISM: number of lanes (default: argon2-cffi's default)
+ph = PasswordHasher(
+    time_cost=int(os.getenv("ARGON2_TIME_COST", PasswordHasher().time_cost)),
+    memory_cost=int(os.getenv("ARGON2_MEMORY_COST", PasswordHasher().memory_cost)),
+    parallelism=int(os.getenv("ARGON2_PARALLELISM", PasswordHasher().parallelism)),
+)
+
+# Hashing runs in its own threads (argon2 releases the GIL) so it doesn't block the event loop.
+# Environment Variables:
+#     PASSWORD_HASH_WORKERS: number of hashing threads (default: 4)
+#     PASSWORD_HASH_MAX_QUEUE: hashes allowed to wait for a thread before new ones are rejected (default: 64)
+HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+_hash_pool = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="password-hash")
+_hash_lock = threading.Lock()
+_hash_pending = 0  # submitted and not finished yet
+_hash_running = 0
+_hash_rejected = 0
+
+# Verified token payloads by sha256 of the token, each entry expires with its token's "exp".
+# Environment Variables:
+#     JWT_CACHE_SIZE: maximum number of cached token payloads (default: 4096)
+_token_cache = LRUCache(int(os.getenv("JWT_CACHE_SIZE", "4096")))
+
+
+class HashingOverloaded(Exception):
+    """
+    Raised when more password hashes are waiting for a thread than PASSWORD_HASH_MAX_QUEUE allows
+    """
+
 
 # --- Security Functions ---
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -23,6 +63,86 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def hash_password(password: str) -> str:
     return ph.hash(password)
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """
+    Returns True if the hash wasn't made with the current Argon2 parameters
+    """
+    try:
+        return ph.check_needs_rehash(hashed_password)
+    except InvalidHashError:
+        return True
+
+def _run_counted(fn, *args):
+    global _hash_running
+    with _hash_lock:
+        _hash_running += 1
+    try:
+        return fn(*args)
+    finally:
+        with _hash_lock:
+            _hash_running -= 1
+
+async def _run_in_hash_pool(fn, *args):
+    """
+    Runs fn(*args) in the hashing pool and waits for it without blocking the event loop.\n
+    Raises HashingOverloaded instead of queueing when the queue is full.
+    """
+    global _hash_pending, _hash_rejected
+    with _hash_lock:
+        if _hash_pending >= HASH_WORKERS + HASH_MAX_QUEUE:
+            _hash_rejected += 1
+            raise HashingOverloaded()
+        _hash_pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_pool, _run_counted, fn, *args)
+    finally:
+        with _hash_lock:
+            _hash_pending -= 1
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    verify_password in the hashing pool, raises HashingOverloaded if the pool is saturated
+    """
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+async def hash_password_async(password: str) -> str:
+    """
+    hash_password in the hashing pool, raises HashingOverloaded if the pool is saturated
+    """
+    return await _run_in_hash_pool(hash_password, password)
+
+def _hash_many(passwords: list[str]) -> list[str]:
+    return [hash_password(password) for password in passwords]
+
+async def hash_passwords_async(passwords: list[str], chunk_size: int = 16) -> list[str]:
+    """
+    Hashes many passwords in the hashing pool, in the order given.\n
+    Chunks of chunk_size passwords run on at most half of the threads, so logins still get threads during a bulk import.\n
+    Raises HashingOverloaded if the pool is saturated.
+    """
+    limit = asyncio.Semaphore(max(1, HASH_WORKERS // 2))
+
+    async def run(chunk: list[str]) -> list[str]:
+        async with limit:
+            return await _run_in_hash_pool(_hash_many, chunk)
+
+    chunks = [passwords[i:i + chunk_size] for i in range(0, len(passwords), chunk_size)]
+    hashed = await asyncio.gather(*(run(chunk) for chunk in chunks))
+    return [value for chunk in hashed for value in chunk]
+
+def hashing_stats() -> dict:
+    """
+    Returns the state of the hashing pool: threads, running and queued hashes and rejected requests
+    """
+    with _hash_lock:
+        return {
+            "workers": HASH_WORKERS,
+            "running": _hash_running,
+            "queued": _hash_pending - _hash_running,
+            "max_queue": HASH_MAX_QUEUE,
+            "rejected": _hash_rejected,
+        }
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     
     to_encode = data.copy()
@@ -33,3 +153,22 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, ALGORITHM)
+
+def decode_access_token(token: str) -> dict:
+    """
+    Verifies the token and returns its payload.\n
+    Payloads of valid tokens are cached until their "exp", so a token is only verified once.\n
+    Raises jose.JWTError if the token is invalid or expired.
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    payload = _token_cache.get(key)
+    if payload is None:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):  # tokens without exp are not cached
+            _token_cache.put(key, payload, expires_at=exp)
+    return dict(payload)  # shallow copy, callers can't replace the cached claims
+
+
+def clear_token_cache() -> None:
+    _token_cache.clear()
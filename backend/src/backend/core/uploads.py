@@ -0,0 +1,48 @@
+"""
+Parsing of bulk uploads.
+
+The bulk endpoints (POST /users/bulk, POST /applications/{form_id}/bulk) and their CLIs accept
+CSV (with a header line) or NDJSON (one JSON object per line). Both become a list with one entry per row,
+either the row as a dict or, for a line which isn't a JSON object, the error message of that row,
+so a broken line is reported on its own instead of failing the whole upload.
+"""
+
+import csv
+import io
+import json
+
+
+def content_type_for_path(path: str) -> str:
+    """
+    Returns the content type parse_rows expects for a file name (.csv, .ndjson or .jsonl)
+    """
+    return "text/csv" if path.lower().endswith(".csv") else "application/x-ndjson"
+
+
+def parse_rows(body: bytes, content_type: str) -> list[dict | str]:
+    """
+    Takes:\n
+    The request body and its content type (text/csv or application/x-ndjson)\n
+    Returns:\n
+    One dict per row, or an error message for a row which isn't valid JSON\n
+    Raises ValueError for other content types or a body which isn't UTF-8
+    """
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ValueError("The upload must be UTF-8")
+    if "csv" in content_type:
+        # empty cells count as missing, so an empty role falls back to the default
+        return [{key: value for key, value in row.items() if value} for row in csv.DictReader(io.StringIO(text))]
+    if "ndjson" in content_type or "jsonl" in content_type:
+        rows = []
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                row = f"Invalid JSON: {e.msg}"
+            rows.append(row if isinstance(row, (dict, str)) else "Expected a JSON object")
+        return rows
+    raise ValueError("Upload CSV (text/csv) or NDJSON (application/x-ndjson)")
@@ -1,7 +1,11 @@
 from . import dbActions
+from . import asyncDbActions
 from . import form as formCrud
 from . import user as userCrud
 from . import role as roleCrud
+from . import catalog as catalogCrud
 from . import application as applicationCrud
+from . import listing as listingCrud
+from . import reviewQueue as queueCrud
 
-__all__ = ["dbActions", "formCrud", "userCrud", "roleCrud", "applicationCrud"]
+__all__ = ["dbActions", "asyncDbActions", "formCrud", "userCrud", "roleCrud", "catalogCrud", "applicationCrud", "listingCrud", "queueCrud"]
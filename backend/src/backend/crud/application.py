@@ -2,16 +2,19 @@
 
 
 from copy import deepcopy
-import json
-from sqlalchemy import inspect
+from datetime import datetime
+
+from psycopg import sql
+from sqlalchemy import and_, case, insert, or_, select, update
 from sqlalchemy.orm import Session
+from fastapi import HTTPException
 
 
-from backend.core import db
+from backend.core import db, formRegistry
 from backend.crud import dbActions
 from backend.models.domain.application import Application, Snapshots
 
-from backend.crud import formCrud
+from backend.crud import formCrud, catalogCrud
 
 from backend.crud.dbActions import getRowsByFilter
 
@@ -24,11 +27,8 @@ def get_application_table_by_id(id):
     Returns:\n
     The form's applicationTable class
     """
-    applicationTableName = "form_" + str(id)
-    Base = db.get_base(True)
     try:
-        applicationTable = Base.classes[applicationTableName]
-        return applicationTable
+        return formRegistry.get_form_table(id).table_class
     except Exception:
         raise Exception("The table id doesn't exist")
 
@@ -40,19 +40,8 @@ def getRowJsonPayload(row):
     Returns:\n
     The "jsonPayload" of the "Application" instance which is saved in the given row
     """
-    applicationTable = get_application_table_by_id(row.form_id)
-    columnNames = [c.key for c in inspect(applicationTable).columns]
-    standardColumns = ["id", "user_id", "form_id", "admin_id","status", "created_at", "snapshots", "is_public"]
-    blockColumns = []
-    for columnName in columnNames:
-        if columnName not in standardColumns:
-            blockColumns.append(columnName)
-    jsonDict = {}
-    count = 1
-    for blockColumn in blockColumns:
-        jsonDict[str(count)] = {"label": blockColumn, "value": getattr(row, blockColumn)}
-        count += 1
-    return jsonDict
+    codec = _codec(row.form_id)
+    return codec.payload(codec.values(row))
 
 def rowToApplication(row, applicationTable = None) -> Application:
     """
@@ -61,23 +50,16 @@ def rowToApplication(row, applicationTable = None) -> Application:
     Returns:\n
     The "Application" instance which is saved in the given row
     """
-    if not applicationTable:
-        applicationTable = get_application_table_by_id(row.form_id)
-    jsonPayload = getRowJsonPayload(row=row)
-
-
-    application = Application(
-        id=row.id,
-        user_id=row.user_id,
-        form_id=row.form_id,
-        admin_id = row.admin_id,
-        status= row.status,
-        created_at = row.created_at,
-        snapshots= Snapshots.from_json(row.snapshots),
-        jsonPayload= jsonPayload,
-        is_public= row.is_public
-    )
-    return application
+    return _codec(row.form_id).decode(row)
+
+def _codec(form_id: int):
+    """
+    Returns the compiled row codec of the given form's applicationTable
+    """
+    try:
+        return formRegistry.get_form_table(form_id).codec
+    except KeyError:
+        raise Exception("The table id doesn't exist")
 
 def get_application_by_id(session: Session, form_id:int, app_id: int):
     """Takes:\n
@@ -129,14 +111,12 @@ def get_all_revisions_of_application(session: Session, form_id: int, app_id: int
     A list of all "Application" instances of the form which's id was given, which are revisions of the application which's id was given (nextSnapshotID != null)
     """
     applicationTable = get_application_table_by_id(form_id)
-    applications: list[Application] = []
-
-    allRows = dbActions.getRows(session, applicationTable)
-    for row in allRows:
-        if row.id == app_id or get_current_snapshot_id(row.snapshots) == app_id:
-            applications.append(rowToApplication(row=row, applicationTable=applicationTable))
-    
-    return applications
+    rows = session.scalars(
+        select(applicationTable)
+        .where(or_(applicationTable.id == app_id, applicationTable.current_snapshot_id == app_id))
+        .order_by(applicationTable.id)
+    ).all()
+    return [rowToApplication(row=row, applicationTable=applicationTable) for row in rows]
 
 def get_all_sibling_revisions_of_application(session: Session, form_id: int, app_id: int) -> list[Application]:
     """
@@ -169,17 +149,10 @@ def get_all_applications_of_type(session: Session, form_id: int) -> list[Applica
     A list of all "Application" instances of the form which's id was given
     """
     applicationTable = get_application_table_by_id(form_id)
-    applications: list[Application] = []
-    
-            
-
-    allRows = dbActions.getRows(session, applicationTable)
-    for row in allRows:
-        if check_if_outdated(row.snapshots):
-            continue
-        applications.append(rowToApplication(row=row, applicationTable=applicationTable))
-    
-    return applications
+    rows = session.scalars(
+        select(applicationTable).where(applicationTable.current_snapshot_id < 0).order_by(applicationTable.id)
+    ).all()
+    return [rowToApplication(row=row, applicationTable=applicationTable) for row in rows]
 
 
 def get_all_applications(session: Session) -> list[Application]:
@@ -192,13 +165,8 @@ def get_all_applications(session: Session) -> list[Application]:
     Returns:
         list[Application]: A list of all "Application" instances across all forms.
     """
-    applications: list[Application] = []
-    all_forms = formCrud.get_all_forms(session)
-    for form in all_forms:
-        applications_of_type = get_all_applications_of_type(session, form.id)
-        applications.extend(applications_of_type)
-
-    return applications
+    entries = catalogCrud.get_catalog_entries(session)
+    return _entries_to_applications(session, entries)
 
 def get_global_revisions(session: Session) -> list[Application]:
     """
@@ -210,13 +178,8 @@ def get_global_revisions(session: Session) -> list[Application]:
     Returns:
         list[Application]: A list of all "Application" instances across all forms which are global revisions (nextSnapshotID != null).
     """
-    applications: list[Application] = []
-    all_forms = formCrud.get_all_forms(session)
-    for form in all_forms:
-        global_revisions_of_type = get_all_global_revisions_of_type(session, form.id)
-        applications.extend(global_revisions_of_type)
-
-    return applications
+    entries = catalogCrud.get_catalog_entries(session, current_only=False)
+    return _entries_to_applications(session, entries)
 
 
 def get_applications_all_by_status(session: Session, status: str) -> list[Application]:
@@ -235,16 +198,8 @@ def get_applications_all_by_status(session: Session, status: str) -> list[Applic
     """
     if status not in ["PENDING", "APPROVED", "REJECTED", "REVISED"]:
         raise ValueError("Invalid status")
-    applications: list[Application] = []
-    all_forms = formCrud.get_all_forms(session)
-    for form in all_forms:
-        applicationTable = get_application_table_by_id(form.id)
-        rows = getRowsByFilter(session, applicationTable, {"status": status})
-        for row in rows:
-            if check_if_outdated(row.snapshots):
-                continue
-            applications.append(rowToApplication(row=row, applicationTable=applicationTable))
-    return applications
+    entries = catalogCrud.get_catalog_entries(session, statuses=[status])
+    return _entries_to_applications(session, entries)
 
 def get_applications_public_by_status(session: Session, status: str) -> list[Application]:
     """
@@ -262,16 +217,8 @@ def get_applications_public_by_status(session: Session, status: str) -> list[App
     """
     if status not in ["PENDING", "APPROVED", "REJECTED", "REVISED"]:
         raise ValueError("Invalid status")
-    applications: list[Application] = []
-    all_forms = formCrud.get_all_forms(session)
-    for form in all_forms:
-        applicationTable = get_application_table_by_id(form.id)
-        rows = getRowsByFilter(session, applicationTable, {"status": status, "is_public": True})
-        for row in rows:
-            if check_if_outdated(row.snapshots):
-                continue
-            applications.append(rowToApplication(row=row, applicationTable=applicationTable))
-    return applications
+    entries = catalogCrud.get_catalog_entries(session, statuses=[status], is_public=True)
+    return _entries_to_applications(session, entries)
 
 def get_applications_private_by_status(session: Session, status: str) -> list[Application]:
     """
@@ -289,16 +236,8 @@ def get_applications_private_by_status(session: Session, status: str) -> list[Ap
     """
     if status not in ["PENDING", "APPROVED", "REJECTED", "REVISED"]:
         raise ValueError("Invalid status")
-    applications: list[Application] = []
-    all_forms = formCrud.get_all_forms(session)
-    for form in all_forms:
-        applicationTable = get_application_table_by_id(form.id)
-        rows = getRowsByFilter(session, applicationTable, {"status": status, "is_public": False})
-        for row in rows:
-            if check_if_outdated(row.snapshots):
-                continue
-            applications.append(rowToApplication(row=row, applicationTable=applicationTable))
-    return applications
+    entries = catalogCrud.get_catalog_entries(session, statuses=[status], is_public=False)
+    return _entries_to_applications(session, entries)
 
 
 def get_applications_by_user_id(session: Session, user_id: int) -> list[Application]:
@@ -313,16 +252,8 @@ def get_applications_by_user_id(session: Session, user_id: int) -> list[Applicat
     RETURNS:
         list[Application]: List of Application objects submitted by the specified user.
     """
-    applications: list[Application] = []
-    all_forms = formCrud.get_all_forms(session)
-    for form in all_forms:
-        applicationTable = get_application_table_by_id(form.id)
-        rows = getRowsByFilter(session, applicationTable, {"user_id": user_id})
-        for row in rows:
-            if check_if_outdated(row.snapshots):
-                continue
-            applications.append(rowToApplication(row=row, applicationTable=applicationTable))
-    return applications
+    entries = catalogCrud.get_catalog_entries(session, user_id=user_id)
+    return _entries_to_applications(session, entries)
 
 def get_applications_by_user_id_with_revisions(session: Session, user_id: int) -> list[Application]:
     """
@@ -336,56 +267,40 @@ def get_applications_by_user_id_with_revisions(session: Session, user_id: int) -
     RETURNS:
         list[Application]: List of Application objects submitted by the specified user, including revisions.
     """
-    applications: list[Application] = []
-    all_forms = formCrud.get_all_forms(session)
-    for form in all_forms:
-        applicationTable = get_application_table_by_id(form.id)
-        rows = getRowsByFilter(session, applicationTable, {"user_id": user_id})
-        for row in rows:
-            applications.append(rowToApplication(row=row, applicationTable=applicationTable))
-    return applications
+    entries = catalogCrud.get_catalog_entries(session, user_id=user_id, current_only=False)
+    return _entries_to_applications(session, entries)
 
-# def get_all_public_applications(session: Session) -> list[Application]:
-#     """
-#     Returns all applications that are marked as public.
+def get_all_public_applications(session: Session) -> list[Application]:
+    """
+    Returns all applications that are marked as public.
     
-#     ARGS:
-#         session (Session): SQLAlchemy session object.
+    ARGS:
+        session (Session): SQLAlchemy session object.
     
-#     RETURNS:
-#         list[Application]: List of public Application objects.
-#     """
-#     applications: list[Application] = []
-#     all_forms = formCrud.get_all_forms(session)
-#     for form in all_forms:
-#         applications_of_type = get_all_applications_of_type(session, form.id)
-#         applications.extend(applications_of_type)
-#     public_applications : list[Application] = []
-#     for application in applications:
-#         if application.is_public:
-#             public_applications.append(application)
-#     return public_applications
-
-# def get_all_private_applications(session: Session) -> list[Application]:
-#     """
-#     Returns all applications that are marked as public.
+    RETURNS:
+        list[Application]: List of public Application objects.
+    """
+    entries = catalogCrud.get_catalog_entries(session, is_public=True)
+    return _entries_to_applications(session, entries)
+
+def get_all_private_applications(session: Session) -> list[Application]:
+    """
+    Returns all applications that are not marked as public.
     
-#     ARGS:
-#         session (Session): SQLAlchemy session object.
+    ARGS:
+        session (Session): SQLAlchemy session object.
     
-#     RETURNS:
-#         list[Application]: List of public Application objects.
-#     """
-#     applications: list[Application] = []
-#     all_forms = formCrud.get_all_forms(session)
-#     for form in all_forms:
-#         applications_of_type = get_all_applications_of_type(session, form.id)
-#         applications.extend(applications_of_type)
-#     private_applications : list[Application] = []
-#     for application in applications:
-#         if not application.is_public:
-#             private_applications.append(application)
-#     return private_applications
+    RETURNS:
+        list[Application]: List of private Application objects.
+    """
+    entries = catalogCrud.get_catalog_entries(session, is_public=False)
+    return _entries_to_applications(session, entries)
+
+def _entries_to_applications(session: Session, entries) -> list[Application]:
+    """
+    Loads the applications of the given catalog entries, batched per form
+    """
+    return [rowToApplication(row=row) for row in catalogCrud.load_rows(session, entries)]
 
 # def old_insert_application(session:Session, application: Application):
 #     """
@@ -439,51 +354,229 @@ def insert_application(session: Session, application: Application):
     # 3. Get the dynamic ORM table class for this form.
     applicationTable = get_application_table_by_id(id=application.form_id)
 
-    # 4. Insert the row with a temporary snapshots value.
-    # The `insertRow` function's `session.flush()` will assign an ID.
-    app_data['snapshots'] = application.snapshots.to_json()
-    created_app = dbActions.insertRow(session, applicationTable, app_data)
+    # 4. Insert the row together with its snapshot ids.
+    # RETURNING brings back the new id and defaults with the INSERT itself.
+    app_data.update(application.snapshots.to_columns())
+    created_app = dbActions.insertRowReturning(session, applicationTable, app_data)
+
+    # 5. Keep the cross-form catalog in sync.
+    catalogCrud.add_catalog_entry(session, created_app)
 
     return created_app
 
+APPLICATION_BATCH_SIZE = 1000  # rows per INSERT statement of insert_applications
+
+def _new_application_values(form_id: int, rows: list[dict]) -> list[dict]:
+    """
+    Completes the column values of new, pending applications with the standard columns
+    """
+    now = datetime.now()
+    return [{"form_id": form_id, "admin_id": None, "status": ApplicationStatus.PENDING.value, "created_at": now,
+             "is_public": False, "version": 0, **Snapshots().to_columns(), **row} for row in rows]
+
+def insert_applications(session: Session, form_id: int, rows: list[dict]) -> list[int]:
+    """
+    Takes:\n
+    The form's id\n
+    Dicts with "user_id" and the values of the form's blocks by label, already validated\n
+    Does:\n
+    Inserts them as new applications with their catalog entries, APPLICATION_BATCH_SIZE rows per statement\n
+    Returns:\n
+    The new ids in the order of rows
+    """
+    table = get_application_table_by_id(form_id).__table__
+    values = _new_application_values(form_id, rows)
+    ids = []
+    for start in range(0, len(values), APPLICATION_BATCH_SIZE):
+        batch = values[start:start + APPLICATION_BATCH_SIZE]
+        batch_ids = session.scalars(insert(table).returning(table.c.id, sort_by_parameter_order=True), batch).all()
+        catalogCrud.add_catalog_entries(session, form_id, batch_ids, batch)
+        ids.extend(batch_ids)
+    return ids
+
+def copy_applications(form_id: int, rows: list[dict]) -> list[int]:
+    """
+    Postgres only, same as insert_applications but with COPY on its own psycopg connection and transaction.\n
+    The ids are taken from the table's id sequence first, so the catalog entries can be copied right after the rows.
+    """
+    table = get_application_table_by_id(form_id).__table__
+    columns = [column.name for column in table.columns]
+    values = _new_application_values(form_id, rows)
+    copy_table = sql.SQL("COPY {} ({}) FROM STDIN").format(
+        sql.Identifier(table.name), sql.SQL(", ").join(sql.Identifier(name) for name in columns))
+    with db.get_psycopg_connection() as conn:  # commits when the block succeeds
+        with conn.cursor() as cur:
+            cur.execute("SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+                        (table.name, len(values)))
+            ids = [row[0] for row in cur.fetchall()]
+            with cur.copy(copy_table) as copy:
+                for app_id, row in zip(ids, values):
+                    copy.write_row([app_id if name == "id" else row.get(name) for name in columns])
+            with cur.copy("COPY application_catalog (form_id, app_id, user_id, status, is_public, is_current, created_at) "
+                          "FROM STDIN") as copy:
+                for entry in catalogCrud.entries_from_values(form_id, ids, values):
+                    copy.write_row((entry["form_id"], entry["app_id"], entry["user_id"], entry["status"],
+                                    entry["is_public"], entry["is_current"], entry["created_at"]))
+    return ids
+
+EDIT_ATTEMPTS = 3  # tries of update_application when its revision was changed concurrently
+
+def _changed_error() -> HTTPException:
+    return HTTPException(status_code=409, detail="The application was changed in the meantime, reload it and try again")
+
+
+def _conflict(session: Session, tableClass: type, app_id: int) -> HTTPException:
+    """
+    Returns the error for a compare-and-swap update of the application which matched no row.\n
+    Raises ValueError if the application doesn't exist at all
+    """
+    if session.scalar(select(tableClass.id).where(tableClass.id == app_id)) is None:
+        raise ValueError("Application not found")
+    return _changed_error()
+
+
 # wrapper for updating application status
-def updateApplicationStatus(session: Session, form_id: int, app_id: int, newStatus: ApplicationStatus):
+def updateApplicationStatus(session: Session, form_id: int, app_id: int, newStatus: ApplicationStatus,
+                            expected_version: int | None = None):
+    """
+    Sets the status of the newest revision of an application with one compare-and-swap UPDATE, which bumps its version.\n
+    With expected_version the change is only made if nobody else changed the application since it was read.\n
+    Raises HTTPException 409 if the revision was replaced by an edit or has another version, ValueError if it doesn't exist
+    """
     if newStatus not in [ApplicationStatus.PENDING, ApplicationStatus.APPROVED, ApplicationStatus.REJECTED, ApplicationStatus.REVISED]:
         raise ValueError("Invalid status")
     tableClass = get_application_table_by_id(form_id)
-    return dbActions.updateRow(session, tableClass, {"id": app_id, "status": newStatus})
+    expected = {"current_snapshot_id": -1}
+    if expected_version is not None:
+        expected["version"] = expected_version
+    updated = dbActions.compareAndSwapRow(
+        session, tableClass, {"id": app_id, "status": newStatus, "version": tableClass.version + 1}, expected)
+    if updated is None:
+        raise _conflict(session, tableClass, app_id)
+    catalogCrud.update_catalog_entries(session, form_id, [app_id], {"status": str(newStatus)})
+    return updated
 
 
-def publish_application(session: Session, form_id: int, app_id: int):
+def publish_application(session: Session, form_id: int, app_id: int, expected_version: int | None = None):
     """
     Marks an application as public by setting its is_public attribute to True.
+    Like updateApplicationStatus a compare-and-swap UPDATE of the newest revision, which bumps its version.
     
     Args:
         session (Session): SQLAlchemy session object.
         form_id (int): The ID of the form to which the application belongs.
         app_id (int): The ID of the application to be marked as public.
+        expected_version (int | None): If given, only publish if nobody changed the application since it was read.
     
     Raises:
+        HTTPException: 409 if the revision was replaced by an edit or has another version.
         ValueError: If the application does not exist.
     """
     tableClass = get_application_table_by_id(form_id)
-    application = dbActions.getRowById(session, tableClass, app_id)
-    if not application:
-        raise ValueError("Application not found")
-    dbActions.updateRow(session, tableClass, {"id": app_id, "is_public": True})
+    expected = {"current_snapshot_id": -1}
+    if expected_version is not None:
+        expected["version"] = expected_version
+    updated = dbActions.compareAndSwapRow(
+        session, tableClass, {"id": app_id, "is_public": True, "version": tableClass.version + 1}, expected)
+    if updated is None:
+        raise _conflict(session, tableClass, app_id)
+    catalogCrud.update_catalog_entries(session, form_id, [app_id], {"is_public": True})
+
+
+def get_status_rows(session: Session, form_id: int, app_ids: list[int]) -> dict[int, tuple[str, bool, bool]]:
+    """
+    Takes:\n
+    The form's id\n
+    Ids of applications of that form\n
+    Returns:\n
+    {id: (status, is_public, is_current)} of the ones which exist, in one query.
+    On Postgres the rows stay locked (FOR UPDATE) until the transaction ends, they are locked in id order.
+    """
+    table = get_application_table_by_id(form_id)
+    rows = session.execute(
+        select(table.id, table.status, table.is_public, table.current_snapshot_id)
+        .where(table.id.in_(app_ids))
+        .order_by(table.id)
+        .with_for_update()
+    ).all()
+    return {row.id: (str(row.status), bool(row.is_public), row.current_snapshot_id < 0) for row in rows}
 
 
-def update_application(form_id: int, app_id: int, updateDict: dict, session: Session) -> int:
+def apply_status_changes(session: Session, form_id: int, statuses: dict[int, str], published: list[int]) -> None:
     """
-    TODO 
+    Takes:\n
+    The form's id\n
+    The new status per application id\n
+    Ids of applications to publish\n
+    Does:\n
+    Applies all of them with one UPDATE on the form's table and one on the catalog
+    """
+    app_ids = sorted(set(statuses) | set(published))
+    if not app_ids:
+        return
+    ids_by_status: dict[str, list[int]] = {}
+    for app_id, status in statuses.items():
+        ids_by_status.setdefault(status, []).append(app_id)
+    table = get_application_table_by_id(form_id)
+    values = {"version": table.version + 1}
+    if ids_by_status:
+        values["status"] = case(*((table.id.in_(ids), status) for status, ids in ids_by_status.items()), else_=table.status)
+    if published:
+        values["is_public"] = case((table.id.in_(published), True), else_=table.is_public)
+    session.execute(
+        update(table).where(table.id.in_(app_ids)).values(**values).execution_options(synchronize_session="fetch")
+    )
+    catalogCrud.set_status_and_visibility(session, form_id, ids_by_status, published)
+
+
+class _StaleRevision(Exception):
+    """The revision an edit was based on was changed before the edit was written"""
+
+
+def update_application(form_id: int, app_id: int, updateDict: dict, session: Session,
+                       expected_version: int | None = None) -> int:
+    """
+    Creates a new revision of an application with the blocks in updateDict replaced.
+    The original and all its older revisions are marked outdated in the same transaction.
+
+    The original is marked with a compare-and-swap UPDATE on its version, so two edits, or an edit and a status change,
+    can't both build on the same revision. If only the version changed in between (e.g. a status change), the edit is
+    tried again on the fresh row, up to EDIT_ATTEMPTS times. With expected_version it isn't retried.
+    Each attempt runs in a savepoint, committing is left to the caller.
+
     Returns:
         id of newly created updated application (int)
+    Raises:
+        HTTPException 409 if the application was revised or changed concurrently, ValueError if it doesn't exist
+    """
+    for _ in range(EDIT_ATTEMPTS):
+        try:
+            with session.begin_nested():  # a lost compare-and-swap undoes the inserted revision
+                new_app_id = _write_revision(form_id, app_id, updateDict, session, expected_version)
+        except _StaleRevision:
+            if expected_version is not None:
+                break
+            continue
+        return new_app_id
+    raise _changed_error()
+
+
+def _write_revision(form_id: int, app_id: int, updateDict: dict, session: Session, expected_version: int | None) -> int:
     """
+    One attempt of update_application, raises _StaleRevision if the original was changed after it was read
+    """
+    applicationTable = get_application_table_by_id(form_id)
+    row = session.get(applicationTable, app_id, populate_existing=True)  # never the copy of an earlier attempt
+    if row is None:
+        raise ValueError("Application not found")
+    if row.current_snapshot_id != -1 or (expected_version is not None and row.version != expected_version):
+        raise _changed_error()
+    read_version = row.version
+    updated_app = rowToApplication(row)
 
-    updated_app = get_application_by_id(session, form_id, app_id) # Get application to update
-    
     # -- PREPARE NEW APPLICATION --
     updated_app.id = None  # Set id to None to create a new entry
+    updated_app.version = 0
     updated_app.snapshots.currentSnapshotID = -1
     updated_app.snapshots.previousSnapshotID = app_id
     updated_app.snapshots.nextSnapshotID = None
@@ -499,58 +592,32 @@ def update_application(form_id: int, app_id: int, updateDict: dict, session: Ses
             updated_app.jsonPayload[label_key_dict[block["label"]]] = block
             
     # -- INSERT NEW APPLICATION --
-    new_orm_app = insert_application(session, updated_app)  # Insert updated application as new row
-    # session.commit()
-    # session.refresh(new_orm_app)
-    new_app_id = new_orm_app.id
-    
-    # -- UPDATE ORIGINAL APPLICATION --
-    applicationTable = dbActions.get_application_table_by_id(form_id)
-    original_orm_app = dbActions.getRowById(session, applicationTable, app_id)
-    
-    if original_orm_app:
-        snapshots_obj = Snapshots.from_json(original_orm_app.snapshots)
-        snapshots_obj.nextSnapshotID = new_app_id
-        snapshots_obj.currentSnapshotID = new_app_id # CHANGED: Mark original as outdated.
-        original_orm_app.snapshots = snapshots_obj.to_json()
-        session.commit()
-    
-    # -- UPDATE ALL OLD REVISIONS --
-    old_revisions = get_all_revisions_of_application(session, form_id, app_id)
-    for revision in old_revisions:
-        if revision.id == app_id or revision.id == new_app_id:
-            continue
-        revision_orm_app = dbActions.getRowById(session, applicationTable, revision.id)
-        if revision_orm_app:
-            snapshots_obj = Snapshots.from_json(revision_orm_app.snapshots)
-            snapshots_obj.currentSnapshotID = new_app_id # CHANGED: Mark old revisions as outdated.
-            revision_orm_app.snapshots = snapshots_obj.to_json()
-            session.commit()
-    
+    new_app_id = insert_application(session, updated_app).id  # Insert updated application as new row
+
+    # -- MARK ORIGINAL AND ALL OLD REVISIONS OUTDATED --
+    # The original and its older revisions are exactly the rows with id == app_id or current_snapshot_id == app_id,
+    # both indexed, so they are re-pointed at the new revision with one UPDATE.
+    # The original only matches while it is still the newest revision with the version read above (compare-and-swap).
+    table = applicationTable
+    is_original = table.id == app_id
+    outdated = session.scalars(
+        update(table)
+        .where(or_(
+            and_(is_original, table.version == read_version, table.current_snapshot_id == -1),
+            table.current_snapshot_id == app_id,
+        ))
+        .values(
+            current_snapshot_id=new_app_id,
+            next_snapshot_id=case((is_original, new_app_id), else_=table.next_snapshot_id),
+            version=case((is_original, table.version + 1), else_=table.version),
+        )
+        .returning(table.id)
+        .execution_options(synchronize_session="fetch")
+    ).all()
+    if app_id not in outdated:
+        raise _StaleRevision()
+
+    # -- UPDATE CATALOG --
+    outdated_ids = select(applicationTable.id).where(applicationTable.current_snapshot_id == new_app_id)
+    catalogCrud.update_catalog_entries(session, form_id, outdated_ids, {"is_current": False})
     return new_app_id
-
-
-# --- HELPER FUNCTIONS ---
-
-
-## -- functions for snapshots -- ##
-
-def _snapshot_to_dict(snapstring: str) -> dict:
-    return json.loads(snapstring)
-
-def check_if_outdated(snapstring: str) -> bool:
-    """
-    Takes an application, checks if it is outdated\n
-    Returns True if outdated, False if up-to-date
-    """
-    snapshots = _snapshot_to_dict(snapstring)
-    if snapshots["currentSnapshotID"] >= 0:
-        return True
-    return False
-
-def get_current_snapshot_id(snapstring: str) -> int:
-    """
-    Takes an application, returns the currentSnapshotID
-    """
-    snapshots = _snapshot_to_dict(snapstring)
-    return snapshots["currentSnapshotID"]
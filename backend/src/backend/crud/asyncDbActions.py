@@ -0,0 +1,56 @@
+"""
+Awaitable versions of the dbActions row primitives for sessions from core.asyncDb.
+
+Each one runs its dbActions counterpart through `session.run_sync`, so both behave exactly the same:
+on Postgres without blocking the event loop, on SQLite in a worker thread.
+"""
+
+from backend.core.asyncDb import AsyncDbSession
+from backend.crud import dbActions
+
+
+async def insertRow(session: AsyncDbSession, tableClass: type, rowData: dict | type) -> type:
+    """
+    Takes an object of tableClass or a dict of tableClass' columns\n
+    Inserts a row into the table represented by tableClass\n
+    Returns the updated/created row object or raises an error
+    """
+    return await session.run_sync(dbActions.insertRow, tableClass, rowData)
+
+async def updateRow(session: AsyncDbSession, tableClass: type, rowData: dict):
+    """
+    rowData MUST include the primary key 'id' to identify which row to update\n
+    Returns updated row object.
+    """
+    return await session.run_sync(dbActions.updateRow, tableClass, rowData)
+
+async def insertRowReturning(session: AsyncDbSession, tableClass: type, rowData: dict):
+    """
+    Inserts a row with one INSERT ... RETURNING, returns the created row object
+    """
+    return await session.run_sync(dbActions.insertRowReturning, tableClass, rowData)
+
+async def updateRowReturning(session: AsyncDbSession, tableClass: type, rowData: dict):
+    """
+    Updates the row with the 'id' of rowData with one UPDATE ... RETURNING, returns the updated row object
+    """
+    return await session.run_sync(dbActions.updateRowReturning, tableClass, rowData)
+
+async def getRowById(session: AsyncDbSession, tableClass: type, id: int) -> type | None:
+    """
+    Get a row from the table represented by tableClass by primary key id.
+    Returns None when not found
+    """
+    return await session.run_sync(dbActions.getRowById, tableClass, id)
+
+async def getRows(session: AsyncDbSession, tableClass: type) -> list:
+    """
+    Get all rows from the table represented by tableClass, returns empty list when tableClass is empty
+    """
+    return await session.run_sync(dbActions.getRows, tableClass)
+
+async def getRowsByFilter(session: AsyncDbSession, tableClass: type, filterDict: dict) -> list:
+    """
+    Returns all rows from the table that match ALL filters in filterDict, or an empty list.
+    """
+    return await session.run_sync(dbActions.getRowsByFilter, tableClass, filterDict)
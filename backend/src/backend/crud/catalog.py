@@ -0,0 +1,206 @@
+"""
+Cross-form application catalog.
+
+Every application lives in the table of its form (form_<id>). The catalog table keeps
+(form_id, app_id, user_id, status, is_public, is_current, created_at) of all of them,
+so listings across forms are one indexed query plus one batched query per form with hits.
+
+Rebuild the catalog of an existing database with:
+    python -m backend.crud.catalog rebuild
+"""
+
+from sqlalchemy import Select, case, delete, insert, inspect, select, text, update
+from sqlalchemy.orm import Session
+
+from backend.core import db, formRegistry
+from backend.crud import formCrud
+from backend.models.orm.catalogtable import OrmApplicationCatalog
+
+
+# columns added after the catalog was introduced, with their definitions for ALTER TABLE
+ADDED_COLUMNS = {
+    "leased_by": "INTEGER",
+    "lease_expires_at": "TIMESTAMP",
+}
+
+
+def ensure_catalog_table() -> None:
+    """
+    Creates the catalog table if it doesn't exist yet, or adds the columns and indexes it is missing
+    """
+    table = OrmApplicationCatalog.__table__
+    if not inspect(db.engine).has_table(table.name):
+        table.create(bind=db.engine)
+        return
+    existing = {column["name"] for column in inspect(db.engine).get_columns(table.name)}
+    with db.engine.begin() as conn:
+        quote = conn.dialect.identifier_preparer.quote
+        for name, definition in ADDED_COLUMNS.items():
+            if name not in existing:
+                conn.execute(text(f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(name)} {definition}"))
+        for index in table.indexes:
+            index.create(bind=conn, checkfirst=True)
+
+
+def _entry_from_row(row) -> dict:
+    return {
+        "form_id": row.form_id,
+        "app_id": row.id,
+        "user_id": row.user_id,
+        "status": str(row.status),
+        "is_public": bool(row.is_public),
+        "is_current": row.current_snapshot_id < 0,
+        "created_at": row.created_at,
+    }
+
+
+def add_catalog_entry(session: Session, row) -> None:
+    """
+    Takes a freshly inserted row of an application table and adds it to the catalog
+    """
+    session.execute(insert(OrmApplicationCatalog).values(**_entry_from_row(row)))
+
+
+def entries_from_values(form_id: int, app_ids: list[int], values: list[dict]) -> list[dict]:
+    """
+    Takes the ids and the column values of freshly inserted rows of one application table, returns their catalog entries
+    """
+    return [
+        {
+            "form_id": form_id,
+            "app_id": app_id,
+            "user_id": row["user_id"],
+            "status": str(row["status"]),
+            "is_public": bool(row["is_public"]),
+            "is_current": row["current_snapshot_id"] < 0,
+            "created_at": row["created_at"],
+        }
+        for app_id, row in zip(app_ids, values)
+    ]
+
+
+def add_catalog_entries(session: Session, form_id: int, app_ids: list[int], values: list[dict]) -> None:
+    """
+    Same as add_catalog_entry for many rows of one form in one statement, see entries_from_values
+    """
+    if app_ids:
+        session.execute(insert(OrmApplicationCatalog), entries_from_values(form_id, app_ids, values))
+
+
+def update_catalog_entries(session: Session, form_id: int, app_ids: list[int] | Select, values: dict) -> None:
+    """
+    Sets the given values (any of status, is_public, is_current) for the given applications of one form.\n
+    app_ids is either a list of ids or a select of ids, which is used as a subquery
+    """
+    if isinstance(app_ids, list) and not app_ids:
+        return
+    session.execute(
+        update(OrmApplicationCatalog)
+        .where(OrmApplicationCatalog.form_id == form_id, OrmApplicationCatalog.app_id.in_(app_ids))
+        .values(**values)
+    )
+
+
+def set_status_and_visibility(session: Session, form_id: int, ids_by_status: dict[str, list[int]], published: list[int]) -> None:
+    """
+    Sets the status of the applications listed under it and is_public of the published ones, all of one form, in one statement
+    """
+    app_ids = {app_id for ids in ids_by_status.values() for app_id in ids} | set(published)
+    if not app_ids:
+        return
+    values = {}
+    if ids_by_status:
+        values["status"] = case(
+            *((OrmApplicationCatalog.app_id.in_(ids), status) for status, ids in ids_by_status.items()),
+            else_=OrmApplicationCatalog.status,
+        )
+    if published:
+        values["is_public"] = case((OrmApplicationCatalog.app_id.in_(published), True), else_=OrmApplicationCatalog.is_public)
+    update_catalog_entries(session, form_id, sorted(app_ids), values)
+
+
+def get_catalog_entries(session: Session,
+                        statuses: list[str] | None = None,
+                        is_public: bool | None = None,
+                        user_id: int | None = None,
+                        current_only: bool = True) -> list[OrmApplicationCatalog]:
+    """
+    Returns the catalog entries matching ALL given filters, ordered by form_id and app_id.
+    Filters which are None are not applied.
+    """
+    query = select(OrmApplicationCatalog)
+    if current_only:
+        query = query.where(OrmApplicationCatalog.is_current.is_(True))
+    if statuses is not None:
+        query = query.where(OrmApplicationCatalog.status.in_([str(s) for s in statuses]))
+    if is_public is not None:
+        query = query.where(OrmApplicationCatalog.is_public.is_(is_public))
+    if user_id is not None:
+        query = query.where(OrmApplicationCatalog.user_id == user_id)
+    query = query.order_by(OrmApplicationCatalog.form_id, OrmApplicationCatalog.app_id)
+    return list(session.scalars(query).all())
+
+
+def load_rows(session: Session, entries: list[OrmApplicationCatalog]) -> list:
+    """
+    Fetches the application table rows of the given catalog entries with one query per form.\n
+    Returns the rows in the order of the entries, entries without a row are skipped,
+    as are the forms whose table a read replica hasn't replayed yet
+    """
+    ids_by_form: dict[int, list[int]] = {}
+    for entry in entries:
+        ids_by_form.setdefault(entry.form_id, []).append(entry.app_id)
+
+    tables = []
+    for form_id in ids_by_form:
+        try:
+            tables.append(formRegistry.get_form_table(form_id))
+        except KeyError:
+            continue
+
+    rows_by_key = {}
+    for table in formRegistry.present_form_tables(session, tables):
+        tableClass = table.table_class
+        for row in session.scalars(select(tableClass).where(tableClass.id.in_(ids_by_form[table.form_id]))).all():
+            rows_by_key[(table.form_id, row.id)] = row
+
+    rows = []
+    for entry in entries:
+        row = rows_by_key.get((entry.form_id, entry.app_id))
+        if row is not None:
+            rows.append(row)
+    return rows
+
+
+def rebuild_catalog(session: Session) -> int:
+    """
+    Recreates the catalog from all form tables.\n
+    Returns the number of catalog entries
+    """
+    ensure_catalog_table()
+    session.execute(delete(OrmApplicationCatalog))
+    count = 0
+    for form in formCrud.get_all_forms(session):
+        try:
+            tableClass = formRegistry.get_form_table(form.id).table_class
+        except KeyError:
+            continue  # form without application table
+        rows = session.execute(
+            select(tableClass.id, tableClass.form_id, tableClass.user_id, tableClass.status,
+                   tableClass.is_public, tableClass.created_at, tableClass.current_snapshot_id)
+        ).all()
+        entries = [_entry_from_row(row) for row in rows]
+        if entries:
+            session.execute(insert(OrmApplicationCatalog), entries)
+        count += len(entries)
+    return count
+
+
+if __name__ == "__main__":
+    import sys
+
+    if sys.argv[1:] != ["rebuild"]:
+        print("Usage: python -m backend.crud.catalog rebuild")
+        sys.exit(2)
+    with db.get_session() as session:
+        print(f"Application catalog rebuilt with {rebuild_catalog(session)} entries")
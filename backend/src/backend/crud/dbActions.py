@@ -3,11 +3,11 @@ import json
 from typing import Type
 
 from fastapi import HTTPException
-from sqlalchemy import Boolean, Column, Date, Float, Integer, String, delete, DateTime, text
-from sqlalchemy.orm import Session
+from sqlalchemy import Boolean, Column, Date, Float, Integer, String, delete, DateTime, insert, text, update
+from sqlalchemy.orm import DeclarativeBase, Session, lazyload
 
 # from backend.models.orm import Base
-from backend.core import db
+from backend.core import db, formRegistry, offload, schemaVersion
 
 """
 Usage API:
@@ -18,16 +18,26 @@ Usage non-API:
 
 """
 
+def _newTableBase() -> type:
+    """
+    Returns a fresh declarative base, so every created table class has its own MetaData
+    """
+    class TableBase(DeclarativeBase):
+        pass
+    return TableBase
+
+
 def createTableClass(tablename: str, columns: dict) -> type:
     """
     ATTENTION: You most likely DON'T want to call this directly!\n
-    Creates an Orm table class from a dict of columns
+    Creates an Orm table class from a dict of columns and creates its table in the db\n
+    Only DDL for this one table is emitted, other tables are neither reflected nor checked
     """
-    Base = db.get_base(reload=True)
+    Base = _newTableBase()
     attrs = {"__tablename__": tablename}
     attrs.update(columns)  # add the column definitions
     tableclass = type(tablename, (Base,), attrs)
-    Base.metadata.create_all(bind=db.engine)  # Creates tables from Base in db, does nothing to existing tables
+    tableclass.__table__.create(bind=db.engine, checkfirst=True)  # does nothing if the table already exists
     return tableclass
 
 
@@ -71,8 +81,11 @@ def createFormTable(id: int, xoev: str):
                 "admin_id": Column(Integer, nullable=True),
                 "status": Column(String, server_default=text("'PENDING'"), nullable=False),
                 "created_at": Column(DateTime, server_default=text("CURRENT_TIMESTAMP"), nullable=False),
-                "snapshots": Column(String, nullable=False), # JSON string of {previousSnapshotID: int | None, currentSnapshotID: int, nextSnapshotID: int | None}
-                "is_public": Column(Boolean, server_default=text("false"), nullable=False)
+                "previous_snapshot_id": Column(Integer, nullable=True, index=True),
+                "current_snapshot_id": Column(Integer, server_default=text("-1"), nullable=False, index=True), # -1 while this is the newest revision
+                "next_snapshot_id": Column(Integer, nullable=True, index=True),
+                "is_public": Column(Boolean, server_default=text("false"), nullable=False),
+                "version": Column(Integer, server_default=text("0"), nullable=False), # bumped by every change, see crud.application
                 }
     if xoev == "":
         raise Exception("xoev is empty")
@@ -82,10 +95,19 @@ def createFormTable(id: int, xoev: str):
 
     for block in xoevDict["blocks"].values():
         columns[block["label"]] = matchType(block["data_type"])
+    # the DDL goes through db.engine, off the event loop when called from an async session
+    return offload.run_blocking(_createAndRegisterFormTable, id, tablename, columns)
+
+
+def _createAndRegisterFormTable(id: int, tablename: str, columns: dict) -> type:
     try:
-        return createTableClass(tablename=tablename, columns=columns)
+        tableclass = createTableClass(tablename=tablename, columns=columns)
     except Exception as e:
         raise Exception("Something went wrong", e)
+    # let the other workers know, then register just this class locally
+    schema_version = schemaVersion.record_schema_change(db.engine, tablename)
+    formRegistry.register_form_table(id, tableclass, schema_version)
+    return tableclass
 
 
 def insertRow(session: Session, tableClass: type, rowData: dict | type) -> type:
@@ -111,6 +133,17 @@ def insertRow(session: Session, tableClass: type, rowData: dict | type) -> type:
         raise HTTPException(status_code=500, detail="Error inserting row")
 
 
+def insertRowReturning(session: Session, tableClass: type, rowData: dict):
+    """
+    Takes a dict of tableClass' columns\n
+    Inserts a row with one INSERT ... RETURNING, which brings back the generated id and server defaults\n
+    Returns the created row object, which is part of the session like one of insertRow.
+    Its relationships are loaded on first access instead of with extra queries right away.\n
+    Unlike insertRow, database errors (e.g. IntegrityError) are raised unchanged and the session isn't rolled back.
+    """
+    return session.scalar(insert(tableClass).values(**rowData).returning(tableClass).options(lazyload("*")))
+
+
 
 
 def updateRow(session: Session, tableClass: type, rowData: dict):
@@ -137,6 +170,40 @@ def updateRow(session: Session, tableClass: type, rowData: dict):
     return obj
 
 
+def updateRowReturning(session: Session, tableClass: type, rowData: dict):
+    """
+    Same as updateRow, but with one UPDATE ... RETURNING instead of get, flush and refresh.\n
+    rowData MUST include the primary key 'id'. A loaded object of the row in the session is updated as well.\n
+    Returns the updated row object, raises ValueError if the row doesn't exist
+    """
+    if "id" not in rowData:
+        raise ValueError("rowData must include 'id'")
+    values = {key: value for key, value in rowData.items() if key != "id"}
+    obj = session.scalar(
+        update(tableClass).where(tableClass.id == rowData["id"]).values(**values).returning(tableClass).options(lazyload("*"))
+    )
+    if obj is None:
+        raise ValueError("Object not found")
+    return obj
+
+
+def compareAndSwapRow(session: Session, tableClass: type, rowData: dict, expected: dict):
+    """
+    Same as updateRowReturning, but the row is only updated if its columns still have the values in expected,
+    checked by the UPDATE itself, so no lock is held between reading and writing the row.\n
+    Values in rowData may be sql expressions, e.g. {"id": 1, "version": tableClass.version + 1}\n
+    Returns the updated row object, or None if the row doesn't exist or doesn't match expected anymore
+    """
+    if "id" not in rowData:
+        raise ValueError("rowData must include 'id'")
+    values = {key: value for key, value in rowData.items() if key != "id"}
+    conditions = [getattr(tableClass, key) == value for key, value in expected.items()]
+    return session.scalar(
+        update(tableClass).where(tableClass.id == rowData["id"], *conditions).values(**values)
+        .returning(tableClass).options(lazyload("*"))
+    )
+
+
 
 def removeRow(session: Session, tableClass: type, id: int):
     """
@@ -185,14 +252,11 @@ def getRowsByFilter(session: Session, tableClass: type, filterDict: dict):
     return objs
 
 def get_application_table_by_id(id: int):
-    try:
-        Base = db.get_base(True)
-        tableName = "form_" + str(id)
-        return Base.classes[tableName]
-    except KeyError as k:
-        raise k
-    except Exception as e:
-        raise e
+    """
+    Returns the application table class of the form with the given id.
+    Raises KeyError if the table doesn't exist.
+    """
+    return formRegistry.get_form_table(id).table_class
 
 if __name__ == "__main__":
     # print(createTableClass("test", {"id2": String}))
@@ -1,10 +1,58 @@
+import os
+
 from backend.models.orm.base import Base
 from fastapi import HTTPException
-from sqlalchemy import Table
+from sqlalchemy import Table, select
+from sqlalchemy.engine import Engine
+from backend.core import db
+from backend.core.cache import LRUCache
 from backend.crud import dbActions
 from backend.models.orm.formtable import OrmForm
 from backend.models.domain.form import Form
 
+# Parsed "Form"s by form id, one cache per engine. Forms are immutable after creation,
+# only is_active changes, which is read from the form table on every access.
+# Environment Variables:
+#     FORM_CACHE_SIZE: maximum number of parsed forms kept in memory (default: 1024)
+_form_caches: dict[Engine, LRUCache] = {}
+
+
+def _form_cache() -> LRUCache:
+    cache = _form_caches.get(db.engine)
+    if cache is None:
+        cache = _form_caches.setdefault(db.engine, LRUCache(int(os.getenv("FORM_CACHE_SIZE", "1024"))))
+    return cache
+
+
+def invalidate_form_cache(form_id: int | None = None) -> None:
+    """
+    Drops the parsed form with the given id from the cache, all of them if form_id is None
+    """
+    if form_id is None:
+        _form_cache().clear()
+    else:
+        _form_cache().invalidate(form_id)
+
+
+def _parsed_form(row, cached: Form | None, xoev: str | None) -> Form:
+    """
+    Takes:\n
+    A form table row with id, form_name and is_active, the "Form" the cache returned for it before the row was read
+    and, if that was None, the row's xoev\n
+    Returns:\n
+    The cached "Form", or the freshly parsed and cached one on a miss, with the row's is_active
+    """
+    form = cached
+    if form is None:
+        form = Form.from_json(xoev)
+        form.id = row.id
+        form.form_name = row.form_name
+        form.is_active = row.is_active
+        _form_cache().put(row.id, form)
+    if form.is_active != row.is_active:
+        form = form.model_copy(update={"is_active": row.is_active})
+    return form
+
 def get_all_forms(session) -> list[OrmForm]:
     """
     Returns a list containing all form ORM instances.
@@ -33,6 +81,7 @@ def add_form(session, form:Form) -> Form:
     ormForm = add_orm_form(session, ormForm)
     updatedForm = Form.from_orm_model(ormForm)
     updatedOrmForm: OrmForm = dbActions.updateRow(session, OrmForm, {"id": ormForm.id, "xoev":updatedForm.to_json()})
+    invalidate_form_cache(updatedForm.id)
     return updatedForm
 
 def get_form_by_id(session, id: int) -> OrmForm:
@@ -44,4 +93,62 @@ def get_form_by_id(session, id: int) -> OrmForm:
     if result:
         orm_form = result
         return orm_form
-    raise HTTPException(status_code=404, detail="Form not found")
\ No newline at end of file
+    raise HTTPException(status_code=404, detail="Form not found")
+
+
+def get_form_names(session, form_ids) -> dict[int, str]:
+    """
+    Takes:\n
+    Any iterable of form ids, duplicates are fine\n
+    Returns:\n
+    A dict mapping each existing form id to its form_name, fetched with one query.\n
+    Only id and form_name are loaded, not the xoev.
+    """
+    ids = set(form_ids)
+    if not ids:
+        return {}
+    rows = session.execute(select(OrmForm.id, OrmForm.form_name).where(OrmForm.id.in_(ids))).all()
+    return {row.id: row.form_name for row in rows}
+
+
+def get_form(session, id: int) -> Form:
+    """
+    Returns the parsed "Form" with the given id, the xoev is only parsed on a cache miss.\n
+    The returned instance is shared, don't modify it.\n
+    Raises HTTPException if not found.
+    """
+    cached = _form_cache().get(id)
+    columns = [OrmForm.id, OrmForm.form_name, OrmForm.is_active]
+    if cached is None:
+        columns.append(OrmForm.xoev)
+    row = session.execute(select(*columns).where(OrmForm.id == id)).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Form not found")
+    return _parsed_form(row, cached, getattr(row, "xoev", None))
+
+
+def get_all_parsed_forms(session) -> list[Form]:
+    """
+    Returns all forms as parsed "Form"s ordered by id.\n
+    Only id, name and is_active are read for cached forms, the xoev of the others is fetched in one extra query.\n
+    The returned instances are shared, don't modify them.
+    """
+    cache = _form_cache()
+    rows = session.execute(select(OrmForm.id, OrmForm.form_name, OrmForm.is_active).order_by(OrmForm.id)).all()
+    # every form is looked up once: parsing the misses evicts other entries when there are more forms than fit
+    cached = {row.id: cache.get(row.id) for row in rows}
+    missing = [form_id for form_id, form in cached.items() if form is None]
+    xoevs = {}
+    if missing:
+        xoevs = dict(session.execute(select(OrmForm.id, OrmForm.xoev).where(OrmForm.id.in_(missing))).all())
+    return [_parsed_form(row, cached[row.id], xoevs.get(row.id)) for row in rows]
+
+
+def delete_form(session, id: int) -> bool:
+    """
+    Deactivates the form with the given id (forms are never removed, their applications stay)\n
+    Returns True if the form is inactive afterwards
+    """
+    ormForm = dbActions.updateRow(session, OrmForm, {"id": id, "is_active": False})
+    invalidate_form_cache(id)
+    return ormForm.is_active == False
@@ -0,0 +1,235 @@
+"""
+Single-statement listing of applications across all forms.
+
+The filters of GET /applications are compiled into ONE `UNION ALL` over the form_<id> tables.
+Every branch projects the standard columns plus the block columns folded into one JSON
+"payload" column, so the whole listing is a single round trip, ordered by the database.
+
+Pages use keyset pagination over (created_at, form_id, id): every branch only reads rows behind
+the cursor and at most `limit` of them, so a page costs the same wherever it is.
+
+On a read replica only the form tables it has already replayed are searched.
+
+Usage:
+    filters = ListingFilter(statuses=["PENDING", "APPROVED"], is_public=False)
+    applications = listing.list_applications(session, filters)
+    page, next_cursor = listing.list_page(session, filters, limit=50, cursor=None)
+"""
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import JSON, Select, and_, bindparam, func, literal, or_, select, union_all
+from sqlalchemy.orm import Session
+
+from backend.core import formRegistry
+from backend.core.formRegistry import FormTableEntry
+from backend.models.domain.application import Application
+
+# Postgres allows 100 function arguments, SQLite 127 by default, so json objects are built in chunks
+_MAX_PAIRS_PER_OBJECT = 40
+
+LISTING_COLUMNS = formRegistry.STANDARD_COLUMNS
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+
+@dataclass
+class ListingFilter:
+    """
+    Filters of a listing, None means "don't filter".
+    statuses: only applications with one of these statuses
+    is_public: only public (True) or private (False) applications
+    user_id: only applications of this user
+    current_only: skip revisions which were replaced by a newer one
+    form_id: only applications of this form
+    """
+    statuses: list[str] | None = None
+    is_public: bool | None = None
+    user_id: int | None = None
+    current_only: bool = True
+    form_id: int | None = None
+
+
+def _payload_expression(entry: FormTableEntry, dialect_name: str):
+    """
+    Folds the block columns of a form table into one JSON object {label: value}
+    """
+    table = entry.table_class.__table__
+    pairs = []
+    for column_name in entry.block_columns:
+        pairs.append(literal(column_name, literal_execute=True))
+        pairs.append(table.c[column_name])
+    chunks = [pairs[i:i + 2 * _MAX_PAIRS_PER_OBJECT] for i in range(0, len(pairs), 2 * _MAX_PAIRS_PER_OBJECT)] or [[]]
+
+    if dialect_name == "postgresql":
+        expression = func.jsonb_build_object(*chunks[0], type_=JSON)
+        for chunk in chunks[1:]:
+            expression = expression.op("||", return_type=JSON)(func.jsonb_build_object(*chunk, type_=JSON))
+    else:
+        # json_patch drops keys with null values, they are read back as None anyway
+        expression = func.json_object(*chunks[0], type_=JSON)
+        for chunk in chunks[1:]:
+            expression = func.json_patch(expression, func.json_object(*chunk), type_=JSON)
+    return expression
+
+
+def _conditions(table, entry: FormTableEntry, filters: ListingFilter, after: tuple | None) -> list:
+    conditions = []
+    if filters.current_only:
+        conditions.append(table.c.current_snapshot_id < 0)
+    # the same named parameters are shared by every branch
+    if filters.statuses is not None:
+        conditions.append(table.c.status.in_(bindparam("statuses", expanding=True)))
+    if filters.is_public is not None:
+        conditions.append(table.c.is_public == bindparam("is_public"))
+    if filters.user_id is not None:
+        conditions.append(table.c.user_id == bindparam("user_id"))
+    if after is not None:
+        # (created_at, form_id, id) > cursor, form_id is constant within a branch
+        after_form_id = after[1]
+        after_created_at = bindparam("after_created_at", type_=table.c.created_at.type)
+        if entry.form_id < after_form_id:
+            conditions.append(table.c.created_at > after_created_at)
+        elif entry.form_id > after_form_id:
+            conditions.append(table.c.created_at >= after_created_at)
+        else:
+            conditions.append(or_(
+                table.c.created_at > after_created_at,
+                and_(table.c.created_at == after_created_at, table.c.id > bindparam("after_id")),
+            ))
+    return conditions
+
+
+def _branch(entry: FormTableEntry, filters: ListingFilter, dialect_name: str,
+            limit: int | None = None, after: tuple | None = None) -> Select:
+    table = entry.table_class.__table__
+    query = select(
+        *(table.c[name] for name in LISTING_COLUMNS),
+        _payload_expression(entry, dialect_name).label("payload"),
+    ).where(*_conditions(table, entry, filters, after))
+    if limit is not None:
+        # no branch can contribute more than `limit` rows to a page
+        query = select(query.order_by(table.c.created_at, table.c.id).limit(limit).subquery())
+    return query
+
+
+def _params(filters: ListingFilter, after: tuple | None = None) -> dict:
+    params = {}
+    if filters.statuses is not None:
+        params["statuses"] = [str(status) for status in filters.statuses]
+    if filters.is_public is not None:
+        params["is_public"] = filters.is_public
+    if filters.user_id is not None:
+        params["user_id"] = filters.user_id
+    if after is not None:
+        params["after_created_at"] = after[0]
+        params["after_id"] = after[2]
+    return params
+
+
+def build_listing_query(entries: list[FormTableEntry], filters: ListingFilter, dialect_name: str,
+                        limit: int | None = None, after: tuple | None = None) -> tuple[Select, dict]:
+    """
+    Takes:\n
+    The registry entries of the form tables to search\n
+    The filters\n
+    The name of the sql dialect ("postgresql", "sqlite")\n
+    Optionally the maximum number of rows and the (created_at, form_id, id) key to start after\n
+    Returns:\n
+    The UNION ALL select ordered by created_at, form_id, id and its parameters
+    """
+    branches = [_branch(entry, filters, dialect_name, limit, after) for entry in entries]
+    combined = union_all(*branches).subquery("listing") if len(branches) > 1 else branches[0].subquery("listing")
+    query = select(combined).order_by(combined.c.created_at, combined.c.form_id, combined.c.id)
+    if limit is not None:
+        query = query.limit(limit)
+    return query, _params(filters, after)
+
+
+def build_count_query(entries: list[FormTableEntry], filters: ListingFilter) -> tuple[Select, dict]:
+    """
+    Returns the select counting all rows matching the filters and its parameters
+    """
+    branches = []
+    for entry in entries:
+        table = entry.table_class.__table__
+        branches.append(select(func.count().label("n")).select_from(table).where(*_conditions(table, entry, filters, None)))
+    combined = union_all(*branches).subquery("counts") if len(branches) > 1 else branches[0].subquery("counts")
+    return select(func.coalesce(func.sum(combined.c.n), 0)), _params(filters)
+
+
+def encode_cursor(application: Application) -> str:
+    """
+    Returns the opaque cursor pointing behind the given application
+    """
+    key = [application.created_at.isoformat(), application.form_id, application.id]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int, int]:
+    """
+    Returns the (created_at, form_id, id) key of a cursor made by encode_cursor.\n
+    Raises ValueError for anything else
+    """
+    try:
+        created_at, form_id, app_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(created_at), int(form_id), int(app_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _entries(filters: ListingFilter) -> list[FormTableEntry]:
+    if filters.statuses is not None and not filters.statuses:
+        return []
+    if filters.form_id is not None:
+        try:
+            return [formRegistry.get_form_table(filters.form_id)]
+        except KeyError:
+            return []
+    return formRegistry.get_all_form_tables()
+
+
+def list_applications(session: Session, filters: ListingFilter,
+                      limit: int | None = None, after: tuple | None = None) -> list[Application]:
+    """
+    Returns all applications across all forms matching the filters, in one query.
+    Ordered by created_at, form_id, id.\n
+    With limit and after only the next `limit` applications behind the (created_at, form_id, id) key are returned
+    """
+    entries = formRegistry.present_form_tables(session, _entries(filters))
+    if not entries:
+        return []
+    dialect_name = session.get_bind().dialect.name
+    query, params = build_listing_query(entries, filters, dialect_name, limit, after)
+    entries_by_form = {entry.form_id: entry for entry in entries}
+    return [entries_by_form[row.form_id].codec.decode_listing(row) for row in session.execute(query, params)]
+
+
+def list_page(session: Session, filters: ListingFilter, limit: int, cursor: str | None = None) -> tuple[list[Application], str | None]:
+    """
+    Keyset pagination over list_applications.\n
+    Returns the applications of the page and the cursor of the next page, None on the last page.\n
+    Raises ValueError for an invalid cursor
+    """
+    after = decode_cursor(cursor) if cursor else None
+    applications = list_applications(session, filters, limit + 1, after)
+    if len(applications) <= limit:
+        return applications, None
+    applications = applications[:limit]
+    return applications, encode_cursor(applications[-1])
+
+
+def count_applications(session: Session, filters: ListingFilter) -> int:
+    """
+    Returns the number of applications matching the filters, in one query
+    """
+    entries = formRegistry.present_form_tables(session, _entries(filters))
+    if not entries:
+        return 0
+    query, params = build_count_query(entries, filters)
+    return int(session.execute(query, params).scalar())
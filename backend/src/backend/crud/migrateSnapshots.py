@@ -0,0 +1,97 @@
+"""
+Migration of the application tables from the JSON `snapshots` column to snapshot id columns.
+
+Application tables used to store {previousSnapshotID, currentSnapshotID, nextSnapshotID} as a
+JSON string, which made "current revisions only" impossible to filter in SQL. New tables get the
+indexed integer columns previous_snapshot_id, current_snapshot_id and next_snapshot_id instead.
+This module adds them to existing tables, copies the ids out of the JSON and drops the old column.
+Standard columns introduced later (ADDED_COLUMNS, e.g. `version`) are added to existing tables the same way.
+It runs on startup (see `ormUtil.user_db_setup`) and does nothing for tables already migrated.
+
+Run it manually with:
+    python -m backend.crud.migrateSnapshots
+"""
+
+from sqlalchemy import Index, MetaData, Table, bindparam, inspect, select, text, update
+from sqlalchemy.engine import Connection
+
+from backend.core import db, formRegistry, schemaVersion
+from backend.models.domain.application import Snapshots
+
+SNAPSHOT_COLUMNS = {
+    "previous_snapshot_id": "INTEGER",
+    "current_snapshot_id": "INTEGER DEFAULT -1 NOT NULL",
+    "next_snapshot_id": "INTEGER",
+}
+
+LEGACY_COLUMN = "snapshots"
+
+# standard columns added after the first tables were created, same definitions as in dbActions.createFormTable
+ADDED_COLUMNS = {
+    "version": "INTEGER DEFAULT 0 NOT NULL",
+}
+
+
+def _migrate_table(conn: Connection, table_name: str) -> bool:
+    """
+    Migrates one application table inside the given transaction.\n
+    Returns True if anything was changed
+    """
+    existing = {column["name"] for column in inspect(conn).get_columns(table_name)}
+    definitions = {**SNAPSHOT_COLUMNS, **ADDED_COLUMNS}
+    missing = [name for name in definitions if name not in existing]
+    if not missing and LEGACY_COLUMN not in existing:
+        return False
+
+    quote = conn.dialect.identifier_preparer.quote
+    for name in missing:
+        conn.execute(text(f"ALTER TABLE {quote(table_name)} ADD COLUMN {quote(name)} {definitions[name]}"))
+
+    table = Table(table_name, MetaData(), autoload_with=conn)
+    if LEGACY_COLUMN in existing:
+        rows = conn.execute(select(table.c.id, table.c[LEGACY_COLUMN])).all()
+        values = []
+        for row in rows:
+            snapshots = Snapshots.from_json(row[1]) if row[1] else Snapshots()
+            values.append({"row_id": row.id, **snapshots.to_columns()})
+        if values:
+            conn.execute(
+                update(table).where(table.c.id == bindparam("row_id")).values(
+                    previous_snapshot_id=bindparam("previous_snapshot_id"),
+                    current_snapshot_id=bindparam("current_snapshot_id"),
+                    next_snapshot_id=bindparam("next_snapshot_id"),
+                ),
+                values,
+            )
+        conn.execute(text(f"ALTER TABLE {quote(table_name)} DROP COLUMN {quote(LEGACY_COLUMN)}"))
+        table = Table(table_name, MetaData(), autoload_with=conn)
+
+    for name in SNAPSHOT_COLUMNS:
+        # same name as Column(index=True) gives the index in new tables
+        Index(f"ix_{table_name}_{name}", table.c[name]).create(bind=conn, checkfirst=True)
+    return True
+
+
+def migrate_form_tables() -> list[str]:
+    """
+    Migrates all application tables which still have the JSON snapshots column
+    or are missing a snapshot id column or one of ADDED_COLUMNS.\n
+    Returns the names of the migrated tables
+    """
+    migrated = []
+    for table_name in inspect(db.engine).get_table_names():
+        if formRegistry.form_id_from_table_name(table_name) is None:
+            continue
+        with db.engine.begin() as conn:
+            changed = _migrate_table(conn, table_name)
+        if changed:
+            schemaVersion.record_schema_change(db.engine, table_name)
+            migrated.append(table_name)
+    if migrated:
+        formRegistry.get_registry().invalidate()
+    return migrated
+
+
+if __name__ == "__main__":
+    tables = migrate_form_tables()
+    print(f"Migrated {len(tables)} application tables: {', '.join(tables) or '-'}")
@@ -0,0 +1,91 @@
+"""
+Review queue of the pending applications for admins.
+
+Admins working the pending list claim a batch of applications, which are leased to them for
+QUEUE_LEASE_SECONDS, so several admins never review the same application at the same time.
+The lease lives on the catalog entry (leased_by, lease_expires_at). The queue is the set of pending
+current revisions in the order of their creation, covered by the partial index ix_application_catalog_pending.
+
+A claim is one statement:
+    UPDATE application_catalog SET leased_by = :admin, lease_expires_at = :until
+    WHERE (form_id, app_id) IN (SELECT ... pending, lease free, expired or already mine ... LIMIT n FOR UPDATE SKIP LOCKED)
+    RETURNING form_id, app_id
+On Postgres, SKIP LOCKED lets concurrent claims pass each other's rows instead of waiting for them,
+so claims of different admins don't serialize and never hand out the same application.
+SQLite has no row locks (SQLAlchemy leaves out FOR UPDATE there): it serializes writers on the database,
+so the same statement is already atomic.
+
+Claiming again renews the admin's own leases, a decided application leaves the queue with its status.
+
+Environment Variables:
+    QUEUE_LEASE_SECONDS: how long a claimed application stays leased (default: 900)
+    QUEUE_MAX_CLAIM: maximum number of applications per claim (default: 100)
+"""
+
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, or_, select, text, tuple_, update
+from sqlalchemy.orm import Session
+
+from backend.models.orm.catalogtable import PENDING_CONDITION, OrmApplicationCatalog
+
+QUEUE_LEASE_SECONDS = float(os.getenv("QUEUE_LEASE_SECONDS", "900"))
+QUEUE_MAX_CLAIM = int(os.getenv("QUEUE_MAX_CLAIM", "100"))
+
+
+def claim(session: Session, admin_id: int, n: int) -> tuple[list, datetime]:
+    """
+    Takes:\n
+    The session\n
+    The admin's user id\n
+    How many applications to claim (at most QUEUE_MAX_CLAIM)\n
+    Does:\n
+    Leases the oldest n pending applications which are not leased to someone else, renewing the admin's own leases\n
+    Returns:\n
+    The leased entries (rows with form_id and app_id, e.g. for catalog.load_rows) in queue order and when the lease expires
+    """
+    now = datetime.now()
+    until = now + timedelta(seconds=QUEUE_LEASE_SECONDS)
+    catalog = OrmApplicationCatalog
+    candidates = (
+        select(catalog.form_id, catalog.app_id)
+        .where(
+            text(PENDING_CONDITION),
+            or_(catalog.leased_by.is_(None), catalog.lease_expires_at < now, catalog.leased_by == admin_id),
+        )
+        .order_by(catalog.created_at, catalog.form_id, catalog.app_id)
+        .limit(min(n, QUEUE_MAX_CLAIM))
+        .with_for_update(skip_locked=True)
+    )
+    rows = session.execute(
+        update(catalog)
+        .where(tuple_(catalog.form_id, catalog.app_id).in_(candidates))
+        .values(leased_by=admin_id, lease_expires_at=until)
+        .returning(catalog.form_id, catalog.app_id, catalog.created_at)
+        .execution_options(synchronize_session=False)
+    ).all()
+    rows.sort(key=lambda row: (row.created_at, row.form_id, row.app_id))  # RETURNING has no order
+    return rows, until
+
+
+def release(session: Session, admin_id: int, keys: list[tuple[int, int]] | None = None) -> int:
+    """
+    Takes:\n
+    The session\n
+    The admin's user id\n
+    (form_id, app_id) of applications to give back, or None for all of the admin's leases\n
+    Returns:\n
+    How many leases were released, leases of other admins are never touched
+    """
+    catalog = OrmApplicationCatalog
+    conditions = [catalog.leased_by == admin_id]
+    if keys is not None:
+        if not keys:
+            return 0
+        conditions.append(tuple_(catalog.form_id, catalog.app_id).in_(keys))
+    result = session.execute(
+        update(catalog).where(and_(*conditions)).values(leased_by=None, lease_expires_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
 
+import backend.core.roleAuth as roleAuth
 import backend.crud.dbActions as dbActions
 from backend.models.domain import user
 from backend.models.orm.roletable import (
@@ -21,9 +22,11 @@ def add_role_assignment(
     if existing_assignment:
         return None  # User is already assigned that role
 
-    return dbActions.insertRow(
+    created = dbActions.insertRow(
         session, OrmRoleAssignment, to_orm_model(domain_role_assignment)
     )
+    roleAuth.invalidate_user_roles(domain_role_assignment.user_id)
+    return created
 
 
 def get_user_roles(session: Session, user_id: int) -> list[user.RoleAssignment]:
@@ -1,50 +1,77 @@
 
+from datetime import date
+
+from psycopg import errors as pg_errors
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 
+from backend.core import db
 from backend.models import User
-from backend.models.orm.usertable import OrmUser, to_domain_model, to_orm_model
-from backend.models.orm.roletable import to_domain_model as role_to_domain_model
+from backend.models.domain.user import UserType
+from backend.models.orm.usertable import OrmUser, to_domain_model
+from backend.models.orm.roletable import OrmRoleAssignment
 import backend.crud.dbActions as dbActions
-from . import role as roleCrud
+import backend.core.roleAuth as roleAuth
 
 def get_all_users(session: Session) -> list[User]:
     """
     Retrieve all users in the system.
     """
-    orm_users = dbActions.getRows(session, OrmUser)
+    orm_users = session.scalars(select(OrmUser).order_by(OrmUser.id)).all()  # roles are loaded in one more query
     users = []
     for orm_user in orm_users:
         users.append(to_domain_model(session, orm_user))
     return users
 
-def add_user(session: Session, user: User):
+# messages for the unique indexes of user_table, by index name
+_DUPLICATE_DETAILS = {
+    index.name: "Username already in use" if "user_name" in index.columns.keys() else "Email already in use"
+    for index in OrmUser.__table__.indexes if index.unique
+}
+
+def _duplicate_detail(session: Session, error: IntegrityError, user: User) -> str:
     """
-    Create a new user in the system.
-    Returns None if user couldn't be created otherwise returns OrmUser instance
+    Returns the 409 message for a violated unique index of user_table.\n
+    Postgres names the index, otherwise the taken name or email is looked up
     """
-    existing_user = session.query(OrmUser).filter_by(user_name=user.username).first()
-    if existing_user:
-        raise HTTPException(status_code=409, detail="Username already in use") # username already in use
-    existing_user = session.query(OrmUser).filter_by(email=user.email).first()
-    if existing_user:
-        raise HTTPException(status_code=409, detail="Email already in use") # email already in use
-    created_ormuser = dbActions.insertRow(session, OrmUser, to_orm_model(user))
-    created_user = to_domain_model(session, created_ormuser)
-
-    for role in user.user_roles:
-        role.user_id = created_user.id
-
-    # If the user has roles to be assigned, assign them and create them in the db
-    if len(user.user_roles) > 0:
-        created_orm_role_assignments = []
-        for role_assignment in user.user_roles:
-            created_orm_role_assignments.append(roleCrud.add_role_assignment(session, role_assignment))
-        created_role_assignments = []
-        for orm_role_assignment in created_orm_role_assignments:
-            created_role_assignments.append(role_to_domain_model(orm_role_assignment))
-        created_user.user_roles = created_role_assignments
-    return created_user
+    diag = getattr(error.orig, "diag", None)
+    detail = _DUPLICATE_DETAILS.get(getattr(diag, "constraint_name", None))
+    if detail is not None:
+        return detail
+    taken_names, taken_emails = find_taken(session, [user.username], [user.email] if user.email else [])
+    if taken_names:
+        return "Username already in use"
+    if taken_emails:
+        return "Email already in use"
+    return "User already exists"
+
+def add_user(session: Session, user: User) -> User:
+    """
+    Create a new user in the system together with their role assignments,
+    with one INSERT for the user and one for all roles.\n
+    Duplicate usernames and emails are rejected by the unique indexes of user_table: raises HTTPException 409.
+    Only the user's rows are rolled back then, other work of the session stays.\n
+    Returns the created user, the given user and its role assignments are left unchanged
+    """
+    try:
+        with session.begin_nested():
+            user_id = dbActions.insertRowReturning(session, OrmUser, {
+                "user_name": user.username, "creation_date": user.date_created, "email": user.email,
+                "password": user.hashed_password, "is_active": user.is_active,
+            }).id
+            # duplicate roles are dropped, as add_role_assignment does
+            roles = [role_assignment.model_copy(update={"user_id": user_id})
+                     for role_assignment in {r.role: r for r in user.user_roles}.values()]
+            if roles:
+                session.execute(insert(OrmRoleAssignment), [
+                    {"user_id": user_id, "role": r.role, "assignment_date": r.assignment_date} for r in roles
+                ])
+    except IntegrityError as e:
+        raise HTTPException(status_code=409, detail=_duplicate_detail(session, e, user))
+    roleAuth.invalidate_user_roles(user_id)
+    return user.model_copy(update={"id": user_id, "user_roles": roles})
 
 
 
@@ -73,37 +100,103 @@ def get_user_by_email(email: str, session:Session) -> User | None:
         return to_domain_model(session, orm_user)
     raise HTTPException(status_code=404, detail="User not found")
 
+def update_password_hash(session: Session, user_id: int, hashed_password: str) -> None:
+    """
+    Replaces the stored password hash of a user, e.g. after the hashing parameters changed.
+    """
+    session.execute(update(OrmUser).where(OrmUser.id == user_id).values(password=hashed_password))
+
+# --- Bulk creation ---
+
+USER_BATCH_SIZE = 1000  # rows per INSERT statement
+
+def find_taken(session: Session, usernames: list[str], emails: list[str]) -> tuple[set[str], set[str]]:
+    """
+    Takes:\n
+    Usernames and emails of users to be created\n
+    Returns:\n
+    The ones of them which are already registered, as (usernames, emails), in one query
+    """
+    rows = session.execute(
+        select(OrmUser.user_name, OrmUser.email).where(or_(OrmUser.user_name.in_(usernames), OrmUser.email.in_(emails)))
+    ).all()
+    wanted_names, wanted_emails = set(usernames), set(emails)
+    return ({name for name, _ in rows if name in wanted_names}, {email for _, email in rows if email in wanted_emails})
+
+def insert_users(session: Session, users: list[dict]) -> list[int]:
+    """
+    Takes:\n
+    Dicts with "username", "email", "hashed_password" and "role" of users which don't exist yet\n
+    Does:\n
+    Inserts the users and their role assignments, USER_BATCH_SIZE rows per statement\n
+    Returns:\n
+    The new ids in the order of users
+    """
+    today = date.today()
+    ids = []
+    for start in range(0, len(users), USER_BATCH_SIZE):
+        batch = users[start:start + USER_BATCH_SIZE]
+        batch_ids = session.scalars(
+            insert(OrmUser).returning(OrmUser.id, sort_by_parameter_order=True),
+            [{"user_name": u["username"], "email": u["email"], "password": u["hashed_password"],
+              "creation_date": today, "is_active": True} for u in batch],
+        ).all()
+        session.execute(
+            insert(OrmRoleAssignment),
+            [{"user_id": user_id, "role": UserType(u["role"]), "assignment_date": today} for user_id, u in zip(batch_ids, batch)],
+        )
+        ids.extend(batch_ids)
+    return ids
+
+def copy_users(users: list[dict]) -> list[int]:
+    """
+    Postgres only, same as insert_users but with COPY on its own psycopg connection and transaction.\n
+    The ids are taken from the id sequence first, so the role assignments can be copied right after the users.
+
+    Raises IntegrityError, like insert_users, if a name or email was registered in the meantime.
+    """
+    today = date.today()
+    try:
+        with db.get_psycopg_connection() as conn:  # commits when the block succeeds
+            with conn.cursor() as cur:
+                cur.execute(
+                    "SELECT nextval(pg_get_serial_sequence('user_table', 'id')) FROM generate_series(1, %s)", (len(users),)
+                )
+                ids = [row[0] for row in cur.fetchall()]
+                with cur.copy("COPY user_table (id, user_name, creation_date, email, password, is_active) FROM STDIN") as copy:
+                    for user_id, u in zip(ids, users):
+                        copy.write_row((user_id, u["username"], today, u["email"], u["hashed_password"], True))
+                with cur.copy("COPY role_assignment (user_id, assignment_date, role) FROM STDIN") as copy:
+                    for user_id, u in zip(ids, users):
+                        copy.write_row((user_id, today, UserType(u["role"]).name))
+    except pg_errors.UniqueViolation as e:
+        raise IntegrityError("COPY user_table", None, e) from e
+    return ids
+
 # --- Get users by role ---
 
+def _get_users_with_role(session: Session, role: str) -> list[User]:
+    """
+    Retrieve all users with the given role, with their roles, in two queries.
+    """
+    with_role = select(OrmRoleAssignment.user_id).where(OrmRoleAssignment.role == role)
+    orm_users = session.scalars(select(OrmUser).where(OrmUser.id.in_(with_role)).order_by(OrmUser.id)).all()
+    return [to_domain_model(session, orm_user) for orm_user in orm_users]
+
 def get_all_admins(session: Session) -> list[User]:
     """
     Retrieve all users with the 'ADMIN' role.
     """
-    admin_user_roles = roleCrud.get_all_admin_roles(session)
-    admin_user_ids = [role.user_id for role in admin_user_roles]
-    users = []
-    for admin_user_id in admin_user_ids:
-        users.append(get_user_by_id(admin_user_id, session))
-    return users
+    return _get_users_with_role(session, "ADMIN")
 
 def get_all_applicants(session: Session) -> list[User]:
     """
     Retrieve all users with the 'APPLICANT' role.
     """
-    applicant_user_roles = roleCrud.get_all_applicant_roles(session)
-    applicant_user_ids = [role.user_id for role in applicant_user_roles]
-    users = []
-    for applicant_user_id in applicant_user_ids:
-        users.append(get_user_by_id(applicant_user_id, session))
-    return users
+    return _get_users_with_role(session, "APPLICANT")
 
 def get_all_reporters(session: Session) -> list[User]:
     """
     Retrieve all users with the 'REPORTER' role.
     """
-    reporter_user_roles = roleCrud.get_all_reporter_roles(session)
-    reporter_user_ids = [role.user_id for role in reporter_user_roles]
-    users = []
-    for reporter_user_id in reporter_user_ids:
-        users.append(get_user_by_id(reporter_user_id, session))
-    return users
+    return _get_users_with_role(session, "REPORTER")
@@ -181,7 +181,6 @@ def create_demo_applications() -> None:
     from backend.crud import applicationCrud, dbActions, formCrud
     from backend.crud.user import get_user_by_name
     from backend.models.domain.application import Application, ApplicationStatus
-    from backend.models.domain.form import Form
 
     with db.get_session() as session:
         existing_apps = applicationCrud.get_all_applications(session)
@@ -199,7 +198,7 @@ def create_demo_applications() -> None:
             (form for form in forms if form.form_name == demo_form_name),
             forms[0],
         )
-        target_form = Form.from_orm_model(target_form_orm)
+        target_form = formCrud.get_form(session, target_form_orm.id)
 
         def _get_user(username: str) -> Optional[int]:
             try:
@@ -2,6 +2,7 @@
 
 from datetime import datetime # stdlib
 from enum import StrEnum
+from typing import Literal
 
 from pydantic import BaseModel, Field #3rdparty
 
@@ -25,6 +26,27 @@ class Snapshots(BaseModel):
     def from_json(cls, json_str: str) -> "Snapshots":
         return cls.model_validate_json(json_str)
 
+    def to_columns(self) -> dict:
+        """
+        Returns the snapshot ids as values of the snapshot columns of an application table
+        """
+        return {
+            "previous_snapshot_id": self.previousSnapshotID,
+            "current_snapshot_id": self.currentSnapshotID,
+            "next_snapshot_id": self.nextSnapshotID,
+        }
+
+    @classmethod
+    def from_columns(cls, row) -> "Snapshots":
+        """
+        Takes a row of an application table, returns its snapshot ids
+        """
+        return cls(
+            previousSnapshotID=row.previous_snapshot_id,
+            currentSnapshotID=row.current_snapshot_id,
+            nextSnapshotID=row.next_snapshot_id,
+        )
+
 
 class Application(BaseModel):
     """A class representing an application submitted by a user.
@@ -45,6 +67,7 @@ class Application(BaseModel):
     snapshots: Snapshots = Field(default_factory=Snapshots)
     jsonPayload: dict = {}  # The actual data of the application
     is_public: bool = False  # Indicates if the application is public
+    version: int = 0  # Counts the changes of this row, for compare-and-swap updates
 
 
 
@@ -67,6 +90,7 @@ class ApplicationResponseItem(BaseModel):
     is_public: bool
     snapshots: Snapshots
     jsonPayload: dict
+    version: int = 0
     
 
 
@@ -84,11 +108,63 @@ def application_to_response_item(application: Application) -> ApplicationRespons
         created_at=application.created_at,
         is_public=application.is_public,
         snapshots=application.snapshots,
-        jsonPayload=newJson
+        jsonPayload=newJson,
+        version=application.version,
     )
 
 
 class ApplicationUpdate(BaseModel):
     form_id: int
     application_id: int
-    payload: dict
\ No newline at end of file
+    payload: dict
+    version: int | None = None  # the version the edit is based on, a newer one in the db means 409
+
+class IngestRejection(BaseModel):
+    """A row of a bulk application upload which wasn't inserted: its position (starting at 1) and why."""
+    row: int
+    error: str
+
+
+class IngestReport(BaseModel):
+    """Response model of a bulk application upload into one form."""
+    form_id: int
+    inserted: int
+    rejected: list[IngestRejection]
+
+
+class BulkStatusItem(BaseModel):
+    """One change of POST /applications/bulk-status: APPROVED, REJECTED or PUBLIC (publish) for one application."""
+    form_id: int
+    application_id: int
+    target_status: ApplicationStatus | Literal["PUBLIC"]
+
+
+class BulkStatusOutcome(StrEnum):
+    UPDATED = "UPDATED"
+    NOT_FOUND = "NOT_FOUND"
+    INVALID_TRANSITION = "INVALID_TRANSITION"
+
+
+class BulkStatusResult(BaseModel):
+    """Outcome of one BulkStatusItem, in the order of the request. detail says why it wasn't applied."""
+    form_id: int
+    application_id: int
+    target_status: str
+    outcome: BulkStatusOutcome
+    detail: str | None = None
+
+
+class ApplicationKey(BaseModel):
+    form_id: int
+    application_id: int
+
+
+class QueueClaim(BaseModel):
+    """Response of POST /queue/claim: the applications leased to the admin, oldest first, and until when."""
+    lease_expires_at: datetime
+    applications: list[ApplicationResponseItem]
+
+
+class QueueRelease(BaseModel):
+    """Response of POST /queue/release: how many leases were given back."""
+    released: int
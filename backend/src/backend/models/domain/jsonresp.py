@@ -9,9 +9,14 @@ class JsonResponse:
 
 @dataclass
 class PaginatedResponse:
+    """
+    One page of a keyset paginated listing.
+    next_cursor: pass as `cursor` to get the next page, None on the last page
+    total: number of all matching items, None if the count was skipped
+    """
     success: bool
     message: str
     data: List[Any]
-    total: int
-    page: int
-    page_size: int
\ No newline at end of file
+    page_size: int
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
\ No newline at end of file
@@ -62,6 +62,26 @@ class UserID(BaseModel):
     """Response model containing just the user's ID."""
     id: int
 
+class BulkUserResult(BaseModel):
+    """
+    Outcome of one row of a bulk user import.
+    Attributes:
+        row (int): Position of the row in the upload, starting at 1 (the CSV header doesn't count).
+        username (str | None): The row's username, if it had one.
+        id (int | None): The new user's id if the row was created.
+        error (str | None): Why the row wasn't created.
+    """
+    row: int
+    username: str | None = None
+    id: int | None = None
+    error: str | None = None
+
+class BulkUserReport(BaseModel):
+    """Response model of a bulk user import: counts and one result per row."""
+    created: int
+    failed: int
+    results: list[BulkUserResult]
+
 class User(BaseModel):
     """
     Represents a user in the system.
@@ -1,6 +1,9 @@
-from . import base, formtable, usertable
+from . import base, catalogtable, formtable, usertable
 
 from .base import Base
+from .catalogtable import (
+    OrmApplicationCatalog,
+)
 from .formtable import (
     OrmForm,
 )
@@ -10,6 +13,9 @@ __all__ = [
     "base",
     "Base",
 
+    "catalogtable",
+    "OrmApplicationCatalog",
+
     "formtable",
     "OrmForm",
 
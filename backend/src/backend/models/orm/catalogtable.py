@@ -0,0 +1,41 @@
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, String, text
+
+from backend.core.ormUtil import SchemaBase
+
+# the review queue (crud.reviewQueue): pending current revisions. Queries use the same text as the partial index,
+# so SQLite's planner, which matches index conditions literally, can use it
+PENDING_CONDITION = "application_catalog.status = 'PENDING' AND application_catalog.is_current"
+
+
+class OrmApplicationCatalog(SchemaBase):
+    """
+    One row per row of every form_<id> table, so cross-form listings need a single indexed query.
+    The catalog is kept in sync by crud.application, crud.catalog.rebuild_catalog recreates it from the form tables.
+    OrmApplicationCatalog contains:
+    - form_id, app_id: Integer, primary key; point to the row "app_id" in table "form_<form_id>"
+    - user_id: Integer, not nullable
+    - status: String, not nullable
+    - is_public: Boolean, not nullable
+    - is_current: Boolean, not nullable; False for revisions which were replaced by a newer one
+    - created_at: DateTime, not nullable
+    - leased_by, lease_expires_at: Integer / DateTime, nullable; the admin reviewing the application and until when,
+      see crud.reviewQueue
+    """
+    __tablename__ = "application_catalog"
+    form_id = Column(Integer, primary_key=True)
+    app_id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    status = Column(String, nullable=False)
+    is_public = Column(Boolean, nullable=False, default=False)
+    is_current = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime, nullable=False)
+    leased_by = Column(Integer, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_application_catalog_current_status", "is_current", "status", "is_public"),
+        Index("ix_application_catalog_user_id", "user_id", "is_current"),
+        # the review queue: only the pending current revisions, in queue order
+        Index("ix_application_catalog_pending", "created_at", "form_id", "app_id",
+              postgresql_where=text(PENDING_CONDITION), sqlite_where=text(PENDING_CONDITION)),
+    )
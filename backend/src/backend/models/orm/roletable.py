@@ -19,7 +19,7 @@ class OrmRoleAssignment(SchemaBase):
 
     __tablename__ = "role_assignment"
     id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, nullable=False, index=True)
     assignment_date = Column(Date, nullable=False)
     role = Column(Enum(UserType), nullable=False)
 
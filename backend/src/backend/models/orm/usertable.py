@@ -1,7 +1,7 @@
 from typing import Any, Type
 
 from sqlalchemy import Column, Date, Integer, String, Boolean
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, relationship
 
 
 from backend.models.domain.user import User
@@ -15,12 +15,22 @@ class OrmUser(SchemaBase):
     """
     __tablename__ = "user_table"
     id = Column(Integer, primary_key=True)
-    user_name = Column(String, nullable=False)
+    user_name = Column(String, nullable=False, unique=True, index=True)  # unique indexes reject duplicates, see crud.user.add_user
     creation_date = Column(Date, nullable=False)
-    email = Column(String, nullable=True)
+    email = Column(String, nullable=True, unique=True, index=True)
     password = Column(String, nullable=False)
     is_active = Column(Boolean, nullable=False, default=1)  # 1 for active, 0 for inactive
 
+    # Loaded for all users of a query at once with one extra "user_id IN (...)" query (selectin),
+    # so user listings cost two queries regardless of their size. Roles are written through crud.role.
+    role_assignments = relationship(
+        "OrmRoleAssignment",
+        primaryjoin="OrmUser.id == foreign(OrmRoleAssignment.user_id)",
+        order_by="OrmRoleAssignment.id",
+        lazy="selectin",
+        viewonly=True,
+    )
+
 #TODO: change user role stuff
 def to_orm_model(user: User) -> OrmUser:
     return OrmUser(
@@ -35,12 +45,12 @@ def to_orm_model(user: User) -> OrmUser:
 def to_domain_model(session: Session, orm_user: Type) -> User:
     # Import here to avoid circular dependency, feel free to try and resolve this differently
     # I can't be bothered rn -ps
-    from backend.crud.role import get_user_roles
+    from backend.models.orm.roletable import to_domain_model as role_to_domain_model
 
     return User(
         id=orm_user.id,
         username=orm_user.user_name,
-        user_roles=get_user_roles(session, orm_user.id),
+        user_roles=[role_to_domain_model(role) for role in orm_user.role_assignments],
         date_created=orm_user.creation_date,
         email=orm_user.email,
         hashed_password=orm_user.password,
@@ -0,0 +1,87 @@
+import json
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from backend.businesslogic.services import applicationIngestService
+from backend.core import db
+from backend.core.security import create_access_token
+from backend.crud import applicationCrud
+from backend.main import app
+from backend.models.domain.buildingblock import BBType, BuildingBlock
+from backend.models.orm.catalogtable import OrmApplicationCatalog
+
+
+@pytest.fixture
+def form_id(static_engine, make_form):
+    return make_form("Dog licence", {
+        1: BuildingBlock(label="name", data_type=BBType.STRING, required=True),
+        2: BuildingBlock(label="age", data_type=BBType.INTEGER),
+        3: BuildingBlock(label="born", data_type=BBType.DATE)}).id
+
+
+def _client(roles):
+    token = create_access_token({"sub": "someone", "userid": 99, "roles": roles})
+    return TestClient(app, headers={"Authorization": f"Bearer {token}"})
+
+
+def test_csv_ingest_rejects_rows_without_aborting(form_id):
+    csv_body = "\n".join([
+        "user_id,name,age,born",
+        "1,Rex,3,2021-05-01",
+        "2,,4,",  # required name missing
+        "3,Bello,three,",  # not an integer
+        "4,Fiffi,,",
+        ",Nobody,1,",  # no user
+    ])
+    response = _client(["ADMIN"]).post(f"/api/v1/applications/{form_id}/bulk", content=csv_body,
+                                       headers={"Content-Type": "text/csv"})
+
+    assert response.status_code == 200
+    report = response.json()
+    assert report["inserted"] == 2
+    assert {r["row"]: r["error"] for r in report["rejected"]} == {
+        2: "Missing required field 'name'",
+        3: "age: expected an integer",
+        5: "Missing user_id",
+    }
+
+    with db.get_session() as session:
+        applications = applicationCrud.get_all_applications_of_type(session, form_id)
+        catalog = session.scalars(select(OrmApplicationCatalog).order_by(OrmApplicationCatalog.app_id)).all()
+    assert [a.user_id for a in applications] == [1, 4]
+    assert applications[0].jsonPayload["3"]["value"] == date(2021, 5, 1)
+    assert [(e.app_id, e.user_id, e.status, e.is_current) for e in catalog] == [
+        (applications[0].id, 1, "PENDING", True), (applications[1].id, 4, "PENDING", True)]
+
+
+def test_ndjson_ingest_and_permissions(form_id):
+    lines = [json.dumps({"user_id": 1, "name": "Rex", "age": 3}), json.dumps({"user_id": 2, "name": "Bello", "colour": "brown"}),
+             "{broken"]
+    body = "\n".join(lines)
+    headers = {"Content-Type": "application/x-ndjson"}
+
+    assert _client(["APPLICANT"]).post(f"/api/v1/applications/{form_id}/bulk", content=body, headers=headers).status_code == 403
+    assert _client(["ADMIN"]).post(f"/api/v1/applications/{form_id}/bulk", content=body,
+                                   headers={"Content-Type": "text/plain"}).status_code == 415
+    assert _client(["ADMIN"]).post(f"/api/v1/applications/{form_id + 1}/bulk", content=body, headers=headers).status_code == 404
+
+    report = _client(["ADMIN"]).post(f"/api/v1/applications/{form_id}/bulk", content=body, headers=headers).json()
+    assert report["inserted"] == 1
+    assert [(r["row"], r["error"]) for r in report["rejected"]][0] == (2, "Unknown field 'colour'")
+    assert report["rejected"][1]["error"].startswith("Invalid JSON")
+
+
+def test_insert_applications_batches(form_id, monkeypatch):
+    monkeypatch.setattr(applicationCrud, "APPLICATION_BATCH_SIZE", 2)
+    rows = [applicationIngestService.validate_row(
+        {"name": BuildingBlock(label="name", data_type=BBType.STRING, required=True)},
+        {"user_id": str(i), "name": f"dog {i}"}) for i in range(5)]
+    with db.get_session() as session:
+        ids = applicationCrud.insert_applications(session, form_id, rows)
+    assert ids == sorted(ids) and len(set(ids)) == 5
+    with db.get_session() as session:
+        assert [a.jsonPayload["1"]["value"] for a in applicationCrud.get_all_applications_of_type(session, form_id)] == [
+            f"dog {i}" for i in range(5)]
@@ -0,0 +1,87 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.core import db
+from backend.core.security import create_access_token
+from backend.crud import applicationCrud
+from backend.main import app
+from backend.models.domain.application import Application, ApplicationStatus
+
+
+@pytest.fixture
+def apps(static_engine, make_form):
+    """form ids and application ids: two pending dogs, an approved dog, a revised parking permit and its new revision"""
+    dog, parking = make_form("Dog"), make_form("Parking")
+    with db.get_session() as session:
+        ids = [applicationCrud.insert_application(session, Application(
+            user_id=1, form_id=form.id, jsonPayload={"1": {"label": "name", "value": "x"}})).id
+            for form in (dog, dog, dog, parking)]
+        applicationCrud.updateApplicationStatus(session, dog.id, ids[2], ApplicationStatus.APPROVED)
+        new_revision = applicationCrud.update_application(parking.id, ids[3], {"1": {"label": "name", "value": "y"}}, session)
+    return dog.id, parking.id, ids, new_revision
+
+
+def _client(roles):
+    token = create_access_token({"sub": "someone", "userid": 99, "roles": roles})
+    return TestClient(app, headers={"Authorization": f"Bearer {token}"})
+
+
+def test_bulk_status_reports_every_item(apps, statements):
+    dog, parking, (pending1, pending2, approved, old_revision), new_revision = apps
+    items = [
+        {"form_id": dog, "application_id": pending1, "target_status": "APPROVED"},
+        {"form_id": dog, "application_id": pending1, "target_status": "PUBLIC"},  # sees the approval before it
+        {"form_id": dog, "application_id": pending2, "target_status": "REJECTED"},
+        {"form_id": dog, "application_id": approved, "target_status": "REJECTED"},
+        {"form_id": dog, "application_id": 999, "target_status": "APPROVED"},
+        {"form_id": parking, "application_id": old_revision, "target_status": "APPROVED"},
+        {"form_id": parking, "application_id": new_revision, "target_status": "PENDING"},
+        {"form_id": parking, "application_id": new_revision, "target_status": "APPROVED"},
+        {"form_id": 42, "application_id": 1, "target_status": "APPROVED"},
+    ]
+    with statements.recording():
+        response = _client(["ADMIN"]).post("/api/v1/applications/bulk-status", json=items)
+
+    assert response.status_code == 200
+    assert [r["outcome"] for r in response.json()] == [
+        "UPDATED", "UPDATED", "UPDATED", "INVALID_TRANSITION", "NOT_FOUND",
+        "INVALID_TRANSITION", "INVALID_TRANSITION", "UPDATED", "NOT_FOUND",
+    ]
+    assert statements.verbs().count("UPDATE") == 4  # one per form and one per form on the catalog
+
+    with db.get_session() as session:
+        first = applicationCrud.get_application_by_id(session, dog, pending1)
+        assert (first.status, first.is_public) == (ApplicationStatus.APPROVED, True)
+        assert applicationCrud.get_application_by_id(session, dog, pending2).status == ApplicationStatus.REJECTED
+        assert applicationCrud.get_application_by_id(session, dog, approved).status == ApplicationStatus.APPROVED
+        assert applicationCrud.get_application_by_id(session, parking, new_revision).status == ApplicationStatus.APPROVED
+        public = applicationCrud.get_all_public_applications(session)
+        assert [a.id for a in public] == [pending1]
+    # approved and published with one UPDATE, which bumped the version once
+    assert _client(["ADMIN"]).get(f"/api/v1/applications/{dog}/{pending1}").json()["version"] == 1
+
+
+def test_bulk_status_is_admin_only(apps):
+    dog, _, (pending1, *_), _ = apps
+    items = [{"form_id": dog, "application_id": pending1, "target_status": "APPROVED"}]
+    assert _client(["APPLICANT"]).post("/api/v1/applications/bulk-status", json=items).status_code == 403
+    assert _client(["ADMIN"]).post("/api/v1/applications/bulk-status",
+                                   json=[{**items[0], "target_status": "MAYBE"}]).status_code == 422
+
+
+def test_bulk_status_locks_forms_in_id_order(apps, statements):
+    dog, parking, (pending1, pending2, *_), new_revision = apps
+    items = [
+        {"form_id": parking, "application_id": new_revision, "target_status": "APPROVED"},
+        {"form_id": dog, "application_id": pending2, "target_status": "APPROVED"},
+        {"form_id": dog, "application_id": pending1, "target_status": "APPROVED"},
+    ]
+    with statements.recording():
+        response = _client(["ADMIN"]).post("/api/v1/applications/bulk-status", json=items)
+
+    assert [r["outcome"] for r in response.json()] == ["UPDATED"] * 3
+    # the locking reads, in the order they ran: lower form id first, rows in id order
+    locking = [" ".join(s.split()) for s in statements.starting_with("SELECT")]
+    locking = [s for s in locking if "current_snapshot_id" in s and "ORDER BY" in s]
+    assert [s.split(" FROM ")[1].split()[0] for s in locking] == [f"form_{dog}", f"form_{parking}"]
+    assert all(s.endswith(f"ORDER BY {s.split(' FROM ')[1].split()[0]}.id") for s in locking)
@@ -0,0 +1,97 @@
+import json
+
+import pytest
+from argon2 import PasswordHasher
+from psycopg import errors as pg_errors
+from fastapi.testclient import TestClient
+
+from backend.core import db, security
+from backend.core.security import create_access_token
+from backend.crud import userCrud
+from backend.main import app
+from backend.models.orm.roletable import OrmRoleAssignment
+from backend.models.orm.usertable import OrmUser
+
+
+@pytest.fixture
+def taken(static_engine, monkeypatch):
+    monkeypatch.setattr(security, "ph", PasswordHasher(time_cost=1, memory_cost=8, parallelism=1))  # fast hashes
+    OrmUser.__table__.create(bind=static_engine)
+    OrmRoleAssignment.__table__.create(bind=static_engine)
+    with db.get_session() as session:
+        userCrud.insert_users(session, [{"username": "taken", "email": "taken@example.org", "hashed_password": "x",
+                                         "role": "APPLICANT"}])
+
+
+@pytest.fixture
+def client(taken):
+    token = create_access_token({"sub": "admin", "userid": 99, "roles": ["ADMIN"]})
+    return TestClient(app, headers={"Authorization": f"Bearer {token}"})
+
+
+def test_csv_import_reports_every_row(client, statements):
+    csv_body = "\n".join([
+        "username,email,password,role",
+        "anna,anna@example.org,secret1,",
+        "bert,bert@example.org,secret2,REPORTER",
+        "anna,anna2@example.org,secret3,",  # name used twice in the upload
+        "taken,new@example.org,secret4,",  # already registered
+        "carl,not-an-email,secret5,",
+    ])
+    with statements.recording():
+        response = client.post("/api/v1/users/bulk", content=csv_body, headers={"Content-Type": "text/csv"})
+
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["created"], report["failed"]) == (2, 3)
+    errors = {r["row"]: r["error"] for r in report["results"] if r["error"]}
+    assert errors[3] == "Username already in use"
+    assert errors[4] == "Username already in use"
+    assert errors[5].startswith("email")
+    assert len(statements.starting_with("SELECT")) == 1  # the duplicate check
+
+    with db.get_session() as session:
+        bert = userCrud.get_user_by_name("bert", session)
+        assert [role.role.value for role in bert.user_roles] == ["REPORTER"]
+        assert security.verify_password("secret2", bert.hashed_password)
+        assert bert.id == report["results"][1]["id"]
+
+
+def test_ndjson_import_and_permissions(client):
+    lines = [json.dumps({"username": "dora", "email": "dora@example.org", "password": "pw"}), "{not json", "[1, 2]"]
+    report = client.post("/api/v1/users/bulk", content="\n".join(lines),
+                          headers={"Content-Type": "application/x-ndjson"}).json()
+    assert report["created"] == 1
+    assert report["results"][1]["error"].startswith("Invalid JSON")
+    assert report["results"][2]["error"] == "Expected a JSON object"
+
+    assert client.post("/api/v1/users/bulk", content="x", headers={"Content-Type": "text/plain"}).status_code == 415
+    applicant = create_access_token({"sub": "a", "userid": 1, "roles": ["APPLICANT"]})
+    assert client.post("/api/v1/users/bulk", content="", headers={
+        "Content-Type": "text/csv", "Authorization": f"Bearer {applicant}"}).status_code == 403
+
+
+class _DuplicateOnCopy:
+    """psycopg connection whose first statement hits a unique index, like a user registered right before the COPY"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def cursor(self):
+        return self
+
+    def execute(self, *args):
+        raise pg_errors.UniqueViolation('duplicate key value violates unique constraint "ix_user_table_user_name"')
+
+
+def test_concurrent_registration_during_copy_is_a_conflict(client, monkeypatch):
+    copy_users = userCrud.copy_users
+    monkeypatch.setattr(db, "get_psycopg_connection", _DuplicateOnCopy)
+    monkeypatch.setattr(userCrud, "insert_users", lambda session, users: copy_users(users))  # the Postgres path
+
+    response = client.post("/api/v1/users/bulk", content="username,email,password\nerik,erik@example.org,pw",
+                           headers={"Content-Type": "text/csv"})
+    assert response.status_code == 409
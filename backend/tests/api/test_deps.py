@@ -126,4 +126,11 @@ def test_role_checker():
     # Should raise HTTPException for no roles
     with pytest.raises(HTTPException) as exc_info:
         role_checker_user(payload=payload_no_roles)
-    assert exc_info.value.status_code == 403
\ No newline at end of file
+    assert exc_info.value.status_code == 403
+
+def test_get_current_user_payload_optional_without_token():
+    from backend.api.deps import get_current_user_payload_optional
+    import asyncio
+
+    assert asyncio.run(get_current_user_payload_optional(token=None)) is None
+    assert asyncio.run(get_current_user_payload_optional(token="this.is.an.invalid.token")) is None
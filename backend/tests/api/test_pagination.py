@@ -0,0 +1,40 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.core import db
+from backend.core.security import create_access_token
+from backend.crud import applicationCrud
+from backend.main import app
+from backend.models.domain.application import Application
+
+
+@pytest.fixture
+def client(static_engine, make_form):
+    form = make_form("Dog licence")
+    with db.get_session() as session:
+        for i in range(5):
+            applicationCrud.insert_application(session, Application(
+                user_id=1, form_id=form.id, jsonPayload={"1": {"label": "name", "value": str(i)}}))
+    token = create_access_token({"sub": "admin", "userid": 99, "roles": ["ADMIN"]})
+    return TestClient(app, headers={"Authorization": f"Bearer {token}"})
+
+
+def test_applications_are_paginated_with_cursor(client):
+    first = client.get("/api/v1/applications", params={"limit": 2, "include_total": True}).json()
+    assert [item["jsonPayload"]["1"]["value"] for item in first["data"]] == ["0", "1"]
+    assert first["total"] == 5
+    assert first["next_cursor"]
+
+    rest = client.get("/api/v1/applications", params={"limit": 10, "cursor": first["next_cursor"]}).json()
+    assert [item["jsonPayload"]["1"]["value"] for item in rest["data"]] == ["2", "3", "4"]
+    assert rest["next_cursor"] is None
+    assert rest["total"] is None
+
+    assert client.get("/api/v1/applications", params={"cursor": "garbage"}).status_code == 400
+    assert len(client.get("/api/v1/applications").json()) == 5  # unpaginated listing is unchanged
+
+
+def test_revisions_are_paginated(client):
+    page = client.get("/api/v1/revisions/", params={"limit": 3, "include_total": True}).json()
+    assert len(page["data"]) == 3
+    assert page["total"] == 5
@@ -0,0 +1,50 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.core import db
+from backend.core.security import create_access_token
+from backend.crud import applicationCrud
+from backend.main import app
+from backend.models.domain.application import Application, ApplicationStatus
+
+
+@pytest.fixture
+def form_and_apps(static_engine, make_form):
+    """a form with four applications, the second one already approved"""
+    form = make_form("Dog")
+    with db.get_session() as session:
+        ids = [applicationCrud.insert_application(session, Application(
+            user_id=1, form_id=form.id, jsonPayload={"1": {"label": "name", "value": f"dog {i}"}})).id
+            for i in range(4)]
+        applicationCrud.updateApplicationStatus(session, form.id, ids[1], ApplicationStatus.APPROVED)
+    return form.id, ids
+
+
+def _client(userid, roles):
+    token = create_access_token({"sub": f"user{userid}", "userid": userid, "roles": roles})
+    return TestClient(app, headers={"Authorization": f"Bearer {token}"})
+
+
+def test_admins_claim_disjoint_work(form_and_apps):
+    form_id, ids = form_and_apps
+    alice, bob = _client(1, ["ADMIN"]), _client(2, ["ADMIN"])
+
+    first = alice.post("/api/v1/queue/claim", params={"n": 2})
+    assert first.status_code == 200
+    assert [item["id"] for item in first.json()["applications"]] == [ids[0], ids[2]]
+    assert first.json()["applications"][0]["jsonPayload"]["1"]["value"] == "dog 0"
+    assert first.json()["lease_expires_at"]
+
+    assert [item["id"] for item in bob.post("/api/v1/queue/claim").json()["applications"]] == [ids[3]]
+
+    released = alice.post("/api/v1/queue/release", json=[{"form_id": form_id, "application_id": ids[2]}])
+    assert released.json() == {"released": 1}
+    assert [item["id"] for item in bob.post("/api/v1/queue/claim").json()["applications"]] == [ids[2], ids[3]]
+    assert bob.post("/api/v1/queue/release").json() == {"released": 2}
+
+
+def test_queue_is_admin_only(form_and_apps):
+    applicant = _client(3, ["APPLICANT"])
+    assert applicant.post("/api/v1/queue/claim").status_code == 403
+    assert applicant.post("/api/v1/queue/release").status_code == 403
+    assert _client(1, ["ADMIN"]).post("/api/v1/queue/claim", params={"n": 0}).status_code == 422
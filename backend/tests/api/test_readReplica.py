@@ -0,0 +1,83 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.pool import StaticPool
+
+from backend.core import db
+from backend.core.security import create_access_token
+from backend.crud import applicationCrud, catalogCrud
+from backend.main import app
+from backend.models.domain.application import Application
+from backend.models.orm.catalogtable import OrmApplicationCatalog
+from backend.models.orm.formtable import OrmForm
+
+
+def _sqlite_file(path):
+    # one connection per database, so DDL during add_form doesn't wait for the session's lock
+    return create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+
+@pytest.fixture
+def primary_and_replica(tmp_path, monkeypatch, make_form):
+    primary, replica = _sqlite_file(tmp_path / "primary.db"), _sqlite_file(tmp_path / "replica.db")
+    monkeypatch.setattr(db, "engine", primary)
+    OrmForm.__table__.create(bind=primary)
+    catalogCrud.ensure_catalog_table()
+    # only the replica has a form, so responses show which database answered
+    monkeypatch.setattr(db, "engine", replica)
+    make_form("Dog licence")
+    monkeypatch.setattr(db, "engine", primary)
+    monkeypatch.setattr(db, "replica_engine", replica)
+    return primary, replica
+
+
+def test_reads_go_to_healthy_replica(primary_and_replica):
+    primary, replica = primary_and_replica
+    client = TestClient(app)
+    assert [form["form_name"] for form in client.get("/api/v1/forms").json()] == ["Dog licence"]
+    assert client.get("/api/v1/forms", headers={"X-Read-Your-Writes": "true"}).json() == []
+
+    assert db.get_read_engine() is replica
+    db.record_write(7)
+    assert db.get_read_engine(7) is primary  # the writer reads its own write from the primary
+    assert db.get_read_engine(8) is replica
+
+
+def test_unhealthy_replica_falls_back_to_primary(primary_and_replica, tmp_path, monkeypatch):
+    primary, _ = primary_and_replica
+    monkeypatch.setattr(db, "replica_engine", _sqlite_file(tmp_path / "missing" / "replica.db"))
+    assert db.get_read_engine() is primary
+    assert TestClient(app).get("/api/v1/forms").json() == []
+
+
+def test_listing_skips_forms_the_replica_has_not_replayed(primary_and_replica, make_form):
+    primary, replica = primary_and_replica
+    for name in ("Dog licence", "Parking permit"):  # form_1 exists on both, form_2 only on the primary so far
+        make_form(name)
+    token = create_access_token({"sub": "admin", "userid": 99, "roles": ["ADMIN"]})
+    client = TestClient(app, headers={"Authorization": f"Bearer {token}"})
+
+    assert client.get("/api/v1/applications").json() == []
+    page = client.get("/api/v1/applications", params={"limit": 10, "include_total": True}).json()
+    assert (page["data"], page["total"]) == ([], 0)
+    assert client.get("/api/v1/revisions/", params={"limit": 10}).json()["data"] == []
+
+
+def test_revisions_skip_forms_the_replica_has_not_replayed(primary_and_replica, make_form, monkeypatch):
+    primary, replica = primary_and_replica
+    for name in ("Dog licence", "Parking permit"):  # form_1 exists on both, form_2 only on the primary so far
+        make_form(name)
+    # the replica has replayed an application of form_1 and the catalog entry of one of form_2, not its table
+    monkeypatch.setattr(db, "engine", replica)
+    with db.get_session() as session:
+        dog = applicationCrud.insert_application(session, Application(
+            user_id=1, form_id=1, jsonPayload={"1": {"label": "name", "value": "Rex"}}))
+        session.execute(insert(OrmApplicationCatalog).values(
+            form_id=2, app_id=1, user_id=1, status="PENDING", is_public=False, is_current=True, created_at=dog.created_at))
+    monkeypatch.setattr(db, "engine", primary)
+    token = create_access_token({"sub": "admin", "userid": 99, "roles": ["ADMIN"]})
+    client = TestClient(app, headers={"Authorization": f"Bearer {token}"})
+
+    response = client.get("/api/v1/revisions/")
+    assert response.status_code == 200
+    assert [(item["form_id"], item["id"]) for item in response.json()] == [(1, dog.id)]
@@ -0,0 +1,32 @@
+import pytest
+from fastapi import HTTPException
+
+from backend.businesslogic.services.applicationService import app_list_to_appResp_list
+from backend.core import db
+from backend.models.domain.application import Application
+
+
+@pytest.fixture
+def forms(sqlite_engine, make_form):
+    return [make_form(name) for name in ("Dog licence", "Parking permit")]
+
+
+def test_titles_are_resolved_with_one_query(forms, statements):
+    dog, parking = forms
+    applications = [Application(id=i, user_id=1, form_id=(dog.id if i % 2 else parking.id)) for i in range(100)]
+
+    with statements.recording(), db.get_session() as session:
+        items = app_list_to_appResp_list(session, applications)
+
+    assert [item.title for item in items[:2]] == ["Parking permit", "Dog licence"]
+    form_queries = statements.mentioning("form_table")
+    assert len(form_queries) == 1
+    assert "xoev" not in form_queries[0]
+
+
+def test_unknown_form_is_not_found(forms):
+    with db.get_session() as session:
+        assert app_list_to_appResp_list(session, []) == []
+        with pytest.raises(HTTPException) as exc_info:
+            app_list_to_appResp_list(session, [Application(id=1, user_id=1, form_id=999)])
+    assert exc_info.value.status_code == 404
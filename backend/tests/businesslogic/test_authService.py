@@ -0,0 +1,38 @@
+import asyncio
+from datetime import date
+
+from argon2 import PasswordHasher
+
+from backend.businesslogic.services import authService
+from backend.core import asyncDb, db, security
+from backend.crud import userCrud
+from backend.models.domain.user import User
+from backend.models.orm.roletable import OrmRoleAssignment
+from backend.models.orm.usertable import OrmUser
+
+
+def test_login_rehashes_outdated_hash(static_engine):
+    OrmUser.__table__.create(bind=static_engine)
+    OrmRoleAssignment.__table__.create(bind=static_engine)
+    weak = PasswordHasher(time_cost=1, memory_cost=8, parallelism=1).hash("secret")
+    with db.get_session() as session:
+        userCrud.add_user(session, User(username="alice", email="alice@example.org", hashed_password=weak,
+                                        date_created=date.today()))
+
+    async def login(password):
+        session = asyncDb.make_async_session()
+        try:
+            user = await authService.authenticate_user(session, "alice", password)
+            await session.commit()
+            return user
+        finally:
+            await session.close()
+
+    assert asyncio.run(login("wrong")) is None
+    assert asyncio.run(login("secret")).username == "alice"
+
+    with db.get_session() as session:
+        stored = userCrud.get_user_by_name("alice", session).hashed_password
+    assert stored != weak
+    assert not security.password_needs_rehash(stored)
+    assert security.verify_password("secret", stored)
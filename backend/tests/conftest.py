@@ -0,0 +1,114 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import StaticPool
+
+from backend import db
+from backend.crud import catalogCrud, formCrud
+from backend.models.domain.buildingblock import BBType, BuildingBlock
+from backend.models.domain.form import Form
+from backend.models.orm.formtable import OrmForm
+
+
+@pytest.fixture
+def sqlite_engine(monkeypatch):
+    """
+    Replaces db.engine with a fresh in-memory SQLite engine for the duration of a test.
+    Registries and caches which are kept per engine start empty.
+    """
+    engine = create_engine(
+        "sqlite:///:memory:", connect_args={"check_same_thread": False}, future=True
+    )
+    monkeypatch.setattr(db, "engine", engine)
+    return engine
+
+
+@pytest.fixture
+def static_engine(monkeypatch):
+    """
+    Like sqlite_engine, but all threads share the one connection of the in-memory database, like in dev mode.
+    Needed as soon as sessions run in other threads: TestClient requests, async sessions.
+    """
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    monkeypatch.setattr(db, "engine", engine)
+    return engine
+
+
+@pytest.fixture
+def file_engine(tmp_path, monkeypatch):
+    """
+    Replaces db.engine with a SQLite file database, for tests running transactions in many threads at once.
+    SQLite has no row locks: every transaction begins with BEGIN IMMEDIATE and so waits for the previous writer,
+    instead of failing when it tries to upgrade its read lock.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"timeout": 30, "check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _no_implicit_begin(dbapi_connection, _):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin_immediate(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+    monkeypatch.setattr(db, "engine", engine)
+    yield engine
+    engine.dispose()
+
+
+class StatementLog(list):
+    """
+    The SQL statements executed on db.engine within `recording()` blocks, in order
+    """
+
+    @contextmanager
+    def recording(self):
+        engine = db.engine
+        listener = lambda conn, cursor, statement, *args: self.append(statement)
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            yield self
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+    def verbs(self) -> list[str]:
+        """
+        Returns the first keyword of every statement, e.g. ["SELECT", "INSERT"]
+        """
+        return [s.split()[0].upper() for s in self]
+
+    def starting_with(self, keyword: str) -> list[str]:
+        return [s for s in self if s.lstrip().upper().startswith(keyword)]
+
+    def mentioning(self, text: str) -> list[str]:
+        return [s for s in self if text in s]
+
+
+@pytest.fixture
+def statements():
+    """
+    Records the statements of a block:
+        with statements.recording():
+            ...
+        assert len(statements.starting_with("SELECT")) == 1
+    """
+    return StatementLog()
+
+
+@pytest.fixture
+def make_form():
+    """
+    Returns a function adding a form to db.engine, the form and catalog tables are created on first use:
+        dog = make_form("Dog licence")  # one required STRING block "name"
+        permit = make_form("Building permit", {1: BuildingBlock(...), ...})
+    """
+    def make(name: str, blocks: dict[int, BuildingBlock] | None = None) -> Form:
+        OrmForm.__table__.create(bind=db.engine, checkfirst=True)
+        catalogCrud.ensure_catalog_table()
+        if blocks is None:
+            blocks = {1: BuildingBlock(label="name", data_type=BBType.STRING, required=True)}
+        with db.get_session() as session:
+            return formCrud.add_form(session, Form(form_name=name, blocks=blocks))
+
+    return make
@@ -0,0 +1,32 @@
+from backend.core.cache import LRUCache
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+    cache.put("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert len(cache) == 2
+
+    cache.invalidate("a")
+    assert cache.get("a", "missing") == "missing"
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("backend.core.cache.time.time", lambda: now[0])
+    cache = LRUCache(maxsize=10)
+    cache.put("token", {"sub": "a"}, expires_at=1010.0)
+    cache.put("forever", 1)
+
+    assert cache.get("token") == {"sub": "a"}
+    now[0] = 1010.0
+    assert cache.get("token") is None
+    assert "token" not in cache
+    assert cache.get("forever") == 1
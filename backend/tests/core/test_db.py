@@ -1,5 +1,5 @@
 import pytest
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, exc, text
 
 from backend import db
 
@@ -70,3 +70,34 @@ def test_get_session_dep_generator_commits_and_closes(monkeypatch):
     with engine.connect() as conn:
         r = conn.execute(text("SELECT count(*) FROM t")).scalar()
     assert int(r) == 1
+
+
+def test_sessions_share_one_factory(monkeypatch, sqlite_engine):
+    monkeypatch.setattr(db, "make_session_factory", lambda engine: pytest.fail("factory built per session"))
+    with db.get_session() as s:
+        assert s.get_bind() is sqlite_engine
+    s = next(db.get_session_dep())
+    assert s.get_bind() is sqlite_engine
+
+
+def test_pool_settings_from_env(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "0")
+    settings = db.pool_settings()
+    assert settings["pool_size"] == 20
+    assert settings["max_overflow"] == 10
+    assert settings["pool_pre_ping"] is False
+
+
+def test_pool_stats_count_checkouts_and_timeouts(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=db.TimedQueuePool,
+                           pool_size=1, max_overflow=0, pool_timeout=0.05)
+    with engine.connect():
+        stats = db.pool_stats(engine)
+        assert (stats["size"], stats["checked_out"], stats["overflow"]) == (1, 1, 0)
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+    stats = db.pool_stats(engine)
+    assert stats["checked_out"] == 0
+    assert (stats["checkouts"], stats["timeouts"]) == (1, 1)
+    assert stats["max_wait_ms"] >= stats["avg_wait_ms"] > 0
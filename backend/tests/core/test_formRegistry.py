@@ -0,0 +1,83 @@
+import json
+
+import pytest
+from sqlalchemy import text
+
+from backend import dbActions
+from backend.core import formRegistry
+
+
+def _xoev(*labels):
+    blocks = {str(i): {"label": label, "data_type": "STRING"} for i, label in enumerate(labels, start=1)}
+    return json.dumps({"blocks": blocks})
+
+
+def test_lazy_load_reflects_only_requested_table(sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        conn.execute(text("CREATE TABLE form_7 (id INTEGER PRIMARY KEY, user_id INTEGER, form_id INTEGER, street TEXT)"))
+        conn.execute(text("CREATE TABLE unrelated (id INTEGER PRIMARY KEY, name TEXT)"))
+
+    registry = formRegistry.get_registry()
+    assert registry.known_form_ids() == []
+
+    entry = formRegistry.get_form_table(7)
+    assert entry.table_class.__table__.name == "form_7"
+    assert list(entry.table_class.metadata.tables) == ["form_7"]
+    assert entry.block_columns == ("street",)
+    assert registry.known_form_ids() == [7]
+
+    # second lookup is served from the registry
+    assert formRegistry.get_form_table(7) is entry
+
+
+def test_missing_table_raises_keyerror(sqlite_engine):
+    with pytest.raises(KeyError):
+        formRegistry.get_form_table(404)
+    with pytest.raises(KeyError):
+        dbActions.get_application_table_by_id(404)
+
+
+def test_createFormTable_registers_entry(sqlite_engine):
+    registry = formRegistry.get_registry()
+    version_before = registry.version
+
+    tableclass = dbActions.createFormTable(3, _xoev("first_name", "last_name"))
+
+    entry = formRegistry.get_form_table(3)
+    assert entry.table_class is tableclass
+    assert list(tableclass.metadata.tables) == ["form_3"]
+    assert entry.block_columns == ("first_name", "last_name")
+    assert registry.version > version_before
+    assert dbActions.get_application_table_by_id(3) is tableclass
+
+
+def test_invalidate_reloads_on_next_access(sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        conn.execute(text("CREATE TABLE form_1 (id INTEGER PRIMARY KEY, a TEXT)"))
+    first = formRegistry.get_form_table(1)
+
+    with sqlite_engine.begin() as conn:
+        conn.execute(text("ALTER TABLE form_1 ADD COLUMN b TEXT"))
+    formRegistry.get_registry().invalidate(1)
+
+    second = formRegistry.get_form_table(1)
+    assert second is not first
+    assert second.block_columns == ("a", "b")
+    assert second.version > first.version
+
+
+def test_createFormTable_emits_ddl_for_new_table_only(sqlite_engine, statements):
+    with sqlite_engine.begin() as conn:
+        for i in range(1, 30):
+            conn.execute(text(f"CREATE TABLE form_{i} (id INTEGER PRIMARY KEY, a TEXT)"))
+
+    formRegistry.schemaVersion.get_watcher(sqlite_engine).ensure_table()
+    with statements.recording():
+        dbActions.createFormTable(30, _xoev("a"))
+
+    assert any("CREATE TABLE form_30" in s for s in statements)
+    for statement in statements:
+        for i in range(1, 30):
+            assert f"form_{i} " not in statement and f'"form_{i}"' not in statement
+    assert sum("CREATE INDEX" in s for s in statements) == 3  # snapshot id columns
+    assert len(statements) <= 4 + 3  # existence check, CREATE TABLE, schema_change insert (+ commit)
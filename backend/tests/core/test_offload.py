@@ -0,0 +1,59 @@
+import asyncio
+import json
+import threading
+import time
+
+from sqlalchemy.util.concurrency import greenlet_spawn
+
+from backend.core import formRegistry, offload, schemaVersion
+from backend.crud import dbActions
+
+
+def test_run_blocking_outside_run_sync_calls_directly():
+    assert offload.run_blocking(threading.get_ident) == threading.get_ident()
+
+
+def test_run_blocking_keeps_the_event_loop_free():
+    async def main():
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        await asyncio.sleep(0)
+        # greenlet_spawn is what AsyncSession.run_sync runs the sync code in
+        worker = await greenlet_spawn(lambda: offload.run_blocking(lambda: (time.sleep(0.2), threading.get_ident())[1]))
+        task.cancel()
+        return worker, ticks
+
+    worker, ticks = asyncio.run(main())
+    assert worker != threading.get_ident()
+    assert len(ticks) >= 5  # the loop kept running while the sync code waited
+
+
+def test_registry_reflects_off_the_event_loop(static_engine, monkeypatch):
+    dbActions.createFormTable(1, json.dumps({"blocks": {"1": {"label": "name", "data_type": "STRING"}}}))
+    formRegistry.get_registry().invalidate(1)
+    reflected_in, polled_in, created_in = [], [], []
+    reflect, poll = formRegistry.FormTableRegistry._reflect, schemaVersion.SchemaWatcher._poll
+    monkeypatch.setattr(formRegistry.FormTableRegistry, "_reflect",
+                        lambda self, form_id: (reflected_in.append(threading.get_ident()), reflect(self, form_id))[1])
+    monkeypatch.setattr(schemaVersion.SchemaWatcher, "_poll",
+                        lambda self: (polled_in.append(threading.get_ident()), poll(self))[1])
+    create = dbActions.createTableClass
+    monkeypatch.setattr(dbActions, "createTableClass",
+                        lambda **kwargs: (created_in.append(threading.get_ident()), create(**kwargs))[1])
+    monkeypatch.setenv("SCHEMA_POLL_INTERVAL", "0")
+
+    async def main():
+        await greenlet_spawn(dbActions.createFormTable, 2, json.dumps({"blocks": {"1": {"label": "age", "data_type": "INTEGER"}}}))
+        return await greenlet_spawn(formRegistry.get_form_table, 1), threading.get_ident()
+
+    entry, loop_thread = asyncio.run(main())
+    assert entry.block_columns == ("name",)
+    assert reflected_in and loop_thread not in reflected_in
+    assert polled_in and loop_thread not in polled_in
+    assert created_in and loop_thread not in created_in
@@ -0,0 +1,43 @@
+from datetime import date
+
+import pytest
+
+from backend.core import db, roleAuth
+from backend.crud import roleCrud, userCrud
+from backend.models.domain.user import RoleAssignment, User, UserType
+from backend.models.orm.roletable import OrmRoleAssignment
+from backend.models.orm.usertable import OrmUser
+
+
+@pytest.fixture
+def applicant(sqlite_engine):
+    OrmUser.__table__.create(bind=sqlite_engine)
+    OrmRoleAssignment.__table__.create(bind=sqlite_engine)
+    with db.get_session() as session:
+        user = userCrud.add_user(session, User(
+            username="alice", email="alice@example.org", hashed_password="x", date_created=date.today(),
+            user_roles=[RoleAssignment(role=UserType.APPLICANT, assignment_date=date.today())]))
+    return user.id
+
+
+def test_token_claims_need_no_query(applicant, statements):
+    claims = {"sub": "alice", "userid": applicant, "roles": ["APPLICANT"]}
+    with db.get_session() as session, statements.recording():
+        assert roleAuth.check_role(session, applicant, "APPLICANT", claims=claims) is True
+        assert statements.mentioning("role_assignment") == []
+        # claims of another user are not trusted
+        assert roleAuth.check_role(session, applicant + 1, "APPLICANT", claims=claims) is False
+        assert len(statements.mentioning("role_assignment")) == 1
+
+
+def test_db_roles_are_cached_until_assignment_changes(applicant, statements):
+    with db.get_session() as session:
+        with statements.recording():
+            assert roleAuth.check_role(session, applicant, "APPLICANT") is True
+            assert len(statements.mentioning("role_assignment")) == 1
+            # only the role asked for counts, and it came from the cache
+            assert roleAuth.check_role(session, applicant, "ADMIN") is False
+            assert len(statements.mentioning("role_assignment")) == 1
+
+        roleCrud.add_role_assignment(session, RoleAssignment(user_id=applicant, role=UserType.ADMIN, assignment_date=date.today()))
+        assert roleAuth.check_role(session, applicant, "ADMIN")
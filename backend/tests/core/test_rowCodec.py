@@ -0,0 +1,42 @@
+import json
+from datetime import datetime
+from types import SimpleNamespace
+
+from backend.core import db, formRegistry
+from backend.crud import catalogCrud, dbActions
+from backend.models.domain.application import Application, ApplicationStatus, Snapshots
+
+
+def _row(form_id):
+    table_class = formRegistry.get_form_table(form_id).table_class
+    return table_class(
+        id=5, user_id=2, form_id=form_id, admin_id=None, status="APPROVED", created_at=datetime(2024, 5, 1),
+        previous_snapshot_id=3, current_snapshot_id=-1, next_snapshot_id=None, is_public=True,
+        version=0, name="Rex", age=4,
+    )
+
+
+def test_codec_matches_validated_models(sqlite_engine):
+    catalogCrud.ensure_catalog_table()
+    dbActions.createFormTable(1, json.dumps({"blocks": {
+        "1": {"label": "name", "data_type": "STRING"},
+        "2": {"label": "age", "data_type": "INTEGER"},
+    }}))
+    codec = formRegistry.get_form_table(1).codec
+    assert formRegistry.get_form_table(1).codec is codec  # compiled once per table
+
+    expected = Application(
+        id=5, user_id=2, form_id=1, status=ApplicationStatus.APPROVED, created_at=datetime(2024, 5, 1),
+        snapshots=Snapshots(previousSnapshotID=3), is_public=True,
+        jsonPayload={"1": {"label": "name", "value": "Rex"}, "2": {"label": "age", "value": 4}},
+    )
+    application = codec.decode(_row(1))
+    assert application == expected
+    assert application.model_dump_json() == expected.model_dump_json()
+
+    # a row of the listing query carries the block values in one payload dict
+    listing_row = SimpleNamespace(**{name: getattr(_row(1), name) for name in formRegistry.STANDARD_COLUMNS},
+                                  payload={"name": "Rex", "age": 4})
+    assert codec.decode_listing(listing_row) == expected
+    assert codec.decode_listing(SimpleNamespace(**vars(listing_row) | {"payload": None})).jsonPayload["2"] == {
+        "label": "age", "value": None}
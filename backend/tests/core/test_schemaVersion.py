@@ -0,0 +1,113 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+from sqlalchemy import create_engine, insert, text
+
+from backend.core import formRegistry, schemaVersion
+
+SRC = os.path.join(os.path.dirname(__file__), "..", "..", "src")
+
+READER = textwrap.dedent("""
+    import sys
+    from backend.core import db, formRegistry
+
+    base = db.get_base()
+    first = formRegistry.get_form_table(1)
+    untouched = formRegistry.get_form_table(2)
+    print(",".join(first.block_columns), flush=True)
+
+    sys.stdin.readline()  # wait until the writer is done
+
+    after = formRegistry.get_form_table(1)
+    print(",".join(after.block_columns), flush=True)
+    print(formRegistry.get_form_table(2) is untouched, flush=True)
+    print(formRegistry.get_form_table(3).block_columns, flush=True)
+    print("form_3" in db.get_base().classes.keys(), flush=True)
+""")
+
+WRITER = textwrap.dedent("""
+    import json
+    from sqlalchemy import text
+    from backend.core import db, schemaVersion
+    from backend.crud import dbActions
+
+    with db.engine.begin() as conn:
+        conn.execute(text("ALTER TABLE form_1 ADD COLUMN extra VARCHAR"))
+    schemaVersion.record_schema_change(db.engine, "form_1")
+
+    dbActions.createFormTable(3, json.dumps({"blocks": {"1": {"label": "city", "data_type": "STRING"}}}))
+""")
+
+
+def _env(db_path):
+    env = dict(os.environ)
+    env.update({
+        "PYTHONPATH": os.path.abspath(SRC),
+        "DEV_SQLITE": "0",
+        "DATABASE_URL": f"sqlite:///{db_path}",
+        "SCHEMA_POLL_INTERVAL": "0",
+        "SECRET_KEY": env.get("SECRET_KEY", "test-secret"),
+    })
+    return env
+
+
+def test_schema_change_is_seen_by_other_process(tmp_path):
+    db_path = tmp_path / "shared.db"
+    setup_engine = create_engine(f"sqlite:///{db_path}")
+    with setup_engine.begin() as conn:
+        conn.execute(text("CREATE TABLE form_1 (id INTEGER PRIMARY KEY, user_id INTEGER, name VARCHAR)"))
+        conn.execute(text("CREATE TABLE form_2 (id INTEGER PRIMARY KEY, user_id INTEGER, street VARCHAR)"))
+    setup_engine.dispose()
+
+    env = _env(db_path)
+    reader = subprocess.Popen(
+        [sys.executable, "-c", READER],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, env=env,
+    )
+    try:
+        assert reader.stdout.readline().strip() == "name"
+
+        writer = subprocess.run([sys.executable, "-c", WRITER], capture_output=True, text=True, env=env, timeout=60)
+        assert writer.returncode == 0, writer.stderr
+
+        out, err = reader.communicate("go\n", timeout=60)
+    finally:
+        if reader.poll() is None:
+            reader.kill()
+    assert reader.returncode == 0, err
+
+    lines = out.strip().splitlines()
+    assert lines[0] == "name,extra"  # changed table was refreshed
+    assert lines[1] == "True"  # unchanged table kept its entry
+    assert lines[2] == "('city',)"  # table created by the other process
+    assert lines[3] == "True"  # cached automap base was rebuilt
+
+
+def _commit_change(engine, change_id, form_id):
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE TABLE form_{form_id} (id INTEGER PRIMARY KEY, user_id INTEGER)"))
+        conn.execute(insert(schemaVersion.schema_change_table).values(id=change_id, table_name=f"form_{form_id}"))
+
+
+def test_changes_committed_out_of_order_are_seen(sqlite_engine, monkeypatch):
+    monkeypatch.setenv("SCHEMA_POLL_INTERVAL", "0")
+    watcher = schemaVersion.get_watcher(sqlite_engine)
+    registry = formRegistry.get_registry()
+    assert registry.all_form_ids() == []
+
+    # two workers took the ids 1 and 2, the one with id 2 commits first
+    _commit_change(sqlite_engine, 2, 20)
+    assert registry.all_form_ids() == [20]
+    seen = watcher.version
+    _commit_change(sqlite_engine, 1, 10)
+    assert registry.all_form_ids() == [10, 20]
+    assert watcher.changes_since(seen) == [(seen + 1, "form_10")]
+
+    assert watcher.poll() == seen + 1  # nothing is seen twice
+    monkeypatch.setattr(schemaVersion, "_GAP_TIMEOUT", -1)
+    _commit_change(sqlite_engine, 5, 50)  # 3 and 4 were rolled back
+    watcher.poll()
+    assert watcher._gaps == {}
+    assert registry.all_form_ids() == [10, 20, 50]
@@ -0,0 +1,78 @@
+import time
+
+import pytest
+from jose import JWTError, jwt
+
+from backend.core import security
+
+
+@pytest.fixture(autouse=True)
+def empty_token_cache():
+    security.clear_token_cache()
+    yield
+    security.clear_token_cache()
+
+
+def test_token_is_verified_once(monkeypatch):
+    token = security.create_access_token({"sub": "alice", "roles": ["APPLICANT"]})
+    calls = []
+    decode = jwt.decode
+    monkeypatch.setattr(security.jwt, "decode", lambda *args, **kwargs: calls.append(1) or decode(*args, **kwargs))
+
+    first = security.decode_access_token(token)
+    first["sub"] = "mallory"  # callers get their own copy
+    second = security.decode_access_token(token)
+    assert second["sub"] == "alice"
+    assert len(calls) == 1
+
+    with pytest.raises(JWTError):
+        security.decode_access_token(token + "x")
+
+
+def test_cached_token_expires_with_token(monkeypatch):
+    now = time.time()
+    token = jwt.encode({"sub": "alice", "exp": int(now) + 60}, security.SECRET_KEY, algorithm=security.ALGORITHM)
+    calls = []
+    decode = jwt.decode
+    monkeypatch.setattr(security.jwt, "decode", lambda *args, **kwargs: calls.append(1) or decode(*args, **kwargs))
+
+    security.decode_access_token(token)
+    security.decode_access_token(token)
+    assert len(calls) == 1
+
+    monkeypatch.setattr("backend.core.cache.time.time", lambda: now + 120)
+    security.decode_access_token(token)  # past exp the cached payload is gone, the token is verified again
+    assert len(calls) == 2
+
+
+def test_hashing_runs_in_bounded_pool(monkeypatch):
+    import asyncio
+    import threading
+
+    release = threading.Event()
+    threads = []
+
+    def slow_hash(password):
+        threads.append(threading.current_thread().name)
+        release.wait(5)
+        return "hash:" + password
+
+    monkeypatch.setattr(security, "hash_password", slow_hash)
+    monkeypatch.setattr(security, "HASH_WORKERS", 1)
+    monkeypatch.setattr(security, "HASH_MAX_QUEUE", 1)
+
+    async def storm():
+        first = asyncio.create_task(security.hash_password_async("a"))
+        second = asyncio.create_task(security.hash_password_async("b"))
+        await asyncio.sleep(0.05)  # the event loop keeps running while both wait for the pool
+        assert security.hashing_stats()["running"] + security.hashing_stats()["queued"] == 2
+        with pytest.raises(security.HashingOverloaded):
+            await security.hash_password_async("c")
+        release.set()
+        return await first, await second
+
+    assert asyncio.run(storm()) == ("hash:a", "hash:b")
+    assert all(name.startswith("password-hash") for name in threads)
+    stats = security.hashing_stats()
+    assert (stats["running"], stats["queued"]) == (0, 0)
+    assert stats["rejected"] >= 1
@@ -0,0 +1,49 @@
+import pytest
+
+from backend.core import db
+from backend.crud import applicationCrud
+from backend.models.domain.application import Application, ApplicationStatus
+
+
+@pytest.fixture
+def form(sqlite_engine, make_form):
+    return make_form("Dog licence")
+
+
+def _insert(form_id):
+    with db.get_session() as session:
+        return applicationCrud.insert_application(session, Application(
+            user_id=1, form_id=form_id, jsonPayload={"1": {"label": "name", "value": "Rex"}})).id
+
+
+def test_insert_application_is_one_statement_per_table(form, statements):
+    with statements.recording(), db.get_session() as session:
+        created = applicationCrud.insert_application(session, Application(
+            user_id=1, form_id=form.id, jsonPayload={"1": {"label": "name", "value": "Rex"}}))
+        assert (created.id, created.status, created.current_snapshot_id) == (1, "PENDING", -1)
+    # the application row with RETURNING, its catalog entry; no refresh
+    verbs = statements.verbs()
+    assert [verb for verb in verbs if verb != "SELECT"] == ["INSERT", "INSERT"]
+    assert "SELECT" not in verbs[verbs.index("INSERT"):]
+
+
+def test_update_status_is_one_update_per_table(form, statements):
+    app_id = _insert(form.id)
+    with statements.recording(), db.get_session() as session:
+        updated = applicationCrud.updateApplicationStatus(session, form.id, app_id, ApplicationStatus.APPROVED)
+        assert updated.status == "APPROVED"
+    assert statements.verbs() == ["UPDATE", "UPDATE"]  # the application row with RETURNING, its catalog entry
+
+
+def test_publish_is_one_update_per_table(form, statements):
+    app_id = _insert(form.id)
+    with statements.recording(), db.get_session() as session:
+        applicationCrud.publish_application(session, form.id, app_id)
+    assert statements.verbs() == ["UPDATE", "UPDATE"]
+    with db.get_session() as session:
+        assert applicationCrud.get_application_by_id(session, form.id, app_id).is_public
+
+    statements.clear()
+    with statements.recording(), db.get_session() as session, pytest.raises(ValueError, match="Application not found"):
+        applicationCrud.publish_application(session, form.id, app_id + 1)
+    assert statements.verbs() == ["UPDATE", "SELECT"]  # no catalog update for a missing application
@@ -0,0 +1,89 @@
+import asyncio
+import time
+from datetime import date
+
+from backend.core import asyncDb, db
+from backend.crud import asyncDbActions
+from backend.models.orm.roletable import OrmRoleAssignment
+from backend.models.orm.usertable import OrmUser
+
+
+def _row(name: str) -> dict:
+    return {"user_name": name, "email": f"{name}@example.org", "password": "x", "creation_date": date.today()}
+
+
+def test_async_primitives_round_trip(static_engine):
+    OrmUser.__table__.create(bind=static_engine)
+    OrmRoleAssignment.__table__.create(bind=static_engine)
+
+    async def scenario():
+        session = asyncDb.make_async_session()
+        assert isinstance(session, asyncDb.ThreadedAsyncSession)  # SQLite has no async driver here
+        try:
+            alice = await asyncDbActions.insertRow(session, OrmUser, _row("alice"))
+            await asyncDbActions.insertRow(session, OrmUser, _row("bob"))
+            await asyncDbActions.updateRow(session, OrmUser, {"id": alice.id, "email": "alice@example.com"})
+            await session.commit()
+            assert (await asyncDbActions.getRowById(session, OrmUser, alice.id)).email == "alice@example.com"
+            assert await asyncDbActions.getRowById(session, OrmUser, 999) is None
+            assert len(await asyncDbActions.getRows(session, OrmUser)) == 2
+            bobs = await asyncDbActions.getRowsByFilter(session, OrmUser, {"user_name": "bob"})
+            assert [row.user_name for row in bobs] == ["bob"]
+        finally:
+            await session.close()
+
+    asyncio.run(scenario())
+
+
+def test_session_work_does_not_block_event_loop(static_engine):
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        session = asyncDb.make_async_session()
+        await session.run_sync(lambda s: time.sleep(0.2))  # stands in for a slow query
+        await session.close()
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(scenario()) >= 5
+
+
+def test_sessions_take_turns_on_a_shared_connection(static_engine):
+    OrmUser.__table__.create(bind=static_engine)
+    OrmRoleAssignment.__table__.create(bind=static_engine)
+
+    async def request(name, fail, started, events):
+        session = asyncDb.make_async_session()
+        try:
+            await asyncDbActions.insertRow(session, OrmUser, _row(name))
+            started.set()
+            events.append(f"{name} wrote")
+            await asyncio.sleep(0.05)  # the other request runs meanwhile
+            if fail:
+                raise RuntimeError
+            await session.commit()
+        except RuntimeError:
+            await session.rollback()
+        finally:
+            events.append(f"{name} done")
+            await session.close()
+
+    async def scenario():
+        events, started = [], asyncio.Event()
+        failing = asyncio.create_task(request("alice", True, started, events))
+        await started.wait()
+        await request("bob", False, asyncio.Event(), events)
+        await failing
+        return events
+
+    # bob waits for alice's session, alice's rollback doesn't take bob's write with it
+    assert asyncio.run(scenario()) == ["alice wrote", "alice done", "bob wrote", "bob done"]
+    with db.get_session() as session:
+        assert [user.user_name for user in session.query(OrmUser)] == ["bob"]
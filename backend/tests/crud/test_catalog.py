@@ -0,0 +1,83 @@
+import pytest
+from sqlalchemy import select
+
+from backend.crud import applicationCrud, catalogCrud
+from backend.models.domain.application import Application, ApplicationStatus
+from backend.models.domain.buildingblock import BBType, BuildingBlock
+from backend.models.orm.catalogtable import OrmApplicationCatalog
+from backend.core import db
+
+
+@pytest.fixture
+def forms(sqlite_engine, make_form):
+    return [
+        make_form(name, {1: BuildingBlock(label="label", data_type=BBType.STRING, required=True)})
+        for name in ("Dog licence", "Parking permit")
+    ]
+
+
+def _application(form_id, user_id, value):
+    return Application(user_id=user_id, form_id=form_id, jsonPayload={"1": {"label": "label", "value": value}})
+
+
+def test_listings_follow_status_publication_and_revisions(forms):
+    dog, parking = forms
+    with db.get_session() as session:
+        a = applicationCrud.insert_application(session, _application(dog.id, 1, "a"))
+        b = applicationCrud.insert_application(session, _application(parking.id, 2, "b"))
+        c = applicationCrud.insert_application(session, _application(parking.id, 1, "c"))
+
+        applicationCrud.updateApplicationStatus(session, parking.id, b.id, ApplicationStatus.APPROVED)
+        applicationCrud.publish_application(session, parking.id, b.id)
+        new_c_id = applicationCrud.update_application(parking.id, c.id, {"1": {"label": "label", "value": "c2"}}, session)
+
+    with db.get_session() as session:
+        all_apps = applicationCrud.get_all_applications(session)
+        assert [(app.form_id, app.id) for app in all_apps] == [(dog.id, a.id), (parking.id, b.id), (parking.id, new_c_id)]
+
+        approved = applicationCrud.get_applications_all_by_status(session, "APPROVED")
+        assert [app.id for app in approved] == [b.id]
+        assert [app.id for app in applicationCrud.get_applications_public_by_status(session, "APPROVED")] == [b.id]
+        assert applicationCrud.get_applications_private_by_status(session, "APPROVED") == []
+        assert [app.id for app in applicationCrud.get_all_public_applications(session)] == [b.id]
+
+        mine = applicationCrud.get_applications_by_user_id(session, 1)
+        assert [(app.form_id, app.id) for app in mine] == [(dog.id, a.id), (parking.id, new_c_id)]
+        assert mine[1].jsonPayload["1"]["value"] == "c2"
+
+        with_revisions = applicationCrud.get_applications_by_user_id_with_revisions(session, 1)
+        assert len(with_revisions) == 3
+        assert len(applicationCrud.get_global_revisions(session)) == 4
+
+
+def test_cross_form_listing_is_one_query_per_form_with_hits(forms, statements):
+    dog, parking = forms
+    with db.get_session() as session:
+        for i in range(5):
+            applicationCrud.insert_application(session, _application(dog.id, 1, str(i)))
+            applicationCrud.insert_application(session, _application(parking.id, 1, str(i)))
+
+    with statements.recording(), db.get_session() as session:
+        assert len(applicationCrud.get_applications_all_by_status(session, "PENDING")) == 10
+
+    assert len(statements.starting_with("SELECT")) <= 1 + len(forms) + 1  # catalog, one per form, schema version poll
+
+
+def test_rebuild_catalog(forms):
+    dog, parking = forms
+    with db.get_session() as session:
+        applicationCrud.insert_application(session, _application(dog.id, 1, "a"))
+        b = applicationCrud.insert_application(session, _application(parking.id, 2, "b"))
+        applicationCrud.update_application(parking.id, b.id, {"1": {"label": "label", "value": "b2"}}, session)
+
+    with db.get_session() as session:
+        expected = session.execute(select(OrmApplicationCatalog.__table__).order_by("form_id", "app_id")).all()
+
+        session.execute(OrmApplicationCatalog.__table__.delete())
+        assert applicationCrud.get_all_applications(session) == []
+
+        assert catalogCrud.rebuild_catalog(session) == 3
+        rebuilt = session.execute(select(OrmApplicationCatalog.__table__).order_by("form_id", "app_id")).all()
+
+    assert [row[:6] for row in rebuilt] == [row[:6] for row in expected]
+    assert [row.is_current for row in rebuilt] == [True, False, True]
@@ -0,0 +1,167 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, update
+from testcontainers.postgres import PostgresContainer
+
+from backend.core import db
+from backend.crud import applicationCrud, catalogCrud, dbActions
+from backend.models.domain.application import Application, ApplicationStatus
+
+
+def _setup_form():
+    catalogCrud.ensure_catalog_table()
+    dbActions.createFormTable(1, json.dumps({"blocks": {"1": {"label": "name", "data_type": "STRING"}}}))
+    with db.get_session() as session:
+        return applicationCrud.insert_application(session, Application(
+            user_id=1, form_id=1, jsonPayload={"1": {"label": "name", "value": "v0"}})).id
+
+
+def _edit(app_id, value, version=None):
+    with db.get_session() as session:
+        return applicationCrud.update_application(1, app_id, {"1": {"label": "name", "value": value}}, session, version)
+
+
+def _approve(app_id, version=None):
+    with db.get_session() as session:
+        applicationCrud.updateApplicationStatus(session, 1, app_id, ApplicationStatus.APPROVED, version)
+
+
+def test_stale_versions_are_rejected(sqlite_engine):
+    app_id = _setup_form()
+    _approve(app_id, version=0)  # version 0 -> 1
+    with pytest.raises(HTTPException) as error:
+        _approve(app_id, version=0)
+    assert error.value.status_code == 409
+    with pytest.raises(HTTPException):
+        _edit(app_id, "v1", version=0)
+
+    new_id = _edit(app_id, "v1", version=1)
+    with pytest.raises(HTTPException):  # the old revision can't be decided anymore
+        _approve(app_id)
+    with pytest.raises(ValueError):
+        _approve(12345)
+    with pytest.raises(HTTPException) as error, db.get_session() as session:  # nor published
+        applicationCrud.publish_application(session, 1, app_id)
+    assert error.value.status_code == 409
+    with db.get_session() as session:
+        head = applicationCrud.get_application_by_id(session, 1, new_id)
+    assert (head.status, head.version, head.snapshots.previousSnapshotID) == (ApplicationStatus.APPROVED, 0, app_id)
+    with pytest.raises(HTTPException), db.get_session() as session:
+        applicationCrud.publish_application(session, 1, new_id, expected_version=1)
+
+
+def test_edit_is_retried_after_a_concurrent_status_change(sqlite_engine, monkeypatch):
+    app_id = _setup_form()
+    insert = applicationCrud.insert_application
+    attempts = []
+
+    def insert_racing_a_status_change(session, application):
+        attempts.append(application)
+        if len(attempts) == 1:
+            table = applicationCrud.get_application_table_by_id(1)
+            session.execute(update(table).where(table.id == app_id).values(version=table.version + 1))
+        return insert(session, application)
+
+    monkeypatch.setattr(applicationCrud, "insert_application", insert_racing_a_status_change)
+    new_id = _edit(app_id, "v1")
+
+    assert len(attempts) == 2
+    with db.get_session() as session:
+        revisions = applicationCrud.get_all_revisions_of_application(session, 1, new_id)
+    assert [app.id for app in revisions] == [app_id, new_id]  # the first attempt's revision was rolled back
+
+
+def test_edit_leaves_the_commit_to_the_caller(file_engine):  # pysqlite's own transactions would end at the savepoint
+    app_id = _setup_form()
+    with db.get_session() as session:
+        new_id = applicationCrud.update_application(1, app_id, {"1": {"label": "name", "value": "v1"}}, session)
+        session.rollback()
+    with db.get_session() as session:
+        assert applicationCrud.get_application_by_id(session, 1, app_id).snapshots.currentSnapshotID == -1
+        with pytest.raises(Exception):
+            applicationCrud.get_application_by_id(session, 1, new_id)
+
+
+@pytest.fixture(scope="module")
+def postgres_url():
+    with PostgresContainer("postgres:15-alpine", driver="psycopg") as postgres:
+        yield postgres.get_connection_url()
+
+
+@pytest.fixture
+def postgres_engine(postgres_url, monkeypatch):
+    # one connection per worker, the edits keep theirs while they wait for the approvals
+    engine = create_engine(postgres_url, pool_size=WORKERS)
+    monkeypatch.setattr(db, "engine", engine)
+    yield engine
+    engine.dispose()
+
+
+WORKERS = 16
+
+
+def test_hammering_one_application_keeps_one_chain(postgres_engine, monkeypatch):
+    app_id = _setup_form()
+    # every edit reads the application, then waits until all approvals are committed before it writes,
+    # so the first compare-and-swap of every edit is guaranteed to find a newer version
+    everyone_started = threading.Barrier(WORKERS, timeout=60)
+    approvals_committed = threading.Barrier(WORKERS // 2, timeout=60)
+    approvals_done = threading.Event()
+    waited = threading.local()
+    stale, lock = [], threading.Lock()
+
+    insert, write_revision = applicationCrud.insert_application, applicationCrud._write_revision
+
+    def insert_after_the_approvals(session, application):
+        if not getattr(waited, "done", False):
+            waited.done = True
+            everyone_started.wait()
+            assert approvals_done.wait(60)
+        return insert(session, application)
+
+    def counting_write_revision(*args):
+        try:
+            return write_revision(*args)
+        except applicationCrud._StaleRevision:
+            with lock:
+                stale.append(threading.get_ident())
+            raise
+
+    monkeypatch.setattr(applicationCrud, "insert_application", insert_after_the_approvals)
+    monkeypatch.setattr(applicationCrud, "_write_revision", counting_write_revision)
+
+    def work(number):
+        try:
+            if number % 2:
+                return "edit", _edit(app_id, f"edit {number}")
+            everyone_started.wait()
+            _approve(app_id)
+            if approvals_committed.wait() == 0:
+                approvals_done.set()
+            return "approve", None
+        except HTTPException as e:
+            assert e.status_code == 409
+            return "conflict", None
+
+    with ThreadPoolExecutor(WORKERS) as pool:
+        outcomes = list(pool.map(work, range(WORKERS)))
+
+    edits = [new_id for kind, new_id in outcomes if kind == "edit"]
+    approvals = [kind for kind, _ in outcomes if kind == "approve"]
+    assert len(approvals) == WORKERS // 2
+    assert len(edits) == 1  # every other edit was based on a revision which was replaced
+    assert outcomes.count(("conflict", None)) == WORKERS // 2 - 1
+    assert len(stale) >= WORKERS // 2  # the first write of every edit lost its compare-and-swap and was retried
+
+    with db.get_session() as session:
+        original = applicationCrud.get_application_by_id(session, 1, app_id)
+        head = applicationCrud.get_application_by_id(session, 1, edits[0])
+        current = applicationCrud.get_all_applications(session)
+    assert [app.id for app in current] == [head.id]
+    assert original.snapshots.currentSnapshotID == original.snapshots.nextSnapshotID == head.id
+    assert original.version == len(approvals) + 1  # one bump per approval and one for the edit
+    assert head.status == ApplicationStatus.APPROVED  # the retried edit kept the approvals
@@ -0,0 +1,65 @@
+import pytest
+
+from backend.core import db
+from backend.crud import formCrud
+from backend.models.domain.buildingblock import BBType, BuildingBlock
+from backend.models.domain.form import Form
+
+
+@pytest.fixture
+def forms(sqlite_engine, make_form):
+    return [make_form(name) for name in ("Dog licence", "Parking permit")]
+
+
+@pytest.fixture
+def parse_count(monkeypatch):
+    calls = []
+    original = Form.from_json.__func__
+
+    def counting_from_json(cls, json_str):
+        calls.append(json_str)
+        return original(cls, json_str)
+
+    monkeypatch.setattr(Form, "from_json", classmethod(counting_from_json))
+    return calls
+
+
+def test_forms_are_parsed_once(forms, parse_count):
+    with db.get_session() as session:
+        first = formCrud.get_all_parsed_forms(session)
+        assert [form.form_name for form in first] == ["Dog licence", "Parking permit"]
+        assert len(parse_count) == 2
+
+        assert formCrud.get_all_parsed_forms(session) == first
+        assert formCrud.get_form(session, forms[0].id) == first[0]
+        assert len(parse_count) == 2  # served from memory
+
+
+def test_delete_and_add_invalidate(forms, parse_count):
+    dog, parking = forms
+    with db.get_session() as session:
+        formCrud.get_all_parsed_forms(session)
+        assert formCrud.delete_form(session, dog.id)
+        assert formCrud.get_form(session, dog.id).is_active is False
+        assert formCrud.get_form(session, parking.id).is_active is True
+
+        formCrud.add_form(session, Form(form_name="Fishing licence", blocks={
+            1: BuildingBlock(label="name", data_type=BBType.STRING, required=True)}))
+        parse_count.clear()
+        names = [form.form_name for form in formCrud.get_all_parsed_forms(session)]
+        assert names == ["Dog licence", "Parking permit", "Fishing licence"]
+        assert len(parse_count) == 1  # only the new form, the deleted one was re-read above
+
+    with pytest.raises(Exception):
+        with db.get_session() as session:
+            formCrud.get_form(session, 999)
+
+
+def test_more_forms_than_fit_into_the_cache(sqlite_engine, make_form, monkeypatch):
+    monkeypatch.setenv("FORM_CACHE_SIZE", "2")
+    created = [make_form(name) for name in ("Dog licence", "Parking permit", "Fishing licence")]
+    for _ in range(3):  # every call evicts forms it looked up as cached
+        with db.get_session() as session:
+            assert [form.id for form in formCrud.get_all_parsed_forms(session)] == [form.id for form in created]
+            assert [formCrud.get_form(session, form.id).form_name for form in created] == [
+                "Dog licence", "Parking permit", "Fishing licence"]
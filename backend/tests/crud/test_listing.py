@@ -0,0 +1,118 @@
+import json
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from backend.crud import applicationCrud, catalogCrud, dbActions, listingCrud
+from backend.models.domain.application import Application, ApplicationStatus
+from backend.models.domain.buildingblock import BBType, BuildingBlock
+from backend.core import db
+
+
+@pytest.fixture
+def forms(sqlite_engine, make_form):
+    small = make_form("Dog licence")
+    # more blocks than fit into a single json_object call
+    large = make_form("Building permit", {
+        i: BuildingBlock(label=f"field{i}", data_type=BBType.STRING, required=False) for i in range(1, 101)})
+    return small, large
+
+
+def test_listing_filters_in_one_statement(forms, statements):
+    small, large = forms
+    with db.get_session() as session:
+        a = applicationCrud.insert_application(session, Application(
+            user_id=1, form_id=small.id, jsonPayload={"1": {"label": "name", "value": "Rex"}}))
+        b = applicationCrud.insert_application(session, Application(
+            user_id=2, form_id=large.id,
+            jsonPayload={str(i): {"label": f"field{i}", "value": f"v{i}"} for i in range(1, 101)}))
+        c = applicationCrud.insert_application(session, Application(
+            user_id=1, form_id=large.id, jsonPayload={"1": {"label": "field1", "value": "x"}}))
+        applicationCrud.updateApplicationStatus(session, large.id, b.id, ApplicationStatus.APPROVED)
+        applicationCrud.updateApplicationStatus(session, large.id, c.id, ApplicationStatus.REJECTED)
+        applicationCrud.publish_application(session, large.id, b.id)
+
+    with db.get_session() as session:
+        filters = listingCrud.ListingFilter(statuses=["APPROVED", "REJECTED"])
+        with statements.recording():
+            result = listingCrud.list_applications(session, filters)
+        assert len(statements.mentioning("UNION ALL")) == 1
+        assert [(app.form_id, app.id) for app in result] == [(large.id, b.id), (large.id, c.id)]
+        assert result[0].jsonPayload["100"] == {"label": "field100", "value": "v100"}
+        assert result[1].jsonPayload["2"] == {"label": "field2", "value": None}
+
+        everything = listingCrud.list_applications(session, listingCrud.ListingFilter())
+        assert [app.id for app in everything] == [a.id, b.id, c.id]  # created_at order
+        assert everything[0].jsonPayload == {"1": {"label": "name", "value": "Rex"}}
+
+        public = listingCrud.list_applications(session, listingCrud.ListingFilter(is_public=True))
+        assert [app.id for app in public] == [b.id]
+        mine = listingCrud.list_applications(session, listingCrud.ListingFilter(user_id=1, statuses=["PENDING"]))
+        assert [(app.form_id, app.id) for app in mine] == [(small.id, a.id)]
+        assert listingCrud.list_applications(session, listingCrud.ListingFilter(statuses=[])) == []
+
+
+def test_listing_skips_outdated_revisions(forms):
+    small, _ = forms
+    with db.get_session() as session:
+        a = applicationCrud.insert_application(session, Application(
+            user_id=1, form_id=small.id, jsonPayload={"1": {"label": "name", "value": "Rex"}}))
+        new_id = applicationCrud.update_application(small.id, a.id, {"1": {"label": "name", "value": "Max"}}, session)
+
+    with db.get_session() as session:
+        current = listingCrud.list_applications(session, listingCrud.ListingFilter())
+        assert [app.id for app in current] == [new_id]
+        assert current[0].jsonPayload["1"]["value"] == "Max"
+        assert len(listingCrud.list_applications(session, listingCrud.ListingFilter(current_only=False))) == 2
+
+
+def test_keyset_pages_cover_listing_in_order(forms):
+    small, large = forms
+    same_time = datetime(2024, 1, 1, 12, 0, 0)
+    with db.get_session() as session:
+        for i in range(7):
+            for form in (large, small):  # ties on created_at across forms
+                applicationCrud.insert_application(session, Application(
+                    user_id=i, form_id=form.id, created_at=same_time + timedelta(minutes=i // 2),
+                    jsonPayload={"1": {"label": "name" if form is small else "field1", "value": str(i)}}))
+
+    with db.get_session() as session:
+        filters = listingCrud.ListingFilter()
+        expected = [(app.created_at, app.form_id, app.id) for app in listingCrud.list_applications(session, filters)]
+        assert expected == sorted(expected)
+
+        seen, cursor, pages = [], None, 0
+        while True:
+            page, cursor = listingCrud.list_page(session, filters, limit=4, cursor=cursor)
+            seen.extend((app.created_at, app.form_id, app.id) for app in page)
+            pages += 1
+            if cursor is None:
+                break
+        assert seen == expected
+        assert pages == 4
+
+        assert listingCrud.count_applications(session, filters) == 14
+        assert listingCrud.count_applications(session, listingCrud.ListingFilter(form_id=small.id, user_id=3)) == 1
+        with pytest.raises(ValueError):
+            listingCrud.list_page(session, filters, limit=4, cursor="not-a-cursor")
+
+
+def test_listing_returns_block_values_with_their_column_types(sqlite_engine):
+    catalogCrud.ensure_catalog_table()
+    dbActions.createFormTable(1, json.dumps({"blocks": {
+        "1": {"label": "born", "data_type": "DATE"},
+        "2": {"label": "seen", "data_type": "DATETIME"},
+        "3": {"label": "weight", "data_type": "FLOAT"},
+    }}))
+    with db.get_session() as session:
+        app_id = applicationCrud.insert_application(session, Application(user_id=1, form_id=1, jsonPayload={
+            "1": {"label": "born", "value": date(2021, 5, 1)},
+            "2": {"label": "seen", "value": datetime(2024, 1, 2, 3, 4, 5, 6)},
+            "3": {"label": "weight", "value": 12.0},
+        })).id
+
+    with db.get_session() as session:
+        [listed] = listingCrud.list_applications(session, listingCrud.ListingFilter())
+        stored = applicationCrud.get_application_by_id(session, 1, app_id)
+    assert listed.jsonPayload == stored.jsonPayload
+    assert [type(block["value"]) for block in listed.jsonPayload.values()] == [date, datetime, float]
@@ -0,0 +1,41 @@
+from sqlalchemy import inspect, text
+
+from backend.core import db, formRegistry
+from backend.crud import migrateSnapshots
+from backend.models.domain.application import Snapshots
+
+
+def test_legacy_snapshots_column_is_migrated(sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE form_7 (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, form_id INTEGER NOT NULL, "
+            "admin_id INTEGER, status VARCHAR DEFAULT 'PENDING' NOT NULL, "
+            "created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL, snapshots VARCHAR NOT NULL, "
+            "is_public BOOLEAN DEFAULT false NOT NULL, name VARCHAR)"
+        ))
+        rows = [
+            (1, Snapshots(currentSnapshotID=2, nextSnapshotID=2)),
+            (2, Snapshots(previousSnapshotID=1)),
+        ]
+        for row_id, snapshots in rows:
+            conn.execute(
+                text("INSERT INTO form_7 (id, user_id, form_id, snapshots, name) VALUES (:id, 1, 7, :snapshots, 'x')"),
+                {"id": row_id, "snapshots": snapshots.to_json()},
+            )
+
+    assert migrateSnapshots.migrate_form_tables() == ["form_7"]
+
+    inspector = inspect(sqlite_engine)
+    columns = [column["name"] for column in inspector.get_columns("form_7")]
+    assert "snapshots" not in columns
+    assert {"previous_snapshot_id", "current_snapshot_id", "next_snapshot_id", "version"} <= set(columns)
+    assert {index["name"] for index in inspector.get_indexes("form_7")} == {
+        "ix_form_7_previous_snapshot_id", "ix_form_7_current_snapshot_id", "ix_form_7_next_snapshot_id"}
+
+    with sqlite_engine.connect() as conn:
+        values = conn.execute(text(
+            "SELECT id, previous_snapshot_id, current_snapshot_id, next_snapshot_id FROM form_7 ORDER BY id")).all()
+    assert [tuple(row) for row in values] == [(1, None, 2, 2), (2, 1, -1, None)]
+
+    assert formRegistry.get_form_table(7).block_columns == ("name",)
+    assert migrateSnapshots.migrate_form_tables() == []  # already migrated
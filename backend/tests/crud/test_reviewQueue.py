@@ -0,0 +1,80 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, text
+
+from backend.core import db
+from backend.crud import catalogCrud, queueCrud
+from backend.models.orm.catalogtable import PENDING_CONDITION, OrmApplicationCatalog
+
+
+def _fill(count):
+    start = datetime(2024, 1, 1)
+    with db.get_session() as session:
+        session.execute(insert(OrmApplicationCatalog), [
+            {"form_id": 1 + i % 2, "app_id": i, "user_id": 1, "status": "PENDING" if i % 5 else "APPROVED",
+             "is_public": False, "is_current": True, "created_at": start + timedelta(minutes=i)}
+            for i in range(count)
+        ])
+
+
+def _claim(admin_id, n):
+    with db.get_session() as session:
+        entries, _ = queueCrud.claim(session, admin_id, n)
+        return [(entry.form_id, entry.app_id) for entry in entries]
+
+
+def test_claims_are_disjoint_and_expire(sqlite_engine, monkeypatch):
+    catalogCrud.ensure_catalog_table()
+    _fill(20)
+
+    first = _claim(7, 4)
+    assert [app_id for _, app_id in first] == [1, 2, 3, 4]  # oldest pending first, approved ones skipped
+    assert [app_id for _, app_id in _claim(8, 4)] == [6, 7, 8, 9]
+    assert _claim(7, 4) == first  # claiming again renews the own leases
+
+    with db.get_session() as session:
+        assert queueCrud.release(session, 8, [(2, 1)]) == 0  # not theirs
+        assert queueCrud.release(session, 7, [(1, 2)]) == 1
+    assert [app_id for _, app_id in _claim(8, 5)] == [2, 6, 7, 8, 9]
+
+    monkeypatch.setattr(queueCrud, "QUEUE_LEASE_SECONDS", -1)  # every lease from now on is already expired
+    assert len(_claim(9, 20)) == 8  # the rest of the queue
+    assert _claim(10, 3) == [(2, 11), (1, 12), (2, 13)]  # taken over from 9, the valid leases of 7 and 8 stay skipped
+
+    with db.get_session() as session:
+        assert queueCrud.release(session, 10) == 3
+
+
+def test_pending_set_is_indexed(sqlite_engine):
+    catalogCrud.ensure_catalog_table()
+    with sqlite_engine.connect() as conn:
+        plan = conn.execute(text(
+            "EXPLAIN QUERY PLAN SELECT form_id, app_id FROM application_catalog "
+            f"WHERE {PENDING_CONDITION} ORDER BY created_at, form_id, app_id LIMIT 20"
+        )).all()
+    assert "ix_application_catalog_pending" in plan[0][-1]
+
+
+def test_concurrent_reviewers_never_share_work(file_engine):
+    catalogCrud.ensure_catalog_table()
+    _fill(500)
+    reviewers = 8
+    start = threading.Barrier(reviewers)
+
+    def work(admin_id):
+        start.wait()
+        claimed = []
+        while batch := _claim(admin_id, 7):
+            claimed.extend(batch)
+            with db.get_session() as session:  # deciding an application takes it out of the queue
+                for form_id in {form_id for form_id, _ in batch}:
+                    approved = [app_id for f, app_id in batch if f == form_id]
+                    catalogCrud.set_status_and_visibility(session, form_id, {"APPROVED": approved}, [])
+        return claimed
+
+    with ThreadPoolExecutor(reviewers) as pool:
+        claimed = [key for keys in pool.map(work, range(1, reviewers + 1)) for key in keys]
+
+    assert len(claimed) == len(set(claimed)) == 400  # every pending application reviewed exactly once
@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from backend.core import db
+from backend.crud import applicationCrud, catalogCrud, dbActions
+from backend.models.domain.application import Application
+
+
+@pytest.fixture
+def form_id(sqlite_engine):
+    catalogCrud.ensure_catalog_table()
+    dbActions.createFormTable(1, json.dumps({"blocks": {"1": {"label": "name", "data_type": "STRING"}}}))
+    return 1
+
+
+def _revise(form_id, app_id, value):
+    with db.get_session() as session:
+        return applicationCrud.update_application(form_id, app_id, {"1": {"label": "name", "value": value}}, session)
+
+
+def test_revision_chain(form_id):
+    with db.get_session() as session:
+        first = applicationCrud.insert_application(session, Application(
+            user_id=1, form_id=form_id, jsonPayload={"1": {"label": "name", "value": "v0"}})).id
+        session.commit()
+    ids = [first]
+    for i in range(1, 4):
+        ids.append(_revise(form_id, ids[-1], f"v{i}"))
+
+    with db.get_session() as session:
+        revisions = applicationCrud.get_all_revisions_of_application(session, form_id, ids[-1])
+        assert [app.id for app in revisions] == ids
+        by_id = {app.id: app.snapshots for app in revisions}
+        for older in ids[:-1]:
+            assert by_id[older].currentSnapshotID == ids[-1]
+        assert [by_id[i].nextSnapshotID for i in ids] == ids[1:] + [None]
+        assert [by_id[i].previousSnapshotID for i in ids] == [None] + ids[:-1]
+        assert [app.id for app in applicationCrud.get_all_applications(session)] == [ids[-1]]
+
+
+def test_revising_marks_history_outdated_with_one_update(form_id, statements):
+    with db.get_session() as session:
+        head = applicationCrud.insert_application(session, Application(
+            user_id=1, form_id=form_id, jsonPayload={"1": {"label": "name", "value": "v0"}})).id
+        session.commit()
+    for i in range(10):
+        head = _revise(form_id, head, f"v{i}")
+
+    with statements.recording():
+        head = _revise(form_id, head, "last")
+
+    updates = statements.starting_with("UPDATE")
+    assert len([s for s in updates if "form_1" in s.split("SET")[0]]) == 1
+    assert len([s for s in updates if "application_catalog" in s.split("SET")[0]]) == 1
+
+    with db.get_session() as session:
+        assert len(applicationCrud.get_all_revisions_of_application(session, form_id, head)) == 12
+        assert [app.id for app in applicationCrud.get_all_applications(session)] == [head]
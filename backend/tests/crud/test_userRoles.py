@@ -0,0 +1,48 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import inspect, text
+
+from backend.core import db
+from backend.core.ormUtil import ensure_indexes
+from backend.crud import userCrud
+from backend.models.domain.user import RoleAssignment, User, UserType
+from backend.models.orm.roletable import OrmRoleAssignment
+from backend.models.orm.usertable import OrmUser
+
+
+@pytest.fixture
+def users(sqlite_engine):
+    OrmUser.__table__.create(bind=sqlite_engine)
+    OrmRoleAssignment.__table__.create(bind=sqlite_engine)
+    with db.get_session() as session:
+        for i in range(20):
+            role = UserType.ADMIN if i % 4 == 0 else UserType.APPLICANT
+            userCrud.add_user(session, User(
+                username=f"user{i}", email=f"user{i}@example.org", hashed_password="x", date_created=date.today(),
+                user_roles=[RoleAssignment(role=role, assignment_date=date.today())]))
+
+
+@pytest.mark.parametrize("listing, expected", [
+    (userCrud.get_all_users, 20),
+    (userCrud.get_all_admins, 5),
+    (userCrud.get_all_applicants, 15),
+    (userCrud.get_all_reporters, 0),
+])
+def test_user_listings_cost_two_queries(users, statements, listing, expected):
+    with db.get_session() as session, statements.recording():
+        result = listing(session)
+    assert len(result) == expected
+    assert len(statements.starting_with("SELECT")) <= 2
+    for user in result:
+        assert len(user.user_roles) == 1
+        assert user.user_roles[0].user_id == user.id
+
+
+def test_ensure_indexes_on_existing_table(sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        conn.execute(text("CREATE TABLE role_assignment (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, "
+                          "assignment_date DATE NOT NULL, role VARCHAR(9) NOT NULL)"))
+    ensure_indexes()
+    ensure_indexes()  # idempotent
+    assert [index["name"] for index in inspect(sqlite_engine).get_indexes("role_assignment")] == ["ix_role_assignment_user_id"]
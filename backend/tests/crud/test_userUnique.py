@@ -0,0 +1,77 @@
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import Column, Date, Integer, MetaData, String, Table, inspect
+from sqlalchemy.exc import IntegrityError
+
+from backend.core import db
+from backend.core.ormUtil import ensure_indexes
+from backend.crud import userCrud
+from backend.models.domain.user import RoleAssignment, User, UserType
+from backend.models.orm.roletable import OrmRoleAssignment
+from backend.models.orm.usertable import OrmUser
+
+
+def _user(name: str, email: str) -> User:
+    return User(username=name, email=email, hashed_password="x", date_created=date.today(),
+                user_roles=[RoleAssignment(role=UserType.APPLICANT, assignment_date=date.today()),
+                            RoleAssignment(role=UserType.REPORTER, assignment_date=date.today())])
+
+
+@pytest.fixture
+def tables(sqlite_engine):
+    OrmUser.__table__.create(bind=sqlite_engine)
+    OrmRoleAssignment.__table__.create(bind=sqlite_engine)
+
+
+def test_add_user_is_one_insert_per_table(tables, statements):
+    with statements.recording(), db.get_session() as session:
+        created = userCrud.add_user(session, _user("alice", "alice@example.org"))
+
+    queries = [s for s in statements if not s.startswith(("SAVEPOINT", "RELEASE"))]
+    assert [q.split()[2] for q in queries] == ["user_table", "role_assignment"]
+    assert [role.user_id for role in created.user_roles] == [created.id, created.id]
+    with db.get_session() as session:
+        stored = userCrud.get_user_by_id(created.id, session)
+        assert [role.role for role in stored.user_roles] == [UserType.APPLICANT, UserType.REPORTER]
+
+
+def test_duplicates_are_rejected_by_unique_indexes(tables):
+    with db.get_session() as session:
+        alice = userCrud.add_user(session, _user("alice", "alice@example.org"))
+        with pytest.raises(HTTPException) as exc_info:
+            userCrud.add_user(session, _user("alice", "other@example.org"))
+        assert (exc_info.value.status_code, exc_info.value.detail) == (409, "Username already in use")
+        with pytest.raises(HTTPException) as exc_info:
+            userCrud.add_user(session, _user("bob", "alice@example.org"))
+        assert exc_info.value.detail == "Email already in use"
+        # the rejected users didn't roll back alice
+        assert [user.id for user in userCrud.get_all_users(session)] == [alice.id]
+
+
+def test_duplicate_is_named_by_the_violated_index(tables, statements):
+    # psycopg reports the index, whatever the language of the server's messages
+    error = IntegrityError("INSERT", None, SimpleNamespace(diag=SimpleNamespace(constraint_name="ix_user_table_email")))
+    with statements.recording(), db.get_session() as session:
+        assert userCrud._duplicate_detail(session, error, _user("alice", "alice@example.org")) == "Email already in use"
+    assert statements.starting_with("SELECT") == []
+
+
+def test_add_user_leaves_the_given_user_unchanged(tables):
+    user = _user("alice", "alice@example.org")
+    with db.get_session() as session:
+        created = userCrud.add_user(session, user)
+    assert [role.user_id for role in user.user_roles] == [None, None]
+    assert [role.user_id for role in created.user_roles] == [created.id, created.id]
+
+
+def test_ensure_indexes_adds_unique_indexes_to_old_tables(sqlite_engine):
+    # user_table as created before the unique indexes existed
+    Table("user_table", MetaData(), Column("id", Integer, primary_key=True), Column("user_name", String),
+          Column("creation_date", Date), Column("email", String), Column("password", String),
+          Column("is_active", Integer)).create(bind=sqlite_engine)
+    ensure_indexes()
+    unique = {index["name"] for index in inspect(sqlite_engine).get_indexes("user_table") if index["unique"]}
+    assert unique == {"ix_user_table_user_name", "ix_user_table_email"}